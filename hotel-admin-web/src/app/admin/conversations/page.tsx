@@ -3,7 +3,7 @@
 import { useEffect, useState } from "react";
 import { useTenant } from "@/lib/tenant-context";
 import { listConversations } from "@/lib/apiClient";
-import type { ConversationSummary } from "@/lib/types";
+import type { ConversationFilters, ConversationListItem } from "@/lib/types";
 
 const statusColor: Record<string, string> = {
   active: "bg-blue-100 text-blue-700",
@@ -15,21 +15,39 @@ export default function ConversationsPage() {
   const { current } = useTenant();
   const tid = current?.tenant_id;
 
-  const [conversations, setConversations] = useState<ConversationSummary[]>([]);
+  const [conversations, setConversations] = useState<ConversationListItem[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [error, setError] = useState<string | null>(null);
 
-  // date filter
+  // filters
   const [fromDate, setFromDate] = useState("");
   const [toDate, setToDate] = useState("");
+  const [status, setStatus] = useState("");
+  const [outcome, setOutcome] = useState("");
+  // filters of the listing on screen; "Load more" continues with these
+  const [applied, setApplied] = useState<ConversationFilters>({});
+
+  function filters(): ConversationFilters {
+    return {
+      from: fromDate || undefined,
+      to: toDate || undefined,
+      status: (status || undefined) as ConversationFilters["status"],
+      outcome: (outcome || undefined) as ConversationFilters["outcome"],
+    };
+  }
 
   async function load() {
     if (!tid) return;
     setError(null);
     setLoading(true);
     try {
-      const data = await listConversations(tid, fromDate || undefined, toDate || undefined);
-      setConversations(data);
+      const active = filters();
+      const page = await listConversations(tid, active);
+      setApplied(active);
+      setConversations(page.items);
+      setNextCursor(page.next_cursor);
     } catch (e: unknown) {
       setError(e instanceof Error ? e.message : "Failed to load conversations");
     } finally {
@@ -37,6 +55,21 @@ export default function ConversationsPage() {
     }
   }
 
+  async function loadMore() {
+    if (!tid || !nextCursor) return;
+    setError(null);
+    setLoadingMore(true);
+    try {
+      const page = await listConversations(tid, applied, nextCursor);
+      setConversations((prev) => [...prev, ...page.items]);
+      setNextCursor(page.next_cursor);
+    } catch (e: unknown) {
+      setError(e instanceof Error ? e.message : "Failed to load conversations");
+    } finally {
+      setLoadingMore(false);
+    }
+  }
+
   useEffect(() => {
     load();
     // eslint-disable-next-line react-hooks/exhaustive-deps
@@ -62,6 +95,26 @@ export default function ConversationsPage() {
             onChange={(e) => setToDate(e.target.value)}
             className="px-3 py-1.5 border border-gray-300 rounded-md text-sm"
           />
+          <select
+            value={status}
+            onChange={(e) => setStatus(e.target.value)}
+            className="px-3 py-1.5 border border-gray-300 rounded-md text-sm"
+          >
+            <option value="">Any status</option>
+            <option value="active">Active</option>
+            <option value="closed">Closed</option>
+            <option value="escalated">Escalated</option>
+          </select>
+          <select
+            value={outcome}
+            onChange={(e) => setOutcome(e.target.value)}
+            className="px-3 py-1.5 border border-gray-300 rounded-md text-sm"
+          >
+            <option value="">Any outcome</option>
+            <option value="answered">Has answered</option>
+            <option value="fallback">Has fallback</option>
+            <option value="escalate">Has escalation</option>
+          </select>
           <button
             onClick={load}
             className="px-3 py-1.5 text-sm border border-gray-300 rounded-md hover:bg-gray-50"
@@ -85,6 +138,7 @@ export default function ConversationsPage() {
                 <th className="px-5 py-2 font-medium">ID</th>
                 <th className="px-5 py-2 font-medium">Channel</th>
                 <th className="px-5 py-2 font-medium">Status</th>
+                <th className="px-5 py-2 font-medium">Messages</th>
                 <th className="px-5 py-2 font-medium">Started</th>
                 <th className="px-5 py-2 font-medium">Ended</th>
                 <th className="px-5 py-2 font-medium"></th>
@@ -100,6 +154,7 @@ export default function ConversationsPage() {
                       {conv.status}
                     </span>
                   </td>
+                  <td className="px-5 py-3 text-gray-500">{conv.message_count}</td>
                   <td className="px-5 py-3 text-gray-500">{new Date(conv.started_at).toLocaleString()}</td>
                   <td className="px-5 py-3 text-gray-500">{conv.ended_at ? new Date(conv.ended_at).toLocaleString() : "—"}</td>
                   <td className="px-5 py-3">
@@ -116,6 +171,18 @@ export default function ConversationsPage() {
           </table>
         )}
       </div>
+
+      {nextCursor && !loading && (
+        <div className="text-center">
+          <button
+            onClick={loadMore}
+            disabled={loadingMore}
+            className="px-4 py-1.5 text-sm border border-gray-300 rounded-md hover:bg-gray-50 disabled:opacity-50"
+          >
+            {loadingMore ? "Loading..." : "Load more"}
+          </button>
+        </div>
+      )}
     </div>
   );
 }
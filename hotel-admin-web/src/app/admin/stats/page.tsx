@@ -3,7 +3,7 @@
 import { useEffect, useState } from "react";
 import { useTenant } from "@/lib/tenant-context";
 import { getStatsOverview, getUnanswered } from "@/lib/apiClient";
-import type { StatsOverview, UnansweredTurn } from "@/lib/types";
+import type { QuestionCluster, StatsOverview } from "@/lib/types";
 
 function MetricCard({ label, value }: { label: string; value: number | string }) {
   return (
@@ -19,7 +19,7 @@ export default function StatsPage() {
   const tid = current?.tenant_id;
 
   const [overview, setOverview] = useState<StatsOverview | null>(null);
-  const [unanswered, setUnanswered] = useState<UnansweredTurn[]>([]);
+  const [unanswered, setUnanswered] = useState<QuestionCluster[]>([]);
   const [error, setError] = useState<string | null>(null);
   const [loading, setLoading] = useState(true);
 
@@ -92,13 +92,21 @@ export default function StatsPage() {
               <MetricCard label="Total Messages" value={overview.total_messages} />
               <MetricCard label="Fallbacks" value={overview.fallback_count} />
               <MetricCard label="Escalations" value={overview.escalations} />
+              <MetricCard label="Questions" value={overview.total_turns} />
+              <MetricCard
+                label="Avg Response Time"
+                value={overview.avg_latency_ms === null ? "—" : `${(overview.avg_latency_ms / 1000).toFixed(1)} s`}
+              />
+              <MetricCard label="Prompt Tokens" value={overview.prompt_tokens.toLocaleString()} />
+              <MetricCard label="Completion Tokens" value={overview.completion_tokens.toLocaleString()} />
             </div>
           )}
 
-          {/* Unanswered turns */}
+          {/* Unanswered questions, grouped by similarity */}
           <div className="bg-white border border-gray-200 rounded-lg overflow-hidden">
             <div className="px-5 py-3 border-b border-gray-200">
               <h2 className="text-sm font-medium">Unanswered Questions</h2>
+              <p className="text-xs text-gray-500 mt-0.5">Similar questions grouped together, most asked first</p>
             </div>
             {unanswered.length === 0 ? (
               <div className="p-8 text-center text-gray-400">No unanswered questions</div>
@@ -107,27 +115,27 @@ export default function StatsPage() {
                 <thead>
                   <tr className="border-b border-gray-100 text-left text-gray-500">
                     <th className="px-5 py-2 font-medium">Question</th>
-                    <th className="px-5 py-2 font-medium">Confidence</th>
-                    <th className="px-5 py-2 font-medium">Date</th>
-                    <th className="px-5 py-2 font-medium">Conversation</th>
+                    <th className="px-5 py-2 font-medium">Times Asked</th>
+                    <th className="px-5 py-2 font-medium">Last Asked</th>
                   </tr>
                 </thead>
                 <tbody>
-                  {unanswered.map((turn) => (
-                    <tr key={turn.turn_id} className="border-b border-gray-50 hover:bg-gray-50">
-                      <td className="px-5 py-3">{turn.user_message || "—"}</td>
-                      <td className="px-5 py-3 text-gray-500">
-                        {turn.confidence != null ? `${(turn.confidence * 100).toFixed(0)}%` : "—"}
-                      </td>
-                      <td className="px-5 py-3 text-gray-500">{new Date(turn.created_at).toLocaleDateString()}</td>
+                  {unanswered.map((cluster) => (
+                    <tr key={cluster.cluster_id} className="border-b border-gray-50 hover:bg-gray-50 align-top">
                       <td className="px-5 py-3">
-                        <a
-                          href={`/admin/conversations/${turn.conversation_id}`}
-                          className="text-xs text-gray-600 hover:text-gray-900 underline"
-                        >
-                          View
-                        </a>
+                        <p>{cluster.representative}</p>
+                        {cluster.sample_questions.length > 1 && (
+                          <ul className="mt-1 space-y-0.5 text-xs text-gray-500">
+                            {cluster.sample_questions
+                              .filter((q) => q !== cluster.representative)
+                              .map((q) => (
+                                <li key={q}>{q}</li>
+                              ))}
+                          </ul>
+                        )}
                       </td>
+                      <td className="px-5 py-3 text-gray-500">{cluster.question_count}</td>
+                      <td className="px-5 py-3 text-gray-500">{new Date(cluster.last_seen_at).toLocaleDateString()}</td>
                     </tr>
                   ))}
                 </tbody>
@@ -1,7 +1,7 @@
 import type {
   CurrentUser, TenantSettings, WidgetKey, KBDocument,
-  ConversationSummary, ConversationDetail,
-  StatsOverview, UnansweredTurn,
+  ConversationPage, ConversationFilters, ConversationDetail,
+  StatsOverview, QuestionCluster,
 } from "./types";
 
 async function request<T>(path: string, options: RequestInit = {}): Promise<T> {
@@ -69,12 +69,15 @@ export const reindexDoc = (tid: string, docId: string) =>
   request<{ status: string }>(`/admin/tenant/${tid}/kb/reindex?doc_id=${docId}`, { method: "POST" });
 
 // Conversations
-export const listConversations = (tid: string, from?: string, to?: string) => {
+export const listConversations = (tid: string, filters: ConversationFilters = {}, cursor?: string) => {
   const params = new URLSearchParams();
-  if (from) params.set("from_date", from);
-  if (to) params.set("to_date", to);
+  if (filters.from) params.set("from_date", filters.from);
+  if (filters.to) params.set("to_date", filters.to);
+  if (filters.status) params.set("status", filters.status);
+  if (filters.outcome) params.set("outcome", filters.outcome);
+  if (cursor) params.set("cursor", cursor);
   const q = params.toString() ? `?${params}` : "";
-  return request<ConversationSummary[]>(`/admin/tenant/${tid}/conversations${q}`);
+  return request<ConversationPage>(`/admin/tenant/${tid}/conversations${q}`);
 };
 
 export const getConversation = (tid: string, cid: string) =>
@@ -90,4 +93,4 @@ export const getStatsOverview = (tid: string, from?: string, to?: string) => {
 };
 
 export const getUnanswered = (tid: string) =>
-  request<UnansweredTurn[]>(`/admin/tenant/${tid}/stats/unanswered`);
+  request<QuestionCluster[]>(`/admin/tenant/${tid}/stats/unanswered`);
@@ -41,6 +41,22 @@ export interface ConversationSummary {
   ended_at: string | null;
 }
 
+export interface ConversationListItem extends ConversationSummary {
+  message_count: number;
+}
+
+export interface ConversationPage {
+  items: ConversationListItem[];
+  next_cursor: string | null;
+}
+
+export interface ConversationFilters {
+  from?: string;
+  to?: string;
+  status?: ConversationSummary["status"];
+  outcome?: ConversationTurn["outcome"];
+}
+
 export interface ConversationMessage {
   id: string;
   role: "user" | "assistant" | "system";
@@ -65,12 +81,17 @@ export interface StatsOverview {
   total_messages: number;
   fallback_count: number;
   escalations: number;
+  total_turns: number;
+  avg_latency_ms: number | null;
+  prompt_tokens: number;
+  completion_tokens: number;
 }
 
-export interface UnansweredTurn {
-  turn_id: string;
-  conversation_id: string;
-  user_message: string | null;
-  confidence: number | null;
-  created_at: string;
+export interface QuestionCluster {
+  cluster_id: string;
+  question_count: number;
+  representative: string;
+  sample_questions: string[];
+  first_seen_at: string;
+  last_seen_at: string;
 }
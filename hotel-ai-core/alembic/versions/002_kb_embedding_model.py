@@ -0,0 +1,23 @@
+"""Record the embedding model on kb_embeddings
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "002"
+down_revision = "001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # NULL means "unknown model": such rows are re-embedded on the next reindex
+    op.add_column("kb_embeddings", sa.Column("model", sa.String(100)))
+
+
+def downgrade() -> None:
+    op.drop_column("kb_embeddings", "model")
@@ -0,0 +1,29 @@
+"""Content-addressed embedding store shared across tenants
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from pgvector.sqlalchemy import Vector
+
+revision = "003"
+down_revision = "002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "shared_embeddings",
+        sa.Column("content_hash", sa.String(64), primary_key=True),
+        sa.Column("model", sa.String(100), primary_key=True),
+        sa.Column("embedding", Vector(1536), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("shared_embeddings")
@@ -0,0 +1,25 @@
+"""Record the PDF page span of each kb_chunk
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "004"
+down_revision = "003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # NULL for non-paged sources and for chunks ingested before this revision
+    op.add_column("kb_chunks", sa.Column("page_start", sa.Integer()))
+    op.add_column("kb_chunks", sa.Column("page_end", sa.Integer()))
+
+
+def downgrade() -> None:
+    op.drop_column("kb_chunks", "page_end")
+    op.drop_column("kb_chunks", "page_start")
@@ -0,0 +1,104 @@
+"""List-partition kb_embeddings with one partition per tenant
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-17
+
+Every tenant's vectors get a partition, and with it an HNSW index, of their own,
+so a tenant-scoped search walks a graph of only that tenant's vectors and needs
+no filtering afterwards. (Hash partitions shared by many tenants left the walk
+with few rows of the queried tenant; most searches fell back to an exact scan.)
+New tenants get their partition from app.core.kb.partitions.
+
+The chunk foreign key is (chunk_id, tenant_id): keyed on chunk_id alone, the
+cascade from every deleted chunk would probe all partitions.
+
+Both directions run in one transaction that locks every partition and its
+indexes. Beyond a few hundred tenants that overflows the default lock table
+("out of shared memory"); raise max_locks_per_transaction (e.g. to 256, needs a
+restart) before migrating.
+"""
+
+import uuid
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+from pgvector.sqlalchemy import Vector
+
+revision = "005"
+down_revision = "004"
+branch_labels = None
+depends_on = None
+
+
+def _partition_name(tenant_id: uuid.UUID) -> str:
+    # Same naming as app.core.kb.partitions.partition_name
+    return f"kb_embeddings_{tenant_id.hex}"
+
+
+def _create_hnsw_index() -> None:
+    # On a partitioned table this builds one HNSW index per partition
+    op.execute(
+        "CREATE INDEX ix_kb_embeddings_hnsw ON kb_embeddings "
+        "USING hnsw (embedding vector_cosine_ops) "
+        "WITH (m = 16, ef_construction = 64)"
+    )
+
+
+def _rename_existing(suffix: str) -> None:
+    op.rename_table("kb_embeddings", f"kb_embeddings_{suffix}")
+    op.execute(f"ALTER INDEX ix_kb_embeddings_hnsw RENAME TO ix_kb_embeddings_{suffix}_hnsw")
+    op.execute(f"ALTER TABLE kb_embeddings_{suffix} RENAME CONSTRAINT kb_embeddings_pkey TO kb_embeddings_{suffix}_pkey")
+
+
+def _copy_from(suffix: str) -> None:
+    op.execute(
+        "INSERT INTO kb_embeddings (chunk_id, tenant_id, embedding, model, created_at) "
+        f"SELECT chunk_id, tenant_id, embedding, model, created_at FROM kb_embeddings_{suffix}"
+    )
+    op.drop_table(f"kb_embeddings_{suffix}")
+
+
+def upgrade() -> None:
+    _rename_existing("old")
+    # Each partition holds a single tenant, so the tenant_id index has nothing to narrow
+    op.drop_index("ix_kb_embeddings_tenant_id", table_name="kb_embeddings_old")
+
+    op.create_unique_constraint("uq_kb_chunks_id_tenant_id", "kb_chunks", ["id", "tenant_id"])
+    # The partition key has to be part of the primary key
+    op.create_table(
+        "kb_embeddings",
+        sa.Column("chunk_id", UUID(as_uuid=True), primary_key=True),
+        sa.Column("tenant_id", UUID(as_uuid=True), sa.ForeignKey("tenants.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("embedding", Vector(1536), nullable=False),
+        sa.Column("model", sa.String(100)),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.ForeignKeyConstraint(
+            ["chunk_id", "tenant_id"], ["kb_chunks.id", "kb_chunks.tenant_id"], ondelete="CASCADE"
+        ),
+        postgresql_partition_by="LIST (tenant_id)",
+    )
+    for tenant_id in op.get_bind().scalars(sa.text("SELECT id FROM tenants")).all():
+        op.execute(
+            f"CREATE TABLE {_partition_name(tenant_id)} PARTITION OF kb_embeddings FOR VALUES IN ('{tenant_id}')"
+        )
+    _copy_from("old")
+    _create_hnsw_index()
+
+
+def downgrade() -> None:
+    _rename_existing("partitioned")
+
+    op.create_table(
+        "kb_embeddings",
+        sa.Column("chunk_id", UUID(as_uuid=True), sa.ForeignKey("kb_chunks.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("tenant_id", UUID(as_uuid=True), sa.ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("embedding", Vector(1536), nullable=False),
+        sa.Column("model", sa.String(100)),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    _copy_from("partitioned")
+    op.drop_constraint("uq_kb_chunks_id_tenant_id", "kb_chunks", type_="unique")
+    op.create_index("ix_kb_embeddings_tenant_id", "kb_embeddings", ["tenant_id"])
+    _create_hnsw_index()
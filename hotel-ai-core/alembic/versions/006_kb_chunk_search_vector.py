@@ -0,0 +1,28 @@
+"""Full-text search vector on kb_chunks for hybrid retrieval
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+
+revision = "006"
+down_revision = "005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Both configs are indexed: guests and KB content mix English and Swedish
+    op.execute(
+        "ALTER TABLE kb_chunks ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+        "to_tsvector('english'::regconfig, chunk_text) || to_tsvector('swedish'::regconfig, chunk_text)"
+        ") STORED"
+    )
+    op.execute("CREATE INDEX ix_kb_chunks_search_vector ON kb_chunks USING gin (search_vector)")
+
+
+def downgrade() -> None:
+    op.drop_index("ix_kb_chunks_search_vector", table_name="kb_chunks")
+    op.drop_column("kb_chunks", "search_vector")
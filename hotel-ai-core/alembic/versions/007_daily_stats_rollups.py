@@ -0,0 +1,43 @@
+"""Token usage on turns and extra daily_stats counters for incremental rollups
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "007"
+down_revision = "006"
+branch_labels = None
+depends_on = None
+
+_COUNTERS = (
+    ("total_turns", sa.Integer()),
+    ("latency_ms_sum", sa.BigInteger()),
+    ("prompt_tokens_sum", sa.BigInteger()),
+    ("completion_tokens_sum", sa.BigInteger()),
+)
+
+
+def upgrade() -> None:
+    # NULL for turns without an LLM call (greetings, cached answers, fallbacks)
+    op.add_column("turns", sa.Column("prompt_tokens", sa.Integer()))
+    op.add_column("turns", sa.Column("completion_tokens", sa.Integer()))
+
+    for name, type_ in _COUNTERS:
+        op.add_column("daily_stats", sa.Column(name, type_, nullable=False, server_default="0"))
+    # The original counters are only ever incremented; NULL would poison the sums
+    for name in ("total_conversations", "total_messages", "fallback_count", "escalations"):
+        op.execute(f"UPDATE daily_stats SET {name} = 0 WHERE {name} IS NULL")
+        op.alter_column("daily_stats", name, nullable=False)
+
+
+def downgrade() -> None:
+    for name in ("total_conversations", "total_messages", "fallback_count", "escalations"):
+        op.alter_column("daily_stats", name, nullable=True)
+    for name, _ in reversed(_COUNTERS):
+        op.drop_column("daily_stats", name)
+    op.drop_column("turns", "completion_tokens")
+    op.drop_column("turns", "prompt_tokens")
@@ -0,0 +1,47 @@
+"""Indexes for keyset-paginated conversation listing
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+
+revision = "008"
+down_revision = "007"
+branch_labels = None
+depends_on = None
+
+# Built CONCURRENTLY so large tables stay writable while the indexes build.
+# A failed concurrent build leaves an INVALID index; drop it and rerun.
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        # Serves the listing's WHERE tenant_id = ? ORDER BY started_at DESC, id DESC
+        # and makes the single-column tenant_id index redundant
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_conversations_tenant_started "
+            "ON conversations (tenant_id, started_at DESC, id DESC)"
+        )
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_conversations_tenant_id")
+        # Per-conversation lookups: message counts, conversation detail, outcome filter
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_messages_conversation_id "
+            "ON messages (conversation_id)"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_turns_conversation_outcome "
+            "ON turns (conversation_id, outcome)"
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_turns_conversation_outcome")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_messages_conversation_id")
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_conversations_tenant_id "
+            "ON conversations (tenant_id)"
+        )
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_conversations_tenant_started")
@@ -0,0 +1,63 @@
+"""Clusters of unanswered questions
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from pgvector.sqlalchemy import Vector
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+
+revision = "009"
+down_revision = "008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "question_clusters",
+        sa.Column("id", UUID(as_uuid=True), primary_key=True),
+        sa.Column("tenant_id", UUID(as_uuid=True), sa.ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("centroid", Vector(1536), nullable=False),
+        sa.Column("question_count", sa.Integer(), nullable=False),
+        sa.Column("representative", sa.Text(), nullable=False),
+        sa.Column("sample_questions", JSONB(), nullable=False),
+        sa.Column("first_seen_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("last_seen_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index(
+        "ix_question_clusters_tenant_count",
+        "question_clusters",
+        ["tenant_id", sa.text("question_count DESC")],
+    )
+
+    # A nullable column without a default is a catalog-only change. The foreign
+    # key is added NOT VALID and validated in its own transaction, which does
+    # not block writes to turns.
+    op.add_column("turns", sa.Column("cluster_id", UUID(as_uuid=True)))
+    op.execute(
+        "ALTER TABLE turns ADD CONSTRAINT turns_cluster_id_fkey FOREIGN KEY (cluster_id) "
+        "REFERENCES question_clusters (id) ON DELETE SET NULL NOT VALID"
+    )
+
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TABLE turns VALIDATE CONSTRAINT turns_cluster_id_fkey")
+        # Existing fallback/escalate turns all start unclustered; the job works
+        # through them oldest first
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_turns_unclustered "
+            "ON turns (tenant_id, created_at) "
+            "WHERE cluster_id IS NULL AND outcome IN ('fallback', 'escalate')"
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_turns_unclustered")
+    op.drop_constraint("turns_cluster_id_fkey", "turns", type_="foreignkey")
+    op.drop_column("turns", "cluster_id")
+    op.drop_index("ix_question_clusters_tenant_count", table_name="question_clusters")
+    op.drop_table("question_clusters")
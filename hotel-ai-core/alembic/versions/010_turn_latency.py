@@ -0,0 +1,24 @@
+"""Per-turn latency
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "010"
+down_revision = "009"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # NULL for turns recorded before this; readers fall back to the gap between
+    # the user message and the turn (see app.workers.analytics)
+    op.add_column("turns", sa.Column("latency_ms", sa.Integer()))
+
+
+def downgrade() -> None:
+    op.drop_column("turns", "latency_ms")
@@ -1,24 +1,34 @@
 from __future__ import annotations
 
 import uuid
-from datetime import date, datetime
+from collections.abc import AsyncIterator
+from datetime import date
+from typing import Literal
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, UploadFile, File
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.api.deps import get_current_user, require_tenant_role
-from app.core.analytics.service import get_stats_overview, get_unanswered_turns
+from app.core.analytics.service import get_question_clusters, get_stats_overview
 from app.core.auth.jwt import create_access_token
 from app.core.auth.passwords import hash_password, verify_password
+from app.core.cache.answers import get_answer_cache_stats
+from app.core.conversations.export import csv_lines, gzipped, iter_export_rows, ndjson_lines
+from app.core.conversations.listing import decode_cursor
+from app.core.conversations.listing import list_conversations as list_conversation_page
 from app.core.kb.service import (
     create_document,
     get_document,
     list_documents,
     upload_file_to_s3,
 )
+from app.core.kb.version import bump_kb_version
+from app.core.llm.usage import get_prompt_cache_stats
+from app.core.tenants.cache import invalidate_tenant
 from app.core.tenants.service import get_tenant, get_tenant_settings, upsert_tenant_settings
 from app.db.models import (
     Conversation,
@@ -29,7 +39,7 @@ from app.db.models import (
     User,
     WidgetKey,
 )
-from app.db.session import get_db
+from app.db.session import SessionScope, get_db, get_session_scope
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
@@ -128,11 +138,17 @@ async def get_settings(
 async def update_settings(
     tenant_id: uuid.UUID,
     body: TenantSettingsUpdate,
+    background_tasks: BackgroundTasks,
     _user: User = Depends(require_tenant_role("editor")),
     db: AsyncSession = Depends(get_db),
 ):
     data = body.model_dump(exclude_unset=True)
     ts = await upsert_tenant_settings(db, tenant_id, data)
+    # Background tasks run after the session commits, so no process re-caches old
+    # settings. Escalation contacts are part of the prompt, so cached answers are
+    # stale too.
+    background_tasks.add_task(invalidate_tenant, tenant_id)
+    background_tasks.add_task(bump_kb_version, tenant_id)
     return {"status": "ok"}
 
 
@@ -184,6 +200,7 @@ async def create_widget_key(
 @router.post("/widget-keys/{widget_key_id}/disable")
 async def disable_widget_key(
     widget_key_id: uuid.UUID,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
@@ -200,6 +217,7 @@ async def disable_widget_key(
         raise HTTPException(status_code=403, detail="Insufficient permissions")
 
     wk.status = "disabled"
+    background_tasks.add_task(invalidate_tenant, wk.tenant_id)
     return {"status": "disabled"}
 
 
@@ -322,28 +340,28 @@ async def list_conversations(
     tenant_id: uuid.UUID,
     from_date: date | None = None,
     to_date: date | None = None,
+    status: Literal["active", "closed", "escalated"] | None = None,
+    outcome: Literal["answered", "fallback", "escalate"] | None = None,
+    cursor: str | None = None,
+    limit: int = Query(50, ge=1, le=200),
     _user: User = Depends(require_tenant_role("viewer")),
     db: AsyncSession = Depends(get_db),
 ):
-    stmt = select(Conversation).where(Conversation.tenant_id == tenant_id)
-    if from_date:
-        stmt = stmt.where(Conversation.started_at >= datetime.combine(from_date, datetime.min.time()))
-    if to_date:
-        stmt = stmt.where(Conversation.started_at <= datetime.combine(to_date, datetime.max.time()))
-    stmt = stmt.order_by(Conversation.started_at.desc()).limit(100)
-
-    result = await db.execute(stmt)
-    convs = result.scalars().all()
-    return [
-        {
-            "id": str(c.id),
-            "channel": c.channel,
-            "status": c.status,
-            "started_at": c.started_at.isoformat(),
-            "ended_at": c.ended_at.isoformat() if c.ended_at else None,
-        }
-        for c in convs
-    ]
+    """Newest first, `limit` per page; pass the returned next_cursor to get the next page.
+
+    `outcome` keeps conversations with at least one turn of that outcome.
+    """
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    return await list_conversation_page(
+        db, tenant_id,
+        limit=limit, after=after,
+        from_date=from_date, to_date=to_date,
+        status=status, outcome=outcome,
+    )
 
 
 @router.get("/tenant/{tenant_id}/conversations/{conversation_id}")
@@ -390,6 +408,45 @@ async def get_conversation(
     }
 
 
+@router.get("/tenant/{tenant_id}/export/conversations")
+async def export_conversations(
+    tenant_id: uuid.UUID,
+    from_date: date | None = None,
+    to_date: date | None = None,
+    format: Literal["ndjson", "csv"] = "ndjson",
+    gzip: bool = False,
+    _user: User = Depends(require_tenant_role("viewer")),
+    scope: SessionScope = Depends(get_session_scope),
+):
+    """Stream the tenant's conversations and turns as NDJSON or CSV, optionally gzipped.
+
+    One row per turn (see app.core.conversations.export); the body is produced
+    while rows are read from a server-side cursor, so any date range can be exported.
+    """
+
+    async def body() -> AsyncIterator[bytes]:
+        # The response body outlives the request's dependencies, so the export
+        # reads through a session of its own
+        async with scope() as db:
+            batches = iter_export_rows(db, tenant_id, from_date, to_date)
+            chunks = ndjson_lines(batches) if format == "ndjson" else csv_lines(batches)
+            if gzip:
+                chunks = gzipped(chunks)
+            async for chunk in chunks:
+                yield chunk
+
+    filename = f"conversations-{from_date or 'start'}-{to_date or 'now'}.{format}"
+    media_type = "application/x-ndjson" if format == "ndjson" else "text/csv"
+    if gzip:
+        filename += ".gz"
+        media_type = "application/gzip"
+    return StreamingResponse(
+        body(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
 @router.get("/tenant/{tenant_id}/stats/overview")
 async def stats_overview(
     tenant_id: uuid.UUID,
@@ -404,7 +461,24 @@ async def stats_overview(
 @router.get("/tenant/{tenant_id}/stats/unanswered")
 async def stats_unanswered(
     tenant_id: uuid.UUID,
+    limit: int = Query(20, ge=1, le=100),
     _user: User = Depends(require_tenant_role("viewer")),
     db: AsyncSession = Depends(get_db),
 ):
-    return await get_unanswered_turns(db, tenant_id)
+    return await get_question_clusters(db, tenant_id, limit)
+
+
+@router.get("/tenant/{tenant_id}/stats/answer-cache")
+async def stats_answer_cache(
+    tenant_id: uuid.UUID,
+    _user: User = Depends(require_tenant_role("viewer")),
+):
+    return await get_answer_cache_stats(tenant_id)
+
+
+@router.get("/tenant/{tenant_id}/stats/prompt-cache")
+async def stats_prompt_cache(
+    tenant_id: uuid.UUID,
+    _user: User = Depends(require_tenant_role("viewer")),
+):
+    return await get_prompt_cache_stats(tenant_id)
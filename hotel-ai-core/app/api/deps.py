@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import hmac
 import uuid
 from collections.abc import AsyncGenerator, Callable
 
@@ -7,6 +8,7 @@ from fastapi import Depends, Header, HTTPException, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import settings
 from app.core.auth.jwt import decode_access_token
 from app.core.auth.rbac import check_tenant_access
 from app.db.models import User
@@ -35,6 +37,15 @@ async def get_current_user(
     return user
 
 
+async def require_metrics_token(authorization: str | None = Header(None)) -> None:
+    # Metric labels include tenant IDs; only development serves them without a token
+    if not settings.METRICS_TOKEN and settings.APP_ENV == "development":
+        return
+    expected = f"Bearer {settings.METRICS_TOKEN}"
+    if not settings.METRICS_TOKEN or not hmac.compare_digest((authorization or "").encode(), expected.encode()):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid metrics token")
+
+
 def require_tenant_role(min_role: str = "viewer") -> Callable:
     async def dependency(
         tenant_id: uuid.UUID,
@@ -1,19 +1,27 @@
 from __future__ import annotations
 
+import json
 import uuid
+from collections.abc import AsyncIterator
+from datetime import datetime, timezone
 
+import structlog
 from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from slowapi import Limiter
 from slowapi.util import get_remote_address
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
 from app.config import settings
-from app.db.models import Conversation, Message, Turn, WidgetKey
-from app.db.session import get_db
-from app.core.rag.orchestrator import rag_answer
+from app.db.models import Conversation
+from app.db.session import SessionScope, get_db, get_session_scope
+from app.core.analytics.rollups import conversation_deltas, upsert_daily_stats
+from app.core.conversations.service import record_turn, resolve_conversation
+from app.core.rag.orchestrator import rag_answer, rag_answer_stream
+from app.core.tenants.cache import WidgetContext, resolve_widget_key
+
+logger = structlog.get_logger()
 
 router = APIRouter(prefix="/public", tags=["public"])
 
@@ -52,25 +60,43 @@ class ChatResponse(BaseModel):
 # ── Helpers ──────────────────────────────────────────────────────────────────
 
 
-async def _resolve_widget_key(
-    db: AsyncSession, widget_key: str, request: Request
-) -> WidgetKey:
-    stmt = select(WidgetKey).where(WidgetKey.key == widget_key, WidgetKey.status == "active")
-    result = await db.execute(stmt)
-    wk = result.scalar_one_or_none()
-    if not wk:
+def _check_widget(ctx: WidgetContext | None, request: Request) -> WidgetContext:
+    if not ctx:
         raise HTTPException(status_code=404, detail="Invalid or inactive widget key")
 
     # Domain validation
-    from app.core.tenants.service import get_tenant_settings
-
-    ts = await get_tenant_settings(db, wk.tenant_id)
-    if ts and ts.allowed_domains:
+    if ctx.allowed_domains:
         origin = request.headers.get("origin") or request.headers.get("referer") or ""
-        if origin and not any(domain in origin for domain in ts.allowed_domains):
+        if origin and not any(domain in origin for domain in ctx.allowed_domains):
             raise HTTPException(status_code=403, detail="Domain not allowed")
 
-    return wk
+    return ctx
+
+
+async def _resolve_widget_key(
+    db: AsyncSession, widget_key: str, request: Request
+) -> WidgetContext:
+    return _check_widget(await resolve_widget_key(db, widget_key), request)
+
+
+async def _resolve_conversation(
+    db: AsyncSession, body: ChatRequest, request: Request
+) -> tuple[WidgetContext, uuid.UUID]:
+    """Validate the widget key and that the conversation belongs to its tenant."""
+    try:
+        conversation_id = uuid.UUID(body.conversation_id)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Conversation not found")
+
+    ctx, found = await resolve_conversation(db, body.widget_key, conversation_id)
+    ctx = _check_widget(ctx, request)
+    if not found:
+        raise HTTPException(status_code=404, detail="Conversation not found")
+    return ctx, conversation_id
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
 
 
 # ── Endpoints ────────────────────────────────────────────────────────────────
@@ -82,18 +108,13 @@ async def widget_config(
     request: Request,
     db: AsyncSession = Depends(get_db),
 ):
-    wk = await _resolve_widget_key(db, widget_key, request)
-
-    from app.core.tenants.service import get_tenant, get_tenant_settings
-
-    tenant = await get_tenant(db, wk.tenant_id)
-    ts = await get_tenant_settings(db, wk.tenant_id)
+    ctx = await _resolve_widget_key(db, widget_key, request)
 
     return {
-        "greeting_message": ts.greeting_message if ts else None,
-        "escalation_phone": ts.escalation_phone if ts else None,
-        "escalation_email": ts.escalation_email if ts else None,
-        "supported_languages": [tenant.default_language] if tenant else ["en"],
+        "greeting_message": ctx.greeting_message,
+        "escalation_phone": ctx.escalation_phone,
+        "escalation_email": ctx.escalation_email,
+        "supported_languages": [ctx.default_language],
     }
 
 
@@ -103,15 +124,18 @@ async def conversation_start(
     request: Request,
     db: AsyncSession = Depends(get_db),
 ):
-    wk = await _resolve_widget_key(db, body.widget_key, request)
+    ctx = await _resolve_widget_key(db, body.widget_key, request)
 
+    started_at = datetime.now(timezone.utc)
     conv = Conversation(
-        tenant_id=wk.tenant_id,
+        tenant_id=ctx.tenant_id,
         channel=body.channel,
         status="active",
+        started_at=started_at,
     )
     db.add(conv)
     await db.flush()
+    await db.execute(upsert_daily_stats(conversation_deltas(ctx.tenant_id, started_at)))
 
     return ConversationStartResponse(conversation_id=str(conv.id))
 
@@ -120,68 +144,70 @@ async def conversation_start(
 async def chat(
     body: ChatRequest,
     request: Request,
-    db: AsyncSession = Depends(get_db),
+    scope: SessionScope = Depends(get_session_scope),
 ):
-    wk = await _resolve_widget_key(db, body.widget_key, request)
-    tenant_id = wk.tenant_id
-
-    # Validate conversation belongs to tenant
-    conv_stmt = select(Conversation).where(
-        Conversation.id == uuid.UUID(body.conversation_id),
-        Conversation.tenant_id == tenant_id,
-    )
-    result = await db.execute(conv_stmt)
-    conv = result.scalar_one_or_none()
-    if not conv:
-        raise HTTPException(status_code=404, detail="Conversation not found")
-
-    # Save user message
-    user_msg = Message(
-        tenant_id=tenant_id,
-        conversation_id=conv.id,
-        role="user",
-        content=body.message,
-    )
-    db.add(user_msg)
-    await db.flush()
-
-    # Get escalation info
-    from app.core.tenants.service import get_tenant_settings
-
-    ts = await get_tenant_settings(db, tenant_id)
-    escalation_phone = ts.escalation_phone if ts else None
-    escalation_email = ts.escalation_email if ts else None
-    greeting_message = ts.greeting_message if ts else None
+    received_at = datetime.now(timezone.utc)
+    # Database work happens in short sessions before and after the LLM call, so
+    # concurrent chats are not limited by the connection pool.
+    async with scope() as db:
+        ctx, conversation_id = await _resolve_conversation(db, body, request)
+    tenant_id = ctx.tenant_id
 
     # RAG pipeline
     rag_result = await rag_answer(
-        db, tenant_id, body.message,
-        escalation_phone=escalation_phone,
-        escalation_email=escalation_email,
-        greeting_message=greeting_message,
-    )
-
-    # Save assistant message
-    assistant_msg = Message(
-        tenant_id=tenant_id,
-        conversation_id=conv.id,
-        role="assistant",
-        content=rag_result.get("answer_text"),
+        scope, tenant_id, body.message,
+        escalation_phone=ctx.escalation_phone,
+        escalation_email=ctx.escalation_email,
+        greeting_message=ctx.greeting_message,
     )
-    print(assistant_msg.content)
-    db.add(assistant_msg)
-    await db.flush()
 
-    # Save turn
-    turn = Turn(
-        tenant_id=tenant_id,
-        conversation_id=conv.id,
-        user_message_id=user_msg.id,
-        assistant_message_id=assistant_msg.id,
-        outcome=rag_result["outcome"],
-        confidence=rag_result["confidence"],
-        retrieved_chunk_ids=[c["chunk_id"] for c in rag_result.get("citations", [])],
-    )
-    db.add(turn)
+    async with scope() as db:
+        await record_turn(db, tenant_id, conversation_id, body.message, rag_result, received_at)
 
     return ChatResponse(**rag_result)
+
+
+@router.post("/chat/stream")
+async def chat_stream(
+    body: ChatRequest,
+    request: Request,
+    scope: SessionScope = Depends(get_session_scope),
+):
+    """Server-Sent Events variant of /chat.
+
+    Emits `meta` (outcome, citations, confidence) once retrieval is done, then `delta`
+    events with answer text as the model produces it, then `done` with the full
+    ChatResponse after the turn has been stored. Failures mid-stream are reported as
+    an `error` event. Turns abandoned by the guest before `done` are not recorded.
+    """
+    received_at = datetime.now(timezone.utc)
+    async with scope() as db:
+        ctx, conversation_id = await _resolve_conversation(db, body, request)
+    tenant_id = ctx.tenant_id
+
+    async def events() -> AsyncIterator[str]:
+        try:
+            async for event in rag_answer_stream(
+                scope, tenant_id, body.message,
+                escalation_phone=ctx.escalation_phone,
+                escalation_email=ctx.escalation_email,
+                greeting_message=ctx.greeting_message,
+            ):
+                if event["type"] == "done":
+                    async with scope() as db:
+                        await record_turn(
+                            db, tenant_id, conversation_id, body.message,
+                            event["result"], received_at,
+                        )
+                    yield _sse("done", ChatResponse(**event["result"]).model_dump())
+                else:
+                    yield _sse(event.pop("type"), event)
+        except Exception as exc:
+            logger.error("chat_stream.failed", conversation_id=str(conversation_id), error=str(exc))
+            yield _sse("error", {"detail": "Failed to generate a response"})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -8,6 +8,10 @@ class Settings(BaseSettings):
     # Database
     DATABASE_URL: str = "postgresql+asyncpg://hotel_ai:hotel_ai_pass@db:5432/hotel_ai"
     DATABASE_URL_SYNC: str = "postgresql://hotel_ai:hotel_ai_pass@db:5432/hotel_ai"
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 10.0
+    DB_POOL_RECYCLE_SECONDS: int = 1800
 
     # Redis
     REDIS_URL: str = "redis://redis:6379/0"
@@ -19,12 +23,84 @@ class Settings(BaseSettings):
 
     # OpenAI
     OPENAI_API_KEY: str = ""
+    OPENAI_BASE_URL: str = ""
     OPENAI_EMBEDDING_MODEL: str = "text-embedding-3-small"
     OPENAI_CHAT_MODEL: str = "gpt-4o-mini"
+    OPENAI_MAX_CONNECTIONS: int = 100
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    OPENAI_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+    OPENAI_HTTP2: bool = True
+    OPENAI_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    OPENAI_TIMEOUT_SECONDS: float = 60.0
+    OPENAI_EMBEDDING_TIMEOUT_SECONDS: float = 10.0
+    OPENAI_CHAT_TIMEOUT_SECONDS: float = 30.0
+    OPENAI_MAX_RETRIES: int = 3
+    OPENAI_PROMPT_CACHE_KEY_ENABLED: bool = True
 
     # RAG
-    RAG_TOP_K: int = 8
+    RAG_TOP_K: int = 6
     RAG_CONFIDENCE_THRESHOLD: float = 0.30
+    RAG_CONTEXT_MAX_TOKENS: int = 1500
+    RAG_CONTEXT_DEDUP_SIMILARITY: float = 0.8
+    RAG_HYBRID_ENABLED: bool = True
+    RAG_HYBRID_CANDIDATES: int = 20
+    RAG_RRF_K: int = 60
+    RAG_HNSW_EF_SEARCH: int = 100
+    RAG_HNSW_ITERATIVE_SCAN: str = "off"
+    VECTOR_INDEX_ENABLED: bool = True
+    VECTOR_INDEX_MAX_CHUNKS: int = 2000
+    VECTOR_INDEX_MEMORY_MB: int = 256
+
+    # Embedding cache (in-process LRU backed by Redis)
+    EMBEDDING_CACHE_ENABLED: bool = True
+    EMBEDDING_CACHE_LOCAL_SIZE: int = 5000
+    EMBEDDING_CACHE_LOCAL_TTL_SECONDS: int = 3600
+    EMBEDDING_CACHE_REDIS_TTL_SECONDS: int = 604800
+
+    # KB ingestion
+    INGEST_INSERT_BATCH_SIZE: int = 500
+    INGEST_PIPELINE_BATCH_SIZE: int = 256
+    INGEST_SPOOL_MAX_BYTES: int = 8 * 1024 * 1024
+    KB_PARTITION_INTERVAL_SECONDS: float = 60.0
+    KB_PARTITION_LOCK_TIMEOUT_MS: int = 2000
+    PDF_PARSE_WORKERS: int = 4
+    PDF_PARSE_PAGES_PER_TASK: int = 16
+    PDF_PARALLEL_MIN_PAGES: int = 32
+    PDF_PAGE_TIMEOUT_SECONDS: float = 10.0
+    EMBEDDING_CONCURRENCY: int = 4
+    EMBEDDING_BATCH_MAX_TOKENS: int = 50000
+    EMBEDDING_BATCH_MAX_ITEMS: int = 1000
+    EMBEDDING_BATCH_MAX_ATTEMPTS: int = 5
+    EMBEDDING_MAX_INPUT_TOKENS: int = 8191
+    EMBEDDING_RPM_LIMIT: int = 3000
+    EMBEDDING_TPM_LIMIT: int = 1000000
+
+    # Public API widget key → tenant/settings cache (per process)
+    WIDGET_CACHE_TTL_SECONDS: float = 60.0
+    WIDGET_CACHE_MAX_SIZE: int = 10000
+
+    # Conversation log writes: "sync" inserts in the request, "stream" queues them
+    # on a Redis stream for the flush_conversation_log task to bulk-insert
+    CONVERSATION_WRITE_MODE: str = "sync"
+    CONVERSATION_STREAM_KEY: str = "conversation_log"
+    CONVERSATION_FLUSH_INTERVAL_SECONDS: float = 2.0
+    CONVERSATION_FLUSH_BATCH_SIZE: int = 500
+    CONVERSATION_FLUSH_MAX_BATCHES: int = 20
+    CONVERSATION_FLUSH_CLAIM_IDLE_SECONDS: int = 60
+
+    # Semantic answer cache (per tenant, invalidated on KB reindex)
+    ANSWER_CACHE_ENABLED: bool = True
+    ANSWER_CACHE_SIMILARITY: float = 0.95
+    ANSWER_CACHE_TTL_SECONDS: int = 86400
+    ANSWER_CACHE_MAX_ENTRIES: int = 500
+    ANSWER_CACHE_MEMORY_MB: int = 64
+
+    # Unanswered-question clustering for KB gap analysis (cluster_unanswered_questions)
+    QUESTION_CLUSTER_SIMILARITY: float = 0.85
+    QUESTION_CLUSTER_INTERVAL_SECONDS: float = 300.0
+    QUESTION_CLUSTER_BATCH_SIZE: int = 1000
+    QUESTION_CLUSTER_MAX_BATCHES: int = 10
+    QUESTION_CLUSTER_SAMPLES: int = 5
 
     # S3 / MinIO (leave S3_ENDPOINT_URL empty for real AWS S3)
     S3_ENDPOINT_URL: str = "http://minio:9000"
@@ -36,6 +112,8 @@ class Settings(BaseSettings):
     # App
     APP_ENV: str = "development"
     LOG_LEVEL: str = "INFO"
+    METRICS_ENABLED: bool = True
+    METRICS_TOKEN: str = ""
     CORS_ORIGINS: str = '["http://localhost:3000"]'
 
     @property
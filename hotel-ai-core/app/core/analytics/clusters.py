@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import numpy as np
+
+# Unanswered questions are grouped by leader clustering on normalized
+# embeddings: a question joins the most similar cluster if its centroid is at
+# least `threshold` cosine-similar, and otherwise starts a new cluster. Clusters
+# are never re-split, so new questions can be added incrementally, a batch at a
+# time, without revisiting old ones.
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+
+def assign_clusters(
+    centroids: np.ndarray, sizes: np.ndarray, vectors: np.ndarray, threshold: float
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Add a batch of question embeddings to existing clusters.
+
+    centroids is (k, d), the mean normalized embedding of each existing
+    cluster, and sizes its (k,) member counts. Returns (labels, centroids,
+    sizes): the cluster index of every vector, and the updated centroids and
+    sizes, where rows from k on are clusters started by this batch.
+    """
+    vectors = normalize_rows(np.asarray(vectors, dtype=np.float32))
+    k, (n, d) = len(centroids), vectors.shape
+    # Running sums; room for every vector to start its own cluster
+    sums = np.zeros((k + n, d), dtype=np.float32)
+    sums[:k] = np.asarray(centroids, dtype=np.float32).reshape(k, d) * np.asarray(sizes)[:, None]
+    counts = np.zeros(k + n, dtype=np.int64)
+    counts[:k] = sizes
+    labels = np.full(n, -1, dtype=np.int64)
+
+    # Questions close to an existing cluster: one matrix product for the batch
+    if k:
+        similarities = vectors @ normalize_rows(sums[:k]).T
+        best = similarities.argmax(axis=1)
+        matched = similarities[np.arange(n), best] >= threshold
+        labels[matched] = best[matched]
+        np.add.at(sums, best[matched], vectors[matched])
+        np.add.at(counts, best[matched], 1)
+
+    # The rest only need comparing with the clusters this batch starts
+    units = np.zeros_like(sums)
+    m = k
+    for i in np.flatnonzero(labels < 0):
+        if m > k:
+            similarities = units[k:m] @ vectors[i]
+            best = int(similarities.argmax())
+            if similarities[best] >= threshold:
+                label = k + best
+                sums[label] += vectors[i]
+                counts[label] += 1
+                units[label] = normalize_rows(sums[label : label + 1])[0]
+                labels[i] = label
+                continue
+        sums[m] = units[m] = vectors[i]
+        counts[m] = 1
+        labels[i] = m
+        m += 1
+
+    return labels, sums[:m] / counts[:m, None], counts[:m]
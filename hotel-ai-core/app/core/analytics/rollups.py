@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import uuid
+from collections.abc import Iterable
+from datetime import date, datetime, timezone
+
+from sqlalchemy import literal
+from sqlalchemy.dialects.postgresql import Insert, insert
+
+from app.db.models import DailyStat
+
+# daily_stats holds per-tenant, per-day (UTC) counters. Every write path adds its
+# deltas through upsert_daily_stats() in the same transaction as the rows being
+# counted, so dashboards read O(days) rows instead of scanning turns/messages.
+# app.workers.analytics.recompute_daily_stats rebuilds the counters from the
+# underlying rows (backfill, or to repair drift).
+
+COUNTERS = (
+    "total_conversations",
+    "total_messages",
+    "fallback_count",
+    "escalations",
+    "total_turns",
+    "latency_ms_sum",
+    "prompt_tokens_sum",
+    "completion_tokens_sum",
+)
+
+
+def stat_day(ts: datetime) -> date:
+    return ts.astimezone(timezone.utc).date()
+
+
+def _empty(tenant_id: uuid.UUID, day: date) -> dict:
+    return {"tenant_id": tenant_id, "date": day, **dict.fromkeys(COUNTERS, 0)}
+
+
+def conversation_deltas(tenant_id: uuid.UUID, started_at: datetime) -> list[dict]:
+    row = _empty(tenant_id, stat_day(started_at))
+    row["total_conversations"] = 1
+    return [row]
+
+
+def turn_deltas(exchanges: Iterable[tuple[list[dict], dict]]) -> list[dict]:
+    """Counter deltas per (tenant, day) for exchanges built by turn_rows().
+
+    Latency is the turn's latency_ms, or for turns recorded without it the time
+    from the user message (request received) to the turn (answer ready).
+    """
+    rows: dict[tuple[uuid.UUID, date], dict] = {}
+
+    def day_row(tenant_id: uuid.UUID, ts: datetime) -> dict:
+        day = stat_day(ts)
+        return rows.setdefault((tenant_id, day), _empty(tenant_id, day))
+
+    for messages, turn in exchanges:
+        # Messages count on their own day, everything else on the turn's
+        for message in messages:
+            day_row(message["tenant_id"], message["created_at"])["total_messages"] += 1
+        received_at = min(m["created_at"] for m in messages)
+        row = day_row(turn["tenant_id"], turn["created_at"])
+        row["total_turns"] += 1
+        row["fallback_count"] += turn["outcome"] == "fallback"
+        row["escalations"] += turn["outcome"] == "escalate"
+        latency_ms = turn.get("latency_ms")
+        if latency_ms is None:
+            latency_ms = max(int((turn["created_at"] - received_at).total_seconds() * 1000), 0)
+        row["latency_ms_sum"] += latency_ms
+        row["prompt_tokens_sum"] += turn.get("prompt_tokens") or 0
+        row["completion_tokens_sum"] += turn.get("completion_tokens") or 0
+    return list(rows.values())
+
+
+def upsert_daily_stats(deltas: list[dict]) -> Insert:
+    """INSERT ... ON CONFLICT that adds the deltas to the existing counters."""
+    # Values are bound as anonymous literals: multi-row VALUES otherwise names its
+    # parameters after the columns (tenant_id_m0, ...), which collide when the
+    # upsert is embedded as a CTE next to another multi-row insert.
+    columns = DailyStat.__table__.c
+    stmt = insert(DailyStat).values(
+        [{name: literal(value, columns[name].type) for name, value in delta.items()} for delta in deltas]
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=[DailyStat.tenant_id, DailyStat.date],
+        set_={name: getattr(DailyStat, name) + getattr(stmt.excluded, name) for name in COUNTERS},
+    )
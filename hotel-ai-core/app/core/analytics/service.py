@@ -6,24 +6,20 @@ from datetime import date
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.models import Conversation, DailyStat, Message, Turn
+from app.core.analytics.rollups import COUNTERS
+from app.db.models import DailyStat, QuestionCluster
 
 
 async def get_stats_overview(
     db: AsyncSession, tenant_id: uuid.UUID, from_date: date, to_date: date
 ) -> dict:
-    stmt = (
-        select(
-            func.coalesce(func.sum(DailyStat.total_conversations), 0).label("total_conversations"),
-            func.coalesce(func.sum(DailyStat.total_messages), 0).label("total_messages"),
-            func.coalesce(func.sum(DailyStat.fallback_count), 0).label("fallback_count"),
-            func.coalesce(func.sum(DailyStat.escalations), 0).label("escalations"),
-        )
-        .where(
-            DailyStat.tenant_id == tenant_id,
-            DailyStat.date >= from_date,
-            DailyStat.date <= to_date,
-        )
+    """Totals over the date range, summed from the daily_stats rollups (one row per day)."""
+    stmt = select(
+        *(func.coalesce(func.sum(getattr(DailyStat, name)), 0).label(name) for name in COUNTERS)
+    ).where(
+        DailyStat.tenant_id == tenant_id,
+        DailyStat.date >= from_date,
+        DailyStat.date <= to_date,
     )
     result = await db.execute(stmt)
     row = result.one()
@@ -32,34 +28,41 @@ async def get_stats_overview(
         "total_messages": row.total_messages,
         "fallback_count": row.fallback_count,
         "escalations": row.escalations,
+        "total_turns": row.total_turns,
+        "avg_latency_ms": round(row.latency_ms_sum / row.total_turns) if row.total_turns else None,
+        "prompt_tokens": row.prompt_tokens_sum,
+        "completion_tokens": row.completion_tokens_sum,
     }
 
 
-async def get_unanswered_turns(
-    db: AsyncSession, tenant_id: uuid.UUID, limit: int = 50
-) -> list[dict]:
+async def get_question_clusters(db: AsyncSession, tenant_id: uuid.UUID, limit: int = 20) -> list[dict]:
+    """The tenant's unanswered questions grouped by similarity, largest groups first.
+
+    Reads the clusters maintained by app.workers.analytics.cluster_unanswered_questions,
+    so questions asked since its last run are not counted yet.
+    """
     stmt = (
         select(
-            Turn.id,
-            Turn.conversation_id,
-            Turn.confidence,
-            Turn.created_at,
-            Message.content.label("user_message"),
+            QuestionCluster.id,
+            QuestionCluster.question_count,
+            QuestionCluster.representative,
+            QuestionCluster.sample_questions,
+            QuestionCluster.first_seen_at,
+            QuestionCluster.last_seen_at,
         )
-        .join(Message, Message.id == Turn.user_message_id)
-        .where(Turn.tenant_id == tenant_id, Turn.outcome.in_(["fallback", "escalate"]))
-        .order_by(Turn.created_at.desc())
+        .where(QuestionCluster.tenant_id == tenant_id)
+        .order_by(QuestionCluster.question_count.desc(), QuestionCluster.last_seen_at.desc())
         .limit(limit)
     )
     result = await db.execute(stmt)
-    rows = result.all()
     return [
         {
-            "turn_id": str(row.id),
-            "conversation_id": str(row.conversation_id),
-            "user_message": row.user_message,
-            "confidence": row.confidence,
-            "created_at": row.created_at.isoformat(),
+            "cluster_id": str(row.id),
+            "question_count": row.question_count,
+            "representative": row.representative,
+            "sample_questions": row.sample_questions,
+            "first_seen_at": row.first_seen_at.isoformat(),
+            "last_seen_at": row.last_seen_at.isoformat(),
         }
-        for row in rows
+        for row in result.all()
     ]
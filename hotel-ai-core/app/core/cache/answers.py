@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import json
+import uuid
+from dataclasses import dataclass
+
+import numpy as np
+import structlog
+from redis.exceptions import RedisError
+
+from app.config import settings
+from app.core.cache.client import get_redis
+from app.core.rag.vector_index import VectorIndexCache
+
+logger = structlog.get_logger()
+
+# Cached entries live under the tenant's current KB version, so bumping the
+# version (see app.core.kb.version) orphans them all at once; the orphaned
+# keys are then reclaimed by their TTL.
+#
+# Entry ids come from a per-version counter, so the newest
+# ANSWER_CACHE_MAX_ENTRIES ids are the live ones: storing entry n evicts entry
+# n - ANSWER_CACHE_MAX_ENTRIES. Each API process keeps the question vectors it
+# has seen in memory and only fetches entries added since its last lookup.
+
+
+@dataclass
+class _QuestionVectors:
+    kb_version: int
+    seq: int  # every entry id up to here has been fetched, or evicted
+    ids: np.ndarray  # (n,) entry ids in matrix row order
+    matrix: np.ndarray  # (n, dim), rows L2-normalized
+
+    @property
+    def nbytes(self) -> int:
+        return self.ids.nbytes + self.matrix.nbytes
+
+
+_vectors = VectorIndexCache(max_bytes=settings.ANSWER_CACHE_MEMORY_MB * 1024 * 1024)
+
+
+def clear_local_vectors() -> None:
+    _vectors.clear()
+
+
+def _entries_key(tenant_id: uuid.UUID, version: int) -> str:
+    return f"answer_cache:{tenant_id}:v{version}"
+
+
+def _vectors_key(tenant_id: uuid.UUID, version: int) -> str:
+    return f"answer_cache:{tenant_id}:v{version}:vec"
+
+
+def _seq_key(tenant_id: uuid.UUID, version: int) -> str:
+    return f"answer_cache:{tenant_id}:v{version}:seq"
+
+
+def _stats_key(tenant_id: uuid.UUID) -> str:
+    return f"answer_cache:stats:{tenant_id}"
+
+
+def _normalize(embedding: list[float]) -> np.ndarray:
+    vec = np.asarray(embedding, dtype=np.float32)
+    norm = np.linalg.norm(vec)
+    return vec / norm if norm else vec
+
+
+async def _sync_vectors(redis, tenant_id: uuid.UUID, kb_version: int, dim: int) -> _QuestionVectors:
+    """The tenant's question vectors, after fetching any entries stored since the last call."""
+    local = _vectors.get(tenant_id, kb_version) or _QuestionVectors(
+        kb_version=kb_version,
+        seq=0,
+        ids=np.empty(0, dtype=np.int64),
+        matrix=np.empty((0, dim), dtype=np.float32),
+    )
+    seq = int(await redis.get(_seq_key(tenant_id, kb_version)) or 0)
+    if seq == local.seq:
+        return local
+
+    oldest = seq - settings.ANSWER_CACHE_MAX_ENTRIES
+    known = set(local.ids.tolist())
+    wanted = [i for i in range(max(local.seq, oldest) + 1, seq + 1) if i not in known]
+    raw = await redis.hmget(_vectors_key(tenant_id, kb_version), [str(i) for i in wanted]) if wanted else []
+    fetched = [(i, value) for i, value in zip(wanted, raw) if value is not None]
+    # An id without a vector is still being stored by another process: fetch it next time
+    missing = [i for i, value in zip(wanted, raw) if value is None]
+
+    keep = local.ids > oldest
+    ids = np.concatenate([local.ids[keep], np.array([i for i, _ in fetched], dtype=np.int64)])
+    matrix = np.vstack([local.matrix[keep], *(np.frombuffer(v, dtype=np.float32)[None, :] for _, v in fetched)])
+    local = _QuestionVectors(kb_version=kb_version, seq=min(missing) - 1 if missing else seq, ids=ids, matrix=matrix)
+    _vectors.put(tenant_id, local)
+    return local
+
+
+async def lookup_cached_answer(
+    tenant_id: uuid.UUID, kb_version: int | None, query_embedding: list[float]
+) -> dict | None:
+    """Return a stored answer whose question is a near neighbour of the query, if any."""
+    if not settings.ANSWER_CACHE_ENABLED or kb_version is None:
+        return None
+
+    redis = get_redis()
+    query = _normalize(query_embedding)
+    try:
+        local = await _sync_vectors(redis, tenant_id, kb_version, len(query))
+        hit = None
+        if len(local.ids):
+            similarities = local.matrix @ query
+            best = int(np.argmax(similarities))
+            if similarities[best] >= settings.ANSWER_CACHE_SIMILARITY:
+                raw = await redis.hget(_entries_key(tenant_id, kb_version), str(local.ids[best]))
+                hit = json.loads(raw) if raw else None
+        await redis.hincrby(_stats_key(tenant_id), "hits" if hit else "misses", 1)
+    except (RedisError, ValueError) as exc:
+        logger.warning("answer_cache.lookup_failed", tenant_id=str(tenant_id), error=str(exc))
+        return None
+
+    if hit:
+        logger.info("answer_cache.hit", tenant_id=str(tenant_id), similarity=float(similarities[best]))
+    return hit
+
+
+async def store_cached_answer(
+    tenant_id: uuid.UUID, kb_version: int | None, query_embedding: list[float], result: dict
+) -> None:
+    """Remember an answered turn so near-identical questions can skip the LLM."""
+    if not settings.ANSWER_CACHE_ENABLED or kb_version is None:
+        return
+
+    redis = get_redis()
+    entries_key = _entries_key(tenant_id, kb_version)
+    vectors_key = _vectors_key(tenant_id, kb_version)
+    seq_key = _seq_key(tenant_id, kb_version)
+    try:
+        entry_id = await redis.incr(seq_key)
+        evicted = entry_id - settings.ANSWER_CACHE_MAX_ENTRIES
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.hset(entries_key, str(entry_id), json.dumps(result))
+            pipe.hset(vectors_key, str(entry_id), _normalize(query_embedding).tobytes())
+            if evicted > 0:
+                pipe.hdel(entries_key, str(evicted))
+                pipe.hdel(vectors_key, str(evicted))
+            for key in (entries_key, vectors_key, seq_key):
+                pipe.expire(key, settings.ANSWER_CACHE_TTL_SECONDS)
+            await pipe.execute()
+    except RedisError as exc:
+        logger.warning("answer_cache.store_failed", tenant_id=str(tenant_id), error=str(exc))
+
+
+async def get_answer_cache_stats(tenant_id: uuid.UUID) -> dict:
+    try:
+        raw = await get_redis().hgetall(_stats_key(tenant_id))
+    except RedisError as exc:
+        logger.warning("answer_cache.stats_failed", tenant_id=str(tenant_id), error=str(exc))
+        raw = {}
+    hits = int(raw.get(b"hits", 0))
+    misses = int(raw.get(b"misses", 0))
+    total = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": hits / total if total else 0.0,
+    }
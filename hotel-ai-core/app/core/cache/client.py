@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import redis
+import redis.asyncio as aioredis
+
+from app.config import settings
+
+_async_client: aioredis.Redis | None = None
+_sync_client: redis.Redis | None = None
+
+
+def _connection_kwargs() -> dict:
+    # Upstash (rediss://) requires explicit SSL config, same as the Celery broker
+    if settings.REDIS_URL.startswith("rediss://"):
+        return {"ssl_cert_reqs": None}
+    return {}
+
+
+def get_redis() -> aioredis.Redis:
+    """Shared asyncio Redis client for the API process."""
+    global _async_client
+    if _async_client is None:
+        _async_client = aioredis.from_url(settings.REDIS_URL, **_connection_kwargs())
+    return _async_client
+
+
+def get_sync_redis() -> redis.Redis:
+    """Shared blocking Redis client for Celery tasks."""
+    global _sync_client
+    if _sync_client is None:
+        _sync_client = redis.Redis.from_url(settings.REDIS_URL, **_connection_kwargs())
+    return _sync_client
+
+
+async def close_redis() -> None:
+    global _async_client
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
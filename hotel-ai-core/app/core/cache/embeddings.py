@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import hashlib
+
+import numpy as np
+import structlog
+from redis.exceptions import RedisError
+
+from app.config import settings
+from app.core.cache.client import get_redis, get_sync_redis
+from app.core.cache.lru import LRUCache
+
+logger = structlog.get_logger()
+
+_local = LRUCache(
+    max_size=settings.EMBEDDING_CACHE_LOCAL_SIZE,
+    ttl_seconds=settings.EMBEDDING_CACHE_LOCAL_TTL_SECONDS,
+)
+
+
+def normalize_text(text: str) -> str:
+    return " ".join(text.split())
+
+
+def cache_key(text: str, model: str | None = None) -> str:
+    model = model or settings.OPENAI_EMBEDDING_MODEL
+    digest = hashlib.sha256(f"{model}\n{normalize_text(text)}".encode()).hexdigest()
+    return f"emb:{digest}"
+
+
+def _pack(embedding: list[float]) -> bytes:
+    return np.asarray(embedding, dtype=np.float32).tobytes()
+
+
+def _unpack(raw: bytes) -> list[float]:
+    return np.frombuffer(raw, dtype=np.float32).tolist()
+
+
+def _lookup_local(keys: list[str]) -> tuple[list[list[float] | None], list[int]]:
+    """Resolve what we can from the LRU; return results plus indexes still missing."""
+    results: list[list[float] | None] = [None] * len(keys)
+    missing = []
+    for i, key in enumerate(keys):
+        raw = _local.get(key)
+        if raw is None:
+            missing.append(i)
+        else:
+            results[i] = _unpack(raw)
+    return results, missing
+
+
+def _fill_from_redis(
+    keys: list[str], results: list[list[float] | None], missing: list[int], raws: list
+) -> None:
+    for i, raw in zip(missing, raws):
+        if raw is not None:
+            _local.set(keys[i], raw)
+            results[i] = _unpack(raw)
+
+
+async def get_cached_embeddings(texts: list[str]) -> list[list[float] | None]:
+    """Look up embeddings for texts; None marks a miss in both tiers."""
+    if not settings.EMBEDDING_CACHE_ENABLED:
+        return [None] * len(texts)
+    keys = [cache_key(t) for t in texts]
+    results, missing = _lookup_local(keys)
+    if missing:
+        try:
+            raws = await get_redis().mget([keys[i] for i in missing])
+        except RedisError as exc:
+            logger.warning("embedding_cache.read_failed", error=str(exc))
+        else:
+            _fill_from_redis(keys, results, missing, raws)
+    return results
+
+
+async def set_cached_embeddings(texts: list[str], embeddings: list[list[float]]) -> None:
+    if not settings.EMBEDDING_CACHE_ENABLED or not texts:
+        return
+    packed = [(cache_key(t), _pack(e)) for t, e in zip(texts, embeddings)]
+    for key, raw in packed:
+        _local.set(key, raw)
+    try:
+        async with get_redis().pipeline(transaction=False) as pipe:
+            for key, raw in packed:
+                pipe.set(key, raw, ex=settings.EMBEDDING_CACHE_REDIS_TTL_SECONDS)
+            await pipe.execute()
+    except RedisError as exc:
+        logger.warning("embedding_cache.write_failed", error=str(exc))
+
+
+def get_cached_embeddings_sync(texts: list[str]) -> list[list[float] | None]:
+    """Blocking variant of get_cached_embeddings for Celery tasks."""
+    if not settings.EMBEDDING_CACHE_ENABLED:
+        return [None] * len(texts)
+    keys = [cache_key(t) for t in texts]
+    results, missing = _lookup_local(keys)
+    if missing:
+        try:
+            raws = get_sync_redis().mget([keys[i] for i in missing])
+        except RedisError as exc:
+            logger.warning("embedding_cache.read_failed", error=str(exc))
+        else:
+            _fill_from_redis(keys, results, missing, raws)
+    return results
+
+
+def set_cached_embeddings_sync(texts: list[str], embeddings: list[list[float]]) -> None:
+    if not settings.EMBEDDING_CACHE_ENABLED or not texts:
+        return
+    packed = [(cache_key(t), _pack(e)) for t, e in zip(texts, embeddings)]
+    for key, raw in packed:
+        _local.set(key, raw)
+    try:
+        with get_sync_redis().pipeline(transaction=False) as pipe:
+            for key, raw in packed:
+                pipe.set(key, raw, ex=settings.EMBEDDING_CACHE_REDIS_TTL_SECONDS)
+            pipe.execute()
+    except RedisError as exc:
+        logger.warning("embedding_cache.write_failed", error=str(exc))
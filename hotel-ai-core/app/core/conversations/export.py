@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+import uuid
+import zlib
+from collections.abc import AsyncIterator
+from datetime import date, datetime, time, timedelta, timezone
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.db.models import Conversation, Message, Turn
+
+# Rows fetched per round trip from the server-side cursor
+_FETCH_SIZE = 1000
+
+COLUMNS = (
+    "conversation_id",
+    "channel",
+    "conversation_status",
+    "started_at",
+    "ended_at",
+    "turn_id",
+    "turn_created_at",
+    "user_message",
+    "assistant_message",
+    "outcome",
+    "confidence",
+    "retrieved_chunk_ids",
+    "prompt_tokens",
+    "completion_tokens",
+    "latency_ms",
+)
+
+
+def _export_query(tenant_id: uuid.UUID, from_date: date | None, to_date: date | None):
+    user_message = aliased(Message)
+    assistant_message = aliased(Message)
+    stmt = (
+        select(
+            Conversation.id.label("conversation_id"),
+            Conversation.channel,
+            Conversation.status.label("conversation_status"),
+            Conversation.started_at,
+            Conversation.ended_at,
+            Turn.id.label("turn_id"),
+            Turn.created_at.label("turn_created_at"),
+            user_message.content.label("user_message"),
+            assistant_message.content.label("assistant_message"),
+            Turn.outcome,
+            Turn.confidence,
+            Turn.retrieved_chunk_ids,
+            Turn.prompt_tokens,
+            Turn.completion_tokens,
+            Turn.latency_ms,
+        )
+        .outerjoin(Turn, Turn.conversation_id == Conversation.id)
+        .outerjoin(user_message, user_message.id == Turn.user_message_id)
+        .outerjoin(assistant_message, assistant_message.id == Turn.assistant_message_id)
+        .where(Conversation.tenant_id == tenant_id)
+        .order_by(Conversation.started_at, Conversation.id, Turn.created_at)
+    )
+    if from_date:
+        stmt = stmt.where(Conversation.started_at >= datetime.combine(from_date, time.min, timezone.utc))
+    if to_date:
+        stmt = stmt.where(
+            Conversation.started_at < datetime.combine(to_date + timedelta(days=1), time.min, timezone.utc)
+        )
+    return stmt
+
+
+async def iter_export_rows(
+    db: AsyncSession,
+    tenant_id: uuid.UUID,
+    from_date: date | None = None,
+    to_date: date | None = None,
+) -> AsyncIterator[list[dict]]:
+    """A tenant's conversations with their turns, in batches of row dicts.
+
+    One row per turn (question, answer, outcome, ...), plus one row with empty
+    turn fields for a conversation without turns; conversations are in start
+    order, filtered by UTC start day (inclusive). Rows are streamed through a
+    server-side cursor, so memory stays flat whatever the range.
+    """
+    stmt = _export_query(tenant_id, from_date, to_date).execution_options(yield_per=_FETCH_SIZE)
+    result = await db.stream(stmt)
+    async for partition in result.mappings().partitions():
+        yield [dict(row) for row in partition]
+
+
+def _text(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, list):
+        return json.dumps(value)
+    return str(value)
+
+
+async def ndjson_lines(batches: AsyncIterator[list[dict]]) -> AsyncIterator[bytes]:
+    async for rows in batches:
+        yield "".join(json.dumps(row, default=_text, ensure_ascii=False) + "\n" for row in rows).encode()
+
+
+async def csv_lines(batches: AsyncIterator[list[dict]]) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(COLUMNS)
+    async for rows in batches:
+        writer.writerows([_text(row[column]) for column in COLUMNS] for row in rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    # Header only, for an empty export
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+async def gzipped(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Compress a byte stream into a single gzip member as it is produced."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import base64
+import uuid
+from datetime import date, datetime, time, timedelta, timezone
+
+from sqlalchemy import exists, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import Conversation, Message, Turn
+
+
+def encode_cursor(started_at: datetime, conversation_id: uuid.UUID) -> str:
+    raw = f"{started_at.isoformat()}|{conversation_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    """Inverse of encode_cursor; raises ValueError for anything it did not produce."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        started_at, conversation_id = raw.split("|")
+        return datetime.fromisoformat(started_at), uuid.UUID(conversation_id)
+    except (UnicodeDecodeError, ValueError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+async def list_conversations(
+    db: AsyncSession,
+    tenant_id: uuid.UUID,
+    limit: int = 50,
+    after: tuple[datetime, uuid.UUID] | None = None,
+    from_date: date | None = None,
+    to_date: date | None = None,
+    status: str | None = None,
+    outcome: str | None = None,
+) -> dict:
+    """One page of a tenant's conversations, newest first.
+
+    Keyset pagination on (started_at, id), walking ix_conversations_tenant_started,
+    so every page costs the same however deep it is. Returns {"items": [...],
+    "next_cursor": str | None}; the decoded next_cursor, passed back as `after`,
+    gives the following page. Dates are UTC days, inclusive.
+    """
+    page = select(Conversation).where(Conversation.tenant_id == tenant_id)
+    if after:
+        page = page.where(tuple_(Conversation.started_at, Conversation.id) < after)
+    if from_date:
+        page = page.where(Conversation.started_at >= datetime.combine(from_date, time.min, timezone.utc))
+    if to_date:
+        page = page.where(
+            Conversation.started_at < datetime.combine(to_date + timedelta(days=1), time.min, timezone.utc)
+        )
+    if status:
+        page = page.where(Conversation.status == status)
+    if outcome:
+        page = page.where(
+            exists().where(Turn.conversation_id == Conversation.id, Turn.outcome == outcome)
+        )
+    # One extra row tells whether there is a next page
+    page = (
+        page.order_by(Conversation.started_at.desc(), Conversation.id.desc())
+        .limit(limit + 1)
+        .subquery()
+    )
+
+    # Message counts for just this page's conversations, in the same query
+    counts = (
+        select(Message.conversation_id, func.count().label("message_count"))
+        .where(Message.conversation_id.in_(select(page.c.id)))
+        .group_by(Message.conversation_id)
+        .subquery()
+    )
+    stmt = (
+        select(page, func.coalesce(counts.c.message_count, 0).label("message_count"))
+        .outerjoin(counts, counts.c.conversation_id == page.c.id)
+        .order_by(page.c.started_at.desc(), page.c.id.desc())
+    )
+    rows = (await db.execute(stmt)).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].started_at, rows[-1].id)
+
+    return {
+        "items": [
+            {
+                "id": str(row.id),
+                "channel": row.channel,
+                "status": row.status,
+                "started_at": row.started_at.isoformat(),
+                "ended_at": row.ended_at.isoformat() if row.ended_at else None,
+                "message_count": row.message_count,
+            }
+            for row in rows
+        ],
+        "next_cursor": next_cursor,
+    }
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import json
+import uuid
+from datetime import datetime
+
+from app.config import settings
+from app.core.cache.client import get_redis
+
+# Write-behind conversation log. Each chat exchange is one stream entry holding
+# the rows turn_rows() built for it; app.workers.conversations bulk-inserts them.
+# Rows carry their own ids, so replaying an entry is harmless.
+
+_UUID_FIELDS = ("id", "tenant_id", "conversation_id", "user_message_id", "assistant_message_id")
+
+
+def encode_turn(messages: list[dict], turn: dict) -> dict[str, str]:
+    """Stream entry fields for one exchange."""
+    return {"data": json.dumps({"messages": messages, "turn": turn}, default=str)}
+
+
+def _decode_row(row: dict) -> dict:
+    for field in _UUID_FIELDS:
+        if field in row:
+            row[field] = uuid.UUID(row[field])
+    row["created_at"] = datetime.fromisoformat(row["created_at"])
+    return row
+
+
+def decode_turn(fields: dict) -> tuple[list[dict], dict]:
+    """Inverse of encode_turn; accepts the raw (bytes) fields read back from Redis."""
+    data = json.loads(fields.get(b"data") or fields["data"])
+    messages = [_decode_row(m) for m in data["messages"]]
+    turn = _decode_row(data["turn"])
+    # Entries queued before token counts and latency were recorded; rows in one
+    # bulk insert need the same columns
+    for message in messages:
+        message.setdefault("token_count", None)
+    for field in ("prompt_tokens", "completion_tokens", "latency_ms"):
+        turn.setdefault(field, None)
+    return messages, turn
+
+
+async def enqueue_turn(messages: list[dict], turn: dict) -> None:
+    await get_redis().xadd(settings.CONVERSATION_STREAM_KEY, encode_turn(messages, turn))
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import uuid
+from datetime import datetime, timezone
+
+import structlog
+from redis.exceptions import RedisError
+from sqlalchemy import and_, exists, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.core.analytics.rollups import turn_deltas, upsert_daily_stats
+from app.core.conversations.log import enqueue_turn
+from app.core.llm.tokens import count_tokens
+from app.core.tenants.cache import (
+    WidgetContext,
+    cache_widget_context,
+    get_cached_widget_context,
+    widget_context_from_row,
+    widget_context_query,
+)
+from app.db.models import Conversation, Message, Turn, WidgetKey
+
+logger = structlog.get_logger()
+
+
+async def resolve_conversation(
+    db: AsyncSession, widget_key: str, conversation_id: uuid.UUID
+) -> tuple[WidgetContext | None, bool]:
+    """Resolve a widget key and check the conversation belongs to its tenant.
+
+    Returns (widget context or None if the key is invalid, conversation found).
+    One query at most: the conversation check alone when the widget key is cached,
+    otherwise the widget key lookup with the conversation outer-joined onto it.
+    """
+    ctx = get_cached_widget_context(widget_key)
+    if ctx is not None:
+        found = await db.scalar(
+            select(
+                exists().where(Conversation.id == conversation_id, Conversation.tenant_id == ctx.tenant_id)
+            )
+        )
+        return ctx, bool(found)
+
+    stmt = (
+        widget_context_query(widget_key)
+        .add_columns(Conversation.id.label("conversation_id"))
+        .outerjoin(
+            Conversation,
+            and_(Conversation.id == conversation_id, Conversation.tenant_id == WidgetKey.tenant_id),
+        )
+    )
+    row = (await db.execute(stmt)).one_or_none()
+    if row is None:
+        return None, False
+    ctx = widget_context_from_row(row)
+    cache_widget_context(widget_key, ctx)
+    return ctx, row.conversation_id is not None
+
+
+def _strip_nul(text: str | None) -> str | None:
+    # Postgres text columns can't hold NUL characters
+    return text.replace("\x00", "") if text else text
+
+
+def turn_rows(
+    tenant_id: uuid.UUID,
+    conversation_id: uuid.UUID,
+    user_text: str,
+    rag_result: dict,
+    received_at: datetime,
+    answered_at: datetime | None = None,
+) -> tuple[list[dict], dict]:
+    """Rows for one chat exchange: ([user message, assistant message], turn).
+
+    Ids and timestamps are set here rather than by the database so the rows can be
+    written in one statement (or later, by a write-behind worker) and still keep
+    the order in which the exchange happened.
+    """
+    answered_at = answered_at or datetime.now(timezone.utc)
+    user_text = _strip_nul(user_text)
+    user_message_id, assistant_message_id = uuid.uuid4(), uuid.uuid4()
+    # Only set when the LLM was called for this turn
+    usage = rag_result.get("usage") or {}
+    answer_text = _strip_nul(rag_result.get("answer_text"))
+    if usage.get("completion_tokens"):
+        answer_tokens = usage["completion_tokens"]
+    else:
+        answer_tokens = count_tokens(answer_text, settings.OPENAI_CHAT_MODEL) if answer_text else None
+    messages = [
+        {
+            "id": user_message_id,
+            "tenant_id": tenant_id,
+            "conversation_id": conversation_id,
+            "role": "user",
+            "content": user_text,
+            "token_count": count_tokens(user_text, settings.OPENAI_CHAT_MODEL),
+            "created_at": received_at,
+        },
+        {
+            "id": assistant_message_id,
+            "tenant_id": tenant_id,
+            "conversation_id": conversation_id,
+            "role": "assistant",
+            "content": answer_text,
+            "token_count": answer_tokens,
+            "created_at": answered_at,
+        },
+    ]
+    turn = {
+        "id": uuid.uuid4(),
+        "tenant_id": tenant_id,
+        "conversation_id": conversation_id,
+        "user_message_id": user_message_id,
+        "assistant_message_id": assistant_message_id,
+        "outcome": rag_result["outcome"],
+        "confidence": rag_result["confidence"],
+        "retrieved_chunk_ids": [c["chunk_id"] for c in rag_result.get("citations", [])],
+        "prompt_tokens": usage.get("prompt_tokens"),
+        "completion_tokens": usage.get("completion_tokens"),
+        "latency_ms": max(int((answered_at - received_at).total_seconds() * 1000), 0),
+        "created_at": answered_at,
+    }
+    return messages, turn
+
+
+async def record_turn(
+    db: AsyncSession,
+    tenant_id: uuid.UUID,
+    conversation_id: uuid.UUID,
+    user_text: str,
+    rag_result: dict,
+    received_at: datetime,
+) -> None:
+    """Persist one chat exchange according to CONVERSATION_WRITE_MODE.
+
+    In "stream" mode the rows are queued on the conversation log stream and
+    inserted later by the flush_conversation_log task; if Redis is unavailable
+    they are inserted here instead, so an exchange is never dropped.
+    """
+    messages, turn = turn_rows(tenant_id, conversation_id, user_text, rag_result, received_at)
+    if settings.CONVERSATION_WRITE_MODE == "stream":
+        try:
+            await enqueue_turn(messages, turn)
+            return
+        except RedisError as exc:
+            logger.warning("conversation_log.enqueue_failed", conversation_id=str(conversation_id), error=str(exc))
+    await insert_turn(db, messages, turn)
+
+
+async def insert_turn(db: AsyncSession, messages: list[dict], turn: dict) -> None:
+    """Insert an exchange's two messages and turn, and count it in daily_stats, in a single statement."""
+    # The messages and the daily_stats upsert go in through data-modifying CTEs; the
+    # turn's foreign keys are checked at the end of the statement, after both
+    # messages exist.
+    message_insert = insert(Message).values(messages).cte("new_messages")
+    stats_upsert = upsert_daily_stats(turn_deltas([(messages, turn)])).cte("daily_stats_upsert")
+    await db.execute(insert(Turn).values(turn).add_cte(message_insert).add_cte(stats_upsert))
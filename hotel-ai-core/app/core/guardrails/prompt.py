@@ -1,27 +1,18 @@
 from __future__ import annotations
 
+import hashlib
 
-def build_system_prompt(
-    context: str,
-    escalation_phone: str | None = None,
-    escalation_email: str | None = None,
-) -> str:
-    escalation_info = ""
-    if escalation_phone or escalation_email:
-        parts = []
-        if escalation_phone:
-            parts.append(f"Phone: {escalation_phone}")
-        if escalation_email:
-            parts.append(f"Email: {escalation_email}")
-        escalation_info = (
-            "\n\nIf you cannot answer from the provided context, direct the guest to contact:\n"
-            + "\n".join(parts)
-        )
-
-    return f"""You are a helpful hotel concierge assistant.
+# The prompt is laid out most-static first so provider-side prompt caching can
+# reuse the longest possible prefix:
+#   1. SYSTEM_RULES     - byte-identical for every tenant and request
+#   2. tenant section   - changes only when the tenant's settings change
+#   3. context section  - retrieved passages, different on every turn
+# Keep anything request-specific out of the first two parts.
+
+SYSTEM_RULES = """You are a helpful hotel concierge assistant.
 You MUST reply in the same language the guest uses. You support Swedish and English.
 If the guest writes in Swedish, reply entirely in Swedish. If in English, reply in English.
-Answer guest questions using ONLY the context provided below.
+Answer guest questions using ONLY the context provided at the end of these instructions.
 
 STRICT RULES:
 1. Only answer using the provided context. Do NOT make up information.
@@ -29,9 +20,42 @@ STRICT RULES:
 3. Do NOT guess prices, availability, legal policies, or special offers.
 4. Be concise, friendly, and professional.
 5. If you reference information, mention which source it comes from.
-6. Always match the guest's language — never switch languages unless the guest does.
-{escalation_info}
+6. Always match the guest's language — never switch languages unless the guest does."""
+
+
+def build_tenant_section(
+    escalation_phone: str | None = None,
+    escalation_email: str | None = None,
+) -> str:
+    if not (escalation_phone or escalation_email):
+        return ""
+    parts = []
+    if escalation_phone:
+        parts.append(f"Phone: {escalation_phone}")
+    if escalation_email:
+        parts.append(f"Email: {escalation_email}")
+    return (
+        "\n\nIf you cannot answer from the provided context, direct the guest to contact:\n"
+        + "\n".join(parts)
+    )
+
+
+def build_context_section(context: str) -> str:
+    return f"""
 
 --- CONTEXT START ---
 {context}
 --- CONTEXT END ---"""
+
+
+def prompt_cache_key(tenant_section: str) -> str:
+    """Identifies the cacheable prefix (rules + tenant section) of a system prompt."""
+    return hashlib.sha256((SYSTEM_RULES + tenant_section).encode()).hexdigest()[:32]
+
+
+def build_system_prompt(
+    context: str,
+    escalation_phone: str | None = None,
+    escalation_email: str | None = None,
+) -> str:
+    return SYSTEM_RULES + build_tenant_section(escalation_phone, escalation_email) + build_context_section(context)
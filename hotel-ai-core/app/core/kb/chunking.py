@@ -1,16 +1,86 @@
 from __future__ import annotations
 
 import hashlib
+import uuid
+from bisect import bisect_right
+from collections import defaultdict
+from collections.abc import Iterable, Iterator
+
+
+def _make_chunk(segment: str, page_start: int | None = None, page_end: int | None = None) -> dict:
+    return {
+        "chunk_text": segment,
+        "chunk_hash": hashlib.sha256(segment.encode()).hexdigest(),
+        "page_start": page_start,
+        "page_end": page_end,
+    }
+
+
+def iter_page_chunks(
+    pages: Iterable[tuple[int | None, str]], chunk_size: int = 800, overlap: int = 200
+) -> Iterator[dict]:
+    """Chunk a stream of (page_number, text) segments, tracking which pages each chunk spans.
+
+    Chunk text is the same as chunk_text() over the concatenated segments. Only the
+    text not yet covered by an emitted chunk is kept in memory.
+    """
+    step = chunk_size - overlap
+    buffer = ""
+    marks: list[tuple[int, int | None]] = []  # (offset into buffer, page) where each segment starts
+
+    def page_at(offset: int) -> int | None:
+        i = bisect_right(marks, offset, key=lambda m: m[0]) - 1
+        return marks[i][1] if i >= 0 else None
+
+    def emit(start: int) -> dict:
+        end = min(start + chunk_size, len(buffer))
+        return _make_chunk(buffer[start:end], page_at(start), page_at(end - 1))
+
+    for page, segment in pages:
+        if not segment:
+            continue
+        marks.append((len(buffer), page))
+        buffer += segment
+        start = 0
+        while len(buffer) - start >= chunk_size:
+            yield emit(start)
+            start += step
+        if start:
+            first = bisect_right(marks, start, key=lambda m: m[0]) - 1
+            marks = [(0, marks[first][1])] + [(o - start, p) for o, p in marks[first + 1 :]]
+            buffer = buffer[start:]
+    for start in range(0, len(buffer), step):
+        yield emit(start)
 
 
 def chunk_text(text: str, chunk_size: int = 800, overlap: int = 200) -> list[dict]:
     """Split text into overlapping chunks and return list of {chunk_text, chunk_hash}."""
-    chunks: list[dict] = []
-    start = 0
-    while start < len(text):
-        end = start + chunk_size
-        segment = text[start:end]
-        chunk_hash = hashlib.sha256(segment.encode()).hexdigest()
-        chunks.append({"chunk_text": segment, "chunk_hash": chunk_hash})
-        start += chunk_size - overlap
-    return chunks
+    return list(iter_page_chunks([(None, text)], chunk_size, overlap))
+
+
+def index_chunk_hashes(existing: Iterable[tuple[uuid.UUID, str]]) -> dict[str, list[uuid.UUID]]:
+    stored: dict[str, list[uuid.UUID]] = defaultdict(list)
+    for chunk_id, chunk_hash in existing:
+        stored[chunk_hash].append(chunk_id)
+    return stored
+
+
+def match_chunks(
+    stored: dict[str, list[uuid.UUID]], new_chunks: Iterable[dict]
+) -> tuple[list[dict], list[tuple[uuid.UUID, dict]]]:
+    """Claim stored chunks with the same hash.
+
+    Returns (chunks_to_add, kept) where kept pairs each claimed stored id with the new
+    chunk it matched. Claimed ids are removed from `stored`, so whatever is left
+    afterwards has vanished.
+    """
+    to_add = []
+    kept = []
+    for chunk in new_chunks:
+        ids = stored.get(chunk["chunk_hash"])
+        if ids:
+            kept.append((ids.pop(), chunk))
+        else:
+            to_add.append(chunk)
+    return to_add, kept
+
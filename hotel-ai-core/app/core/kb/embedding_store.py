@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import hashlib
+
+from sqlalchemy import Connection, select
+from sqlalchemy.dialects.postgresql import insert
+
+from app.db.models import SharedEmbedding
+
+_LOOKUP_BATCH = 1000
+
+
+def content_hash(text: str) -> str:
+    """Same SHA-256 as chunk_text's chunk_hash."""
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def load_shared_embeddings(conn: Connection, hashes: list[str], model: str) -> dict[str, list[float]]:
+    found: dict[str, list[float]] = {}
+    unique = list(dict.fromkeys(hashes))
+    for i in range(0, len(unique), _LOOKUP_BATCH):
+        stmt = select(SharedEmbedding.content_hash, SharedEmbedding.embedding).where(
+            SharedEmbedding.model == model,
+            SharedEmbedding.content_hash.in_(unique[i : i + _LOOKUP_BATCH]),
+        )
+        for row in conn.execute(stmt):
+            found[row.content_hash] = row.embedding.tolist()
+    return found
+
+
+def save_shared_embeddings(conn: Connection, embeddings: dict[str, list[float]], model: str) -> None:
+    if not embeddings:
+        return
+    rows = [{"content_hash": h, "model": model, "embedding": e} for h, e in embeddings.items()]
+    conn.execute(insert(SharedEmbedding).on_conflict_do_nothing(), rows)
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import uuid
+
+from sqlalchemy import Connection, text
+
+from app.config import settings
+
+# kb_embeddings is list-partitioned with one partition per tenant (migration
+# 005), so a tenant's HNSW index holds only its own vectors and a search needs
+# no filtering after the graph walk. Partitions of new tenants are created by the
+# create_embedding_partitions beat task, or by their first ingest at the latest.
+
+
+def partition_name(tenant_id: uuid.UUID | str) -> str:
+    return f"kb_embeddings_{uuid.UUID(str(tenant_id)).hex}"
+
+
+def tenants_without_partition(conn: Connection) -> list[uuid.UUID]:
+    return list(
+        conn.scalars(
+            text(
+                "SELECT id FROM tenants "
+                "WHERE to_regclass('kb_embeddings_' || replace(id::text, '-', '')) IS NULL "
+                "ORDER BY created_at"
+            )
+        )
+    )
+
+
+def ensure_embedding_partition(conn: Connection, tenant_id: uuid.UUID | str) -> None:
+    """Create and attach the tenant's kb_embeddings partition if it is missing.
+
+    Attaching copies kb_embeddings' foreign keys to the partition, which takes
+    SHARE ROW EXCLUSIVE on kb_chunks and tenants besides SHARE UPDATE EXCLUSIVE on
+    kb_embeddings. That waits for every open transaction that wrote kb_chunks (a
+    running ingest holds one for the whole document), and while it waits it
+    blocks all other writers to kb_chunks. So the attach gives up after
+    KB_PARTITION_LOCK_TIMEOUT_MS, raising OperationalError (lock_not_available);
+    the caller tries again later.
+    """
+    name = partition_name(tenant_id)
+    if conn.scalar(text("SELECT to_regclass(:name)"), {"name": name}) is not None:
+        return
+    conn.execute(text("SELECT pg_advisory_xact_lock(hashtext(:name))"), {"name": name})
+    if conn.scalar(text("SELECT to_regclass(:name)"), {"name": name}) is not None:
+        return
+    conn.execute(
+        text("SELECT set_config('lock_timeout', :timeout, true)"),
+        {"timeout": f"{settings.KB_PARTITION_LOCK_TIMEOUT_MS}ms"},
+    )
+    conn.execute(text(f"CREATE TABLE {name} (LIKE kb_embeddings INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+    conn.execute(
+        text(f"ALTER TABLE kb_embeddings ATTACH PARTITION {name} FOR VALUES IN ('{uuid.UUID(str(tenant_id))}')")
+    )
+
+
+def drop_embedding_partition(conn: Connection, tenant_id: uuid.UUID | str) -> None:
+    """Drop a deleted tenant's partition (briefly locks kb_embeddings exclusively)."""
+    conn.execute(text(f"DROP TABLE IF EXISTS {partition_name(tenant_id)}"))
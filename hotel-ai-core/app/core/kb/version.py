@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import uuid
+
+import structlog
+from redis.exceptions import RedisError
+
+from app.core.cache.client import get_redis, get_sync_redis
+
+logger = structlog.get_logger()
+
+
+def _version_key(tenant_id: uuid.UUID | str) -> str:
+    return f"kb_version:{tenant_id}"
+
+
+async def get_kb_version(tenant_id: uuid.UUID) -> int | None:
+    """Current KB version for a tenant, or None if Redis is unavailable."""
+    try:
+        value = await get_redis().get(_version_key(tenant_id))
+    except RedisError as exc:
+        logger.warning("kb_version.read_failed", tenant_id=str(tenant_id), error=str(exc))
+        return None
+    return int(value) if value else 0
+
+
+async def bump_kb_version(tenant_id: uuid.UUID) -> None:
+    try:
+        await get_redis().incr(_version_key(tenant_id))
+    except RedisError as exc:
+        logger.error("kb_version.bump_failed", tenant_id=str(tenant_id), error=str(exc))
+
+
+def bump_kb_version_sync(tenant_id: uuid.UUID | str) -> None:
+    """Sync variant used by the ingest worker once a document has been reindexed."""
+    try:
+        get_sync_redis().incr(_version_key(tenant_id))
+    except RedisError as exc:
+        logger.error("kb_version.bump_failed", tenant_id=str(tenant_id), error=str(exc))
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from functools import lru_cache
+
+import structlog
+import tiktoken
+
+logger = structlog.get_logger()
+
+
+@lru_cache
+def _encoding(model: str) -> tiktoken.Encoding | None:
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("cl100k_base")
+    except Exception as exc:
+        # tiktoken downloads its BPE files on first use; without them we estimate
+        logger.warning("tokens.encoding_unavailable", model=model, error=str(exc))
+        return None
+
+
+def count_tokens(text: str, model: str) -> int:
+    encoding = _encoding(model)
+    if encoding is None:
+        return len(text) // 4 + 1
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_tokens(text: str, max_tokens: int, model: str) -> str:
+    """Cut `text` down to its first `max_tokens` tokens."""
+    encoding = _encoding(model)
+    if encoding is None:
+        # Without the encoding, one character per token never runs over
+        return text[:max_tokens]
+    tokens = encoding.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+    return encoding.decode(tokens[:max_tokens])
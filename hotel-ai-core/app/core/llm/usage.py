@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import uuid
+
+import structlog
+from redis.exceptions import RedisError
+
+from app.core.cache.client import get_redis
+
+logger = structlog.get_logger()
+
+
+def _stats_key(tenant_id: uuid.UUID) -> str:
+    return f"llm_usage:stats:{tenant_id}"
+
+
+def usage_tokens(usage) -> dict:
+    """Prompt/completion token counts from a chat completion's usage field."""
+    if usage is None:
+        return {"prompt_tokens": 0, "cached_tokens": 0, "completion_tokens": 0}
+    details = getattr(usage, "prompt_tokens_details", None)
+    return {
+        "prompt_tokens": usage.prompt_tokens or 0,
+        "cached_tokens": (getattr(details, "cached_tokens", None) or 0) if details else 0,
+        "completion_tokens": usage.completion_tokens or 0,
+    }
+
+
+async def record_usage(tenant_id: uuid.UUID, cache_key: str, usage) -> dict:
+    """Log a completion's token usage and add it to the tenant's prompt-cache counters."""
+    tokens = usage_tokens(usage)
+    logger.info("llm.usage", tenant_id=str(tenant_id), prompt_cache_key=cache_key, **tokens)
+    try:
+        async with get_redis().pipeline(transaction=False) as pipe:
+            pipe.hincrby(_stats_key(tenant_id), "requests", 1)
+            for field, value in tokens.items():
+                pipe.hincrby(_stats_key(tenant_id), field, value)
+            await pipe.execute()
+    except RedisError as exc:
+        logger.warning("llm_usage.record_failed", tenant_id=str(tenant_id), error=str(exc))
+    return tokens
+
+
+async def get_prompt_cache_stats(tenant_id: uuid.UUID) -> dict:
+    try:
+        raw = await get_redis().hgetall(_stats_key(tenant_id))
+    except RedisError as exc:
+        logger.warning("llm_usage.stats_failed", tenant_id=str(tenant_id), error=str(exc))
+        raw = {}
+    prompt_tokens = int(raw.get(b"prompt_tokens", 0))
+    cached_tokens = int(raw.get(b"cached_tokens", 0))
+    return {
+        "requests": int(raw.get(b"requests", 0)),
+        "prompt_tokens": prompt_tokens,
+        "cached_tokens": cached_tokens,
+        "uncached_tokens": prompt_tokens - cached_tokens,
+        "completion_tokens": int(raw.get(b"completion_tokens", 0)),
+        "cached_ratio": cached_tokens / prompt_tokens if prompt_tokens else 0.0,
+    }
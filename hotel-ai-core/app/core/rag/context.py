@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+from app.config import settings
+from app.core.llm.tokens import count_tokens
+
+# The chunker repeats the last 200 characters of a chunk at the start of the next
+# one; any shared run at least this long is treated as such an overlap.
+_MIN_OVERLAP = 40
+
+
+def source_label(passage: dict) -> str:
+    start, end = passage.get("page_start"), passage.get("page_end")
+    if start is None:
+        return passage["title"]
+    if end is None or end == start:
+        return f"{passage['title']}, p. {start}"
+    return f"{passage['title']}, pp. {start}-{end}"
+
+
+def format_passage(passage: dict) -> str:
+    return f"[Source: {source_label(passage)}]\n{passage['text']}"
+
+
+def _shingles(text: str, size: int = 3) -> set[tuple[str, ...]]:
+    words = text.lower().split()
+    return {tuple(words[i : i + size]) for i in range(max(len(words) - size + 1, 1))}
+
+
+def _jaccard(a: set, b: set) -> float:
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+def _join_overlapping(first: str, second: str) -> str | None:
+    """first + second with their shared run written once, if second continues first."""
+    probe = second[:_MIN_OVERLAP]
+    start = first.find(probe, max(len(first) - len(second), 0))
+    while start != -1:
+        tail = first[start:]
+        if second.startswith(tail):
+            return first + second[len(tail) :]
+        start = first.find(probe, start + 1)
+    return None
+
+
+def _merge_text(a: str, b: str) -> str | None:
+    if b in a:
+        return a
+    if a in b:
+        return b
+    return _join_overlapping(a, b) or _join_overlapping(b, a)
+
+
+def _min_page(*pages: int | None) -> int | None:
+    known = [p for p in pages if p is not None]
+    return min(known) if known else None
+
+
+def _max_page(*pages: int | None) -> int | None:
+    known = [p for p in pages if p is not None]
+    return max(known) if known else None
+
+
+def _merged(passage: dict, other: dict, text: str) -> dict:
+    return {
+        **passage,
+        "text": text,
+        "chunks": passage["chunks"] + other["chunks"],
+        "page_start": _min_page(passage["page_start"], other["page_start"]),
+        "page_end": _max_page(passage["page_end"], other["page_end"]),
+        "similarity": max(passage["similarity"], other["similarity"]),
+    }
+
+
+def pack_context(chunks: list[dict], max_tokens: int | None = None, model: str | None = None) -> list[dict]:
+    """Select retrieved chunks for the prompt within a token budget.
+
+    Chunks are taken most relevant first (fused RRF score from hybrid retrieval,
+    otherwise vector similarity). A chunk that continues or overlaps an
+    already selected chunk of the same document is merged into it (the overlap is
+    written once); a near-duplicate of a selected chunk is dropped; a chunk that
+    would push the context past max_tokens is skipped.
+
+    Returns passages {document_id, title, text, page_start, page_end, similarity,
+    chunks} in selection order, where chunks are the retrieved chunks the passage covers.
+    """
+    budget = max_tokens or settings.RAG_CONTEXT_MAX_TOKENS
+    model = model or settings.OPENAI_CHAT_MODEL
+    dedup_threshold = settings.RAG_CONTEXT_DEDUP_SIMILARITY
+
+    passages: list[dict] = []
+    shingles: list[set] = []
+    used = 0
+
+    for chunk in sorted(chunks, key=lambda c: c.get("rrf_score", c["similarity"]), reverse=True):
+        candidate = {
+            "document_id": chunk["document_id"],
+            "title": chunk["title"],
+            "text": chunk["chunk_text"],
+            "page_start": chunk.get("page_start"),
+            "page_end": chunk.get("page_end"),
+            "similarity": chunk["similarity"],
+            "chunks": [chunk],
+        }
+        candidate_shingles = _shingles(candidate["text"])
+        if any(_jaccard(candidate_shingles, s) >= dedup_threshold for s in shingles):
+            continue
+
+        # Merge into a passage of the same document it overlaps with, if any
+        for i, passage in enumerate(passages):
+            if passage["document_id"] != candidate["document_id"]:
+                continue
+            text = _merge_text(passage["text"], candidate["text"])
+            if text is None:
+                continue
+            merged = _merged(passage, candidate, text)
+            cost = count_tokens(format_passage(merged), model) - count_tokens(format_passage(passage), model)
+            if used + cost <= budget:
+                passages[i] = merged
+                shingles[i] = _shingles(text)
+                used += cost
+            break
+        else:
+            cost = count_tokens(format_passage(candidate), model)
+            if used + cost <= budget:
+                passages.append(candidate)
+                shingles.append(candidate_shingles)
+                used += cost
+
+    return passages
@@ -1,26 +1,26 @@
 from __future__ import annotations
 
-from openai import AsyncOpenAI
-
 from app.config import settings
-
-_client: AsyncOpenAI | None = None
-
-
-def _get_client() -> AsyncOpenAI:
-    global _client
-    if _client is None:
-        _client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
-    return _client
+from app.core.cache.embeddings import get_cached_embeddings, set_cached_embeddings
+from app.core.llm.clients import get_async_client
 
 
 async def embed_text(text: str) -> list[float]:
-    client = _get_client()
-    resp = await client.embeddings.create(input=[text], model=settings.OPENAI_EMBEDDING_MODEL)
-    return resp.data[0].embedding
+    return (await embed_texts([text]))[0]
 
 
 async def embed_texts(texts: list[str]) -> list[list[float]]:
-    client = _get_client()
-    resp = await client.embeddings.create(input=texts, model=settings.OPENAI_EMBEDDING_MODEL)
-    return [item.embedding for item in resp.data]
+    """Embed texts, only calling the API for ones missing from the embedding cache."""
+    results = await get_cached_embeddings(texts)
+    missing = list(dict.fromkeys(t for t, e in zip(texts, results) if e is None))
+    if missing:
+        client = get_async_client()
+        resp = await client.embeddings.create(
+            input=missing,
+            model=settings.OPENAI_EMBEDDING_MODEL,
+            timeout=settings.OPENAI_EMBEDDING_TIMEOUT_SECONDS,
+        )
+        fresh = {t: item.embedding for t, item in zip(missing, resp.data)}
+        await set_cached_embeddings(missing, [fresh[t] for t in missing])
+        results = [e if e is not None else fresh[t] for t, e in zip(texts, results)]
+    return results
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import asyncio
+import uuid
+
+import structlog
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.config import settings
+from app.core.rag.lexical import search_lexical_chunks
+from app.core.rag.retrieval import search_similar_chunks
+from app.db.session import SessionScope
+
+logger = structlog.get_logger()
+
+
+def reciprocal_rank_fusion(result_lists: list[list[dict]], top_k: int, k: int = 60) -> list[dict]:
+    """Merge ranked chunk lists: each chunk scores sum(1 / (k + rank)) over the lists it is in."""
+    scores: dict[str, float] = {}
+    merged: dict[str, dict] = {}
+    for results in result_lists:
+        for rank, chunk in enumerate(results, start=1):
+            chunk_id = chunk["chunk_id"]
+            scores[chunk_id] = scores.get(chunk_id, 0.0) + 1.0 / (k + rank)
+            merged[chunk_id] = {**chunk, **merged.get(chunk_id, {})}
+    ranked = sorted(scores, key=scores.get, reverse=True)[:top_k]
+    return [{**merged[chunk_id], "rrf_score": scores[chunk_id]} for chunk_id in ranked]
+
+
+async def _vector(
+    scope: SessionScope, tenant_id: uuid.UUID, query_embedding: list[float], limit: int, kb_version: int | None
+) -> list[dict]:
+    async with scope() as db:
+        return await search_similar_chunks(db, tenant_id, query_embedding, limit, kb_version=kb_version)
+
+
+async def _lexical(
+    scope: SessionScope, tenant_id: uuid.UUID, query_text: str, query_embedding: list[float], limit: int
+) -> list[dict]:
+    try:
+        async with scope() as db:
+            return await search_lexical_chunks(db, tenant_id, query_text, query_embedding, limit)
+    except SQLAlchemyError as exc:
+        logger.warning("retrieval.lexical_failed", tenant_id=str(tenant_id), error=str(exc))
+        return []
+
+
+async def hybrid_search(
+    scope: SessionScope,
+    tenant_id: uuid.UUID,
+    query_text: str,
+    query_embedding: list[float],
+    top_k: int | None = None,
+    kb_version: int | None = None,
+) -> list[dict]:
+    """Vector and full-text retrieval run concurrently, fused with reciprocal rank fusion.
+
+    Each side runs in a session of its own from `scope` (an AsyncSession can't run
+    two queries at once), closed before this returns. Returns the
+    search_similar_chunks shape; chunks found by the full-text search also carry
+    "lexical_rank" and "lexical_all_terms".
+    """
+    k = top_k or settings.RAG_TOP_K
+    if not settings.RAG_HYBRID_ENABLED:
+        return await _vector(scope, tenant_id, query_embedding, k, kb_version)
+
+    candidates = max(k, settings.RAG_HYBRID_CANDIDATES)
+    vector_hits, lexical_hits = await asyncio.gather(
+        _vector(scope, tenant_id, query_embedding, candidates, kb_version),
+        _lexical(scope, tenant_id, query_text, query_embedding, candidates),
+    )
+    return reciprocal_rank_fusion([vector_hits, lexical_hits], k, settings.RAG_RRF_K)
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import re
+import uuid
+
+from sqlalchemy import cast, func, select, text
+from sqlalchemy.dialects.postgresql import REGCONFIG
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import KBChunk, KBDocument, KBEmbedding
+
+_TERM_RE = re.compile(r"[^\W_]+")
+_MAX_TERMS = 32
+
+
+def extract_terms(text: str) -> list[str]:
+    return list(dict.fromkeys(_TERM_RE.findall(text.lower())))[:_MAX_TERMS]
+
+
+def build_tsquery_text(terms: list[str], operator: str = "|") -> str | None:
+    """Join search terms as to_tsquery() input, ORed unless operator is "&".
+
+    Longer words also match as prefixes, so "frukost" finds Swedish compounds
+    such as "frukostbuffé". Returns None when there is nothing to search for.
+    """
+    if not terms:
+        return None
+    return f" {operator} ".join(f"{t}:*" if len(t) >= 4 else t for t in terms)
+
+
+def _tsquery(query_text: str):
+    return func.to_tsquery(cast("english", REGCONFIG), query_text).op("||")(
+        func.to_tsquery(cast("swedish", REGCONFIG), query_text)
+    )
+
+
+async def _drop_stopwords(db: AsyncSession, terms: list[str]) -> list[str]:
+    # A stopword in one language is an ordinary word in the other ("is", "the"
+    # are Swedish words), so drop terms that either config ignores.
+    if not terms:
+        return []
+    result = await db.execute(
+        text(
+            "SELECT t FROM unnest(CAST(:terms AS text[])) WITH ORDINALITY AS u(t, i) "
+            "WHERE to_tsvector('english', t) <> ''::tsvector AND to_tsvector('swedish', t) <> ''::tsvector "
+            "ORDER BY i"
+        ),
+        {"terms": terms},
+    )
+    return list(result.scalars())
+
+
+async def search_lexical_chunks(
+    db: AsyncSession,
+    tenant_id: uuid.UUID,
+    query_text: str,
+    query_embedding: list[float],
+    limit: int,
+) -> list[dict]:
+    """Full-text search over kb_chunks.search_vector (English + Swedish), best rank first.
+
+    Any of the query's words can match. Returns the same shape as
+    search_similar_chunks plus "lexical_rank" and "lexical_all_terms" (whether the
+    chunk contains every non-stopword of the query); the cosine similarity to the
+    query is included so lexical-only hits can be scored too.
+    """
+    terms = await _drop_stopwords(db, extract_terms(query_text))
+    if not terms:
+        return []
+
+    tsquery = _tsquery(build_tsquery_text(terms))
+    all_terms = KBChunk.search_vector.op("@@")(_tsquery(build_tsquery_text(terms, "&")))
+    # Normalization 32 maps the rank into [0, 1)
+    rank = func.ts_rank_cd(KBChunk.search_vector, tsquery, 32)
+    stmt = (
+        select(
+            KBChunk.id,
+            KBChunk.document_id,
+            KBChunk.chunk_text,
+            KBChunk.page_start,
+            KBChunk.page_end,
+            KBDocument.title,
+            rank.label("rank"),
+            all_terms.label("all_terms"),
+            (1 - KBEmbedding.embedding.cosine_distance(query_embedding)).label("similarity"),
+        )
+        .join(KBDocument, KBDocument.id == KBChunk.document_id)
+        .join(KBEmbedding, (KBEmbedding.chunk_id == KBChunk.id) & (KBEmbedding.tenant_id == tenant_id))
+        .where(KBChunk.tenant_id == tenant_id, KBChunk.search_vector.op("@@")(tsquery))
+        .order_by(rank.desc())
+        .limit(limit)
+    )
+    rows = (await db.execute(stmt)).all()
+
+    return [
+        {
+            "chunk_id": str(row.id),
+            "document_id": str(row.document_id),
+            "title": row.title,
+            "chunk_text": row.chunk_text,
+            "page_start": row.page_start,
+            "page_end": row.page_end,
+            "similarity": float(row.similarity),
+            "lexical_rank": float(row.rank),
+            "lexical_all_terms": row.all_terms,
+        }
+        for row in rows
+    ]
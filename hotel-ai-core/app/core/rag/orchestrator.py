@@ -2,14 +2,23 @@ from __future__ import annotations
 
 import re
 import uuid
+from collections.abc import AsyncIterator
 
-from openai import AsyncOpenAI
-from sqlalchemy.ext.asyncio import AsyncSession
+import structlog
 
 from app.config import settings
-from app.core.guardrails.prompt import build_system_prompt
+from app.core.cache.answers import lookup_cached_answer, store_cached_answer
+from app.core.guardrails.prompt import build_system_prompt, build_tenant_section, prompt_cache_key
+from app.core.kb.version import get_kb_version
+from app.core.llm.clients import get_async_client
+from app.core.llm.usage import record_usage
+from app.core.observability.metrics import StageTimer, observe_answer
+from app.core.rag.context import format_passage, pack_context
 from app.core.rag.embeddings import embed_text
-from app.core.rag.retrieval import search_similar_chunks
+from app.core.rag.hybrid import hybrid_search
+from app.db.session import SessionScope
+
+logger = structlog.get_logger()
 
 # Greeting patterns (English + Swedish)
 _GREETING_RE = re.compile(
@@ -23,84 +32,233 @@ def _is_greeting(message: str) -> bool:
     return bool(_GREETING_RE.match(message.strip()))
 
 
-async def rag_answer(
-    db: AsyncSession,
+async def _prepare(
+    scope: SessionScope,
     tenant_id: uuid.UUID,
     user_message: str,
-    escalation_phone: str | None = None,
-    escalation_email: str | None = None,
-    greeting_message: str | None = None,
+    escalation_phone: str | None,
+    escalation_email: str | None,
+    greeting_message: str | None,
+    timer: StageTimer,
 ) -> dict:
-    """Full RAG pipeline: embed → retrieve → prompt → respond."""
+    """Everything up to the LLM call.
+
+    Returns {"result": ...} when the turn is already decided (greeting, cached answer,
+    fallback), otherwise the chat messages and answer metadata for the LLM step.
+    Each step is timed on `timer`.
+    """
     # 0. Handle greetings without RAG search
-    if _is_greeting(user_message):
+    with timer.stage("greeting"):
+        greeting = _is_greeting(user_message)
+    if greeting:
         default = "Hello! Welcome — I'm your hotel assistant. How can I help you today?"
         return {
-            "outcome": "answered",
-            "answer_text": greeting_message or default,
-            "citations": [],
-            "confidence": 1.0,
-            "escalation": None,
+            "result": {
+                "outcome": "answered",
+                "answer_text": greeting_message or default,
+                "citations": [],
+                "confidence": 1.0,
+                "escalation": None,
+            }
         }
 
     # 1. Embed the user query
-    query_embedding = await embed_text(user_message)
+    with timer.stage("embed"):
+        query_embedding = await embed_text(user_message)
 
-    # 2. Retrieve relevant chunks
-    chunks = await search_similar_chunks(db, tenant_id, query_embedding)
+    # 2. Serve repeat questions from the semantic answer cache
+    with timer.stage("answer_cache"):
+        kb_version = await get_kb_version(tenant_id)
+        cached = await lookup_cached_answer(tenant_id, kb_version, query_embedding)
+    if cached:
+        return {"result": cached}
 
-    # 3. Check confidence
+    # 3. Retrieve relevant chunks (vector + full-text), in sessions of their own so
+    #    no connection is held while the LLM answers
+    with timer.stage("retrieve"):
+        chunks = await hybrid_search(scope, tenant_id, user_message, query_embedding, kb_version=kb_version)
+
+    # 4. Check confidence
     max_similarity = max((c["similarity"] for c in chunks), default=0.0)
-    print(f"Max similarity: {max_similarity}")
-    print(f"Chunks retrieved: {len(chunks)}")
-    print(settings.RAG_CONFIDENCE_THRESHOLD)
-    if max_similarity < settings.RAG_CONFIDENCE_THRESHOLD or not chunks:
+    # A chunk containing every word of the question (room numbers, "Wi-Fi password")
+    # counts even when embeddings miss it; sharing a word or two is not enough
+    lexical_match = any(c.get("lexical_all_terms") for c in chunks)
+    logger.debug(
+        "rag.retrieved",
+        tenant_id=str(tenant_id),
+        chunks=len(chunks),
+        max_similarity=max_similarity,
+        lexical_match=lexical_match,
+        threshold=settings.RAG_CONFIDENCE_THRESHOLD,
+    )
+    if (max_similarity < settings.RAG_CONFIDENCE_THRESHOLD and not lexical_match) or not chunks:
         return {
-            "outcome": "fallback",
-            "answer_text": None,
-            "citations": [],
-            "confidence": max_similarity,
-            "escalation": {
-                "phone": escalation_phone,
-                "email": escalation_email,
-                "message": "I couldn't find relevant information. Please contact our team directly.",
-            },
+            "result": {
+                "outcome": "fallback",
+                "answer_text": None,
+                "citations": [],
+                "confidence": max_similarity,
+                "escalation": {
+                    "phone": escalation_phone,
+                    "email": escalation_email,
+                    "message": "I couldn't find relevant information. Please contact our team directly.",
+                },
+            }
         }
 
-    # 4. Build context and prompt
-    context_parts = []
-    citations = []
-    for c in chunks:
-        context_parts.append(f"[Source: {c['title']}]\n{c['chunk_text']}")
-        citations.append({
-            "document_id": c["document_id"],
-            "title": c["title"],
-            "chunk_id": c["chunk_id"],
-        })
-
-    context_text = "\n\n---\n\n".join(context_parts)
-    system_prompt = build_system_prompt(
-        context_text, escalation_phone=escalation_phone, escalation_email=escalation_email
-    )
+    # 5. Pack the best chunks into the context budget and build the prompt
+    with timer.stage("prompt"):
+        passages = pack_context(chunks)
+        citations = [
+            {
+                "document_id": c["document_id"],
+                "title": c["title"],
+                "chunk_id": c["chunk_id"],
+                "page_start": c["page_start"],
+                "page_end": c["page_end"],
+            }
+            for p in passages
+            for c in p["chunks"]
+        ]
 
-    # 5. Call LLM
-    client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
-    chat_resp = await client.chat.completions.create(
-        model=settings.OPENAI_CHAT_MODEL,
-        messages=[
+        context_text = "\n\n---\n\n".join(format_passage(p) for p in passages)
+        system_prompt = build_system_prompt(context_text, escalation_phone, escalation_email)
+
+    return {
+        "result": None,
+        "messages": [
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_message},
         ],
-        temperature=0.2,
-        max_tokens=1024,
-    )
+        "citations": citations,
+        "confidence": max_similarity,
+        "kb_version": kb_version,
+        "query_embedding": query_embedding,
+        "prompt_cache_key": prompt_cache_key(build_tenant_section(escalation_phone, escalation_email)),
+    }
+
+
+def _completion_kwargs(prepared: dict) -> dict:
+    kwargs = {
+        "model": settings.OPENAI_CHAT_MODEL,
+        "messages": prepared["messages"],
+        "temperature": 0.2,
+        "max_tokens": 1024,
+        "timeout": settings.OPENAI_CHAT_TIMEOUT_SECONDS,
+    }
+    if settings.OPENAI_PROMPT_CACHE_KEY_ENABLED:
+        # Routes requests sharing a prompt prefix to the same provider cache
+        kwargs["extra_body"] = {"prompt_cache_key": prepared["prompt_cache_key"]}
+    return kwargs
 
-    answer_text = chat_resp.choices[0].message.content
 
+def _answered(prepared: dict, answer_text: str | None) -> dict:
     return {
         "outcome": "answered",
         "answer_text": answer_text,
-        "citations": citations,
-        "confidence": max_similarity,
+        "citations": prepared["citations"],
+        "confidence": prepared["confidence"],
         "escalation": None,
     }
+
+
+async def rag_answer(
+    scope: SessionScope,
+    tenant_id: uuid.UUID,
+    user_message: str,
+    escalation_phone: str | None = None,
+    escalation_email: str | None = None,
+    greeting_message: str | None = None,
+) -> dict:
+    """Full RAG pipeline: embed → retrieve → prompt → respond.
+
+    Retrieval runs in short sessions from `scope` (the endpoint's get_session_scope).
+    When the LLM was called the result also carries its token "usage" (not part
+    of the cached answer or the API response).
+    """
+    timer = StageTimer()
+    prepared = await _prepare(
+        scope, tenant_id, user_message, escalation_phone, escalation_email, greeting_message, timer
+    )
+    if prepared["result"] is not None:
+        observe_answer(tenant_id, prepared["result"]["outcome"], timer)
+        return prepared["result"]
+
+    # 6. Call LLM
+    client = get_async_client()
+    with timer.stage("llm"):
+        chat_resp = await client.chat.completions.create(**_completion_kwargs(prepared))
+    tokens = await record_usage(tenant_id, prepared["prompt_cache_key"], chat_resp.usage)
+
+    result = _answered(prepared, chat_resp.choices[0].message.content)
+    await store_cached_answer(tenant_id, prepared["kb_version"], prepared["query_embedding"], result)
+    observe_answer(tenant_id, result["outcome"], timer, tokens)
+    return {**result, "usage": tokens}
+
+
+async def rag_answer_stream(
+    scope: SessionScope,
+    tenant_id: uuid.UUID,
+    user_message: str,
+    escalation_phone: str | None = None,
+    escalation_email: str | None = None,
+    greeting_message: str | None = None,
+) -> AsyncIterator[dict]:
+    """Streaming variant of rag_answer.
+
+    Yields a "meta" event (outcome, citations, confidence) as soon as retrieval is done,
+    then "delta" events with answer text, then a "done" event carrying the same dict
+    rag_answer would have returned.
+    """
+    timer = StageTimer()
+    prepared = await _prepare(
+        scope, tenant_id, user_message, escalation_phone, escalation_email, greeting_message, timer
+    )
+    result = prepared["result"]
+    if result is not None:
+        observe_answer(tenant_id, result["outcome"], timer)
+        yield {
+            "type": "meta",
+            "outcome": result["outcome"],
+            "citations": result["citations"],
+            "confidence": result["confidence"],
+        }
+        if result["answer_text"]:
+            yield {"type": "delta", "text": result["answer_text"]}
+        yield {"type": "done", "result": result}
+        return
+
+    yield {
+        "type": "meta",
+        "outcome": "answered",
+        "citations": prepared["citations"],
+        "confidence": prepared["confidence"],
+    }
+
+    # 6. Stream the LLM completion; the "llm" stage also includes the time the
+    #    client takes to consume each delta
+    client = get_async_client()
+    parts = []
+    usage = None
+    with timer.stage("llm"):
+        stream = await client.chat.completions.create(
+            **_completion_kwargs(prepared),
+            stream=True,
+            stream_options={"include_usage": True},
+        )
+        async for chunk in stream:
+            # With include_usage the final chunk carries usage and no choices
+            if chunk.usage is not None:
+                usage = chunk.usage
+            if not chunk.choices:
+                continue
+            text = chunk.choices[0].delta.content
+            if text:
+                parts.append(text)
+                yield {"type": "delta", "text": text}
+
+    tokens = await record_usage(tenant_id, prepared["prompt_cache_key"], usage)
+    result = _answered(prepared, "".join(parts))
+    await store_cached_answer(tenant_id, prepared["kb_version"], prepared["query_embedding"], result)
+    observe_answer(tenant_id, result["outcome"], timer, tokens)
+    yield {"type": "done", "result": {**result, "usage": tokens}}
@@ -2,40 +2,81 @@ from __future__ import annotations
 
 import uuid
 
-from sqlalchemy import select, text
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
+from app.core.observability.metrics import RETRIEVAL_EXACT_FALLBACKS
+from app.core.rag.vector_index import get_tenant_index
 from app.db.models import KBChunk, KBDocument, KBEmbedding
 
 
+async def _configure_hnsw(db: AsyncSession) -> None:
+    """Per-transaction HNSW tuning (set_config(..., true) is SET LOCAL), in one round trip."""
+    options = []
+    if settings.RAG_HNSW_EF_SEARCH:
+        options.append(func.set_config("hnsw.ef_search", str(settings.RAG_HNSW_EF_SEARCH), True))
+    if settings.RAG_HNSW_ITERATIVE_SCAN != "off":
+        options.append(func.set_config("hnsw.iterative_scan", settings.RAG_HNSW_ITERATIVE_SCAN, True))
+    if options:
+        await db.execute(select(*options))
+
+
 async def search_similar_chunks(
     db: AsyncSession,
     tenant_id: uuid.UUID,
     query_embedding: list[float],
     top_k: int | None = None,
+    exact: bool = False,
+    kb_version: int | None = None,
 ) -> list[dict]:
-    """Vector similarity search scoped to tenant. Returns list of {chunk_id, document_id, title, chunk_text, similarity}."""
+    """Vector similarity search scoped to tenant. Returns list of {chunk_id, document_id, title, chunk_text, page_start, page_end, similarity}.
+
+    kb_embeddings has a partition per tenant, so the HNSW scan walks a graph of
+    only the tenant's vectors and returns top_k rows whenever the tenant has them.
+    If it comes back short anyway (the tenant has fewer than top_k chunks, or the
+    approximate walk missed some), or with exact=True, the tenant's vectors are
+    scanned exactly.
+
+    Small tenants are served from an in-process NumPy index instead (see
+    app.core.rag.vector_index) when the caller passes the tenant's kb_version.
+    """
     k = top_k or settings.RAG_TOP_K
 
+    index = await get_tenant_index(db, tenant_id, kb_version)
+    if index is not None:
+        return index.search(query_embedding, k)
+
     # Use pgvector cosine distance operator <=>
+    distance = KBEmbedding.embedding.cosine_distance(query_embedding)
     stmt = (
         select(
             KBEmbedding.chunk_id,
             KBChunk.document_id,
             KBChunk.chunk_text,
+            KBChunk.page_start,
+            KBChunk.page_end,
             KBDocument.title,
-            (1 - KBEmbedding.embedding.cosine_distance(query_embedding)).label("similarity"),
+            (1 - distance).label("similarity"),
         )
         .join(KBChunk, KBChunk.id == KBEmbedding.chunk_id)
         .join(KBDocument, KBDocument.id == KBChunk.document_id)
         .where(KBEmbedding.tenant_id == tenant_id)
-        .order_by(KBEmbedding.embedding.cosine_distance(query_embedding))
         .limit(k)
     )
 
-    result = await db.execute(stmt)
-    rows = result.all()
+    rows = []
+    if not exact:
+        await _configure_hnsw(db)
+        rows = (await db.execute(stmt.order_by(distance))).all()
+    if len(rows) < k:
+        if not exact:
+            RETRIEVAL_EXACT_FALLBACKS.inc()
+        # "+ 0" stops the planner from matching the HNSW index, forcing an exact scan
+        rows = (await db.execute(stmt.order_by(distance + 0))).all()
+
+    # Iterative scans in relaxed_order mode may return rows slightly out of order
+    rows = sorted(rows, key=lambda row: row.similarity, reverse=True)
 
     return [
         {
@@ -43,6 +84,8 @@ async def search_similar_chunks(
             "document_id": str(row.document_id),
             "title": row.title,
             "chunk_text": row.chunk_text,
+            "page_start": row.page_start,
+            "page_end": row.page_end,
             "similarity": float(row.similarity),
         }
         for row in rows
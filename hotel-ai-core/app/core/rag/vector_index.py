@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import asyncio
+import uuid
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
+import structlog
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.db.models import KBChunk, KBDocument, KBEmbedding
+
+logger = structlog.get_logger()
+
+# Per-process cache of small tenants' KBs as pre-normalized float32 matrices.
+# Entries are tagged with the tenant's KB version (app.core.kb.version), which
+# ingestion bumps once a document is stored, so a stale entry is simply reloaded.
+
+
+@dataclass
+class TenantIndex:
+    kb_version: int
+    matrix: np.ndarray | None  # (n_chunks, dim), rows L2-normalized; None = too large to hold
+    rows: list[dict]  # chunk metadata in matrix row order
+    nbytes: int
+
+    def search(self, query_embedding: list[float], k: int) -> list[dict]:
+        if self.matrix is None or not len(self.rows):
+            return []
+        query = np.asarray(query_embedding, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        similarities = self.matrix @ (query / norm if norm else query)
+        if len(similarities) > k:
+            top = np.argpartition(-similarities, k - 1)[:k]
+        else:
+            top = np.arange(len(similarities))
+        top = top[np.argsort(-similarities[top])]
+        return [{**self.rows[i], "similarity": float(similarities[i])} for i in top]
+
+
+class VectorIndexCache:
+    """LRU of TenantIndex entries bounded by total bytes."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[uuid.UUID, TenantIndex] = OrderedDict()
+        self._bytes = 0
+
+    def get(self, tenant_id: uuid.UUID, kb_version: int) -> TenantIndex | None:
+        entry = self._entries.get(tenant_id)
+        if entry is None or entry.kb_version != kb_version:
+            return None
+        self._entries.move_to_end(tenant_id)
+        return entry
+
+    def put(self, tenant_id: uuid.UUID, entry: TenantIndex) -> None:
+        self.discard(tenant_id)
+        if entry.nbytes > self.max_bytes:
+            return
+        self._entries[tenant_id] = entry
+        self._bytes += entry.nbytes
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.nbytes
+
+    def discard(self, tenant_id: uuid.UUID) -> None:
+        entry = self._entries.pop(tenant_id, None)
+        if entry is not None:
+            self._bytes -= entry.nbytes
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_cache = VectorIndexCache(max_bytes=settings.VECTOR_INDEX_MEMORY_MB * 1024 * 1024)
+# Held only while a load is running or awaited, then dropped
+_load_locks: weakref.WeakValueDictionary[tuple[uuid.UUID, int], asyncio.Lock] = weakref.WeakValueDictionary()
+
+
+async def _load(db: AsyncSession, tenant_id: uuid.UUID, kb_version: int) -> TenantIndex:
+    count = await db.scalar(select(func.count()).select_from(KBEmbedding).where(KBEmbedding.tenant_id == tenant_id))
+    if count > settings.VECTOR_INDEX_MAX_CHUNKS:
+        # Remember the decision for this KB version so we don't recount on every query
+        return TenantIndex(kb_version=kb_version, matrix=None, rows=[], nbytes=0)
+
+    result = await db.execute(
+        select(
+            KBEmbedding.chunk_id,
+            KBEmbedding.embedding,
+            KBChunk.document_id,
+            KBChunk.chunk_text,
+            KBChunk.page_start,
+            KBChunk.page_end,
+            KBDocument.title,
+        )
+        .join(KBChunk, KBChunk.id == KBEmbedding.chunk_id)
+        .join(KBDocument, KBDocument.id == KBChunk.document_id)
+        .where(KBEmbedding.tenant_id == tenant_id)
+    )
+    records = result.all()
+
+    matrix = np.array([r.embedding for r in records], dtype=np.float32)
+    if len(records):
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix /= np.where(norms == 0, 1, norms)
+    rows = [
+        {
+            "chunk_id": str(r.chunk_id),
+            "document_id": str(r.document_id),
+            "title": r.title,
+            "chunk_text": r.chunk_text,
+            "page_start": r.page_start,
+            "page_end": r.page_end,
+        }
+        for r in records
+    ]
+    nbytes = matrix.nbytes + sum(len(r["chunk_text"]) + len(r["title"]) for r in rows)
+    logger.info("vector_index.loaded", tenant_id=str(tenant_id), chunks=len(rows), nbytes=nbytes)
+    return TenantIndex(kb_version=kb_version, matrix=matrix, rows=rows, nbytes=nbytes)
+
+
+async def get_tenant_index(db: AsyncSession, tenant_id: uuid.UUID, kb_version: int | None) -> TenantIndex | None:
+    """In-memory index for the tenant's current KB, or None if pgvector should be used.
+
+    Without a KB version (Redis unavailable) freshness can't be checked, so the
+    in-memory backend is skipped.
+    """
+    if not settings.VECTOR_INDEX_ENABLED or kb_version is None:
+        return None
+    entry = _cache.get(tenant_id, kb_version)
+    if entry is None:
+        # Concurrent misses (cold start, or right after a version bump) wait for a
+        # single load instead of each pulling the tenant's embeddings
+        async with _load_locks.setdefault((tenant_id, kb_version), asyncio.Lock()):
+            entry = _cache.get(tenant_id, kb_version)
+            if entry is None:
+                entry = await _load(db, tenant_id, kb_version)
+                _cache.put(tenant_id, entry)
+    return entry if entry.matrix is not None else None
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import asyncio
+import uuid
+from dataclasses import dataclass
+
+import structlog
+from redis.exceptions import RedisError
+from sqlalchemy import Row, Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.core.cache.client import get_redis
+from app.core.cache.lru import LRUCache
+from app.db.models import Tenant, TenantSetting, WidgetKey
+
+logger = structlog.get_logger()
+
+# Per-process cache of widget key → tenant + settings for the public API. Admin
+# changes evict the affected tenant here and, via Redis pub/sub, in every other
+# API process; the TTL bounds staleness if an invalidation message is missed.
+
+_CHANNEL = "tenant_cache:invalidate"
+
+
+@dataclass(frozen=True)
+class WidgetContext:
+    widget_key_id: uuid.UUID
+    tenant_id: uuid.UUID
+    default_language: str | None
+    greeting_message: str | None
+    escalation_phone: str | None
+    escalation_email: str | None
+    allowed_domains: tuple[str, ...] | None
+
+
+_cache = LRUCache(
+    max_size=settings.WIDGET_CACHE_MAX_SIZE,
+    ttl_seconds=settings.WIDGET_CACHE_TTL_SECONDS,
+)
+
+
+def widget_context_query(widget_key: str) -> Select:
+    """Active widget key joined with its tenant and settings; see widget_context_from_row."""
+    return (
+        select(
+            WidgetKey.id,
+            WidgetKey.tenant_id,
+            Tenant.default_language,
+            TenantSetting.greeting_message,
+            TenantSetting.escalation_phone,
+            TenantSetting.escalation_email,
+            TenantSetting.allowed_domains,
+        )
+        .join(Tenant, Tenant.id == WidgetKey.tenant_id)
+        .outerjoin(TenantSetting, TenantSetting.tenant_id == WidgetKey.tenant_id)
+        .where(WidgetKey.key == widget_key, WidgetKey.status == "active")
+    )
+
+
+def widget_context_from_row(row: Row) -> WidgetContext:
+    return WidgetContext(
+        widget_key_id=row.id,
+        tenant_id=row.tenant_id,
+        default_language=row.default_language,
+        greeting_message=row.greeting_message,
+        escalation_phone=row.escalation_phone,
+        escalation_email=row.escalation_email,
+        allowed_domains=tuple(row.allowed_domains) if row.allowed_domains else None,
+    )
+
+
+def get_cached_widget_context(widget_key: str) -> WidgetContext | None:
+    return _cache.get(widget_key)
+
+
+def cache_widget_context(widget_key: str, ctx: WidgetContext) -> None:
+    _cache.set(widget_key, ctx)
+
+
+async def resolve_widget_key(db: AsyncSession, widget_key: str) -> WidgetContext | None:
+    """Active widget key → tenant and its settings, in one query on a cache miss."""
+    ctx = get_cached_widget_context(widget_key)
+    if ctx is not None:
+        return ctx
+
+    row = (await db.execute(widget_context_query(widget_key))).one_or_none()
+    if row is None:
+        return None
+    ctx = widget_context_from_row(row)
+    cache_widget_context(widget_key, ctx)
+    return ctx
+
+
+def _evict_tenant(tenant_id: uuid.UUID) -> None:
+    _cache.discard_where(lambda ctx: ctx.tenant_id == tenant_id)
+
+
+def clear_widget_cache() -> None:
+    _cache.clear()
+
+
+async def invalidate_tenant(tenant_id: uuid.UUID) -> None:
+    """Evict a tenant's widget keys here and tell the other API processes to do the same."""
+    _evict_tenant(tenant_id)
+    try:
+        await get_redis().publish(_CHANNEL, str(tenant_id))
+    except RedisError as exc:
+        logger.warning("tenant_cache.publish_failed", tenant_id=str(tenant_id), error=str(exc))
+
+
+async def listen_for_invalidations() -> None:
+    """Apply invalidations published by other processes; runs for the app's lifetime."""
+    while True:
+        try:
+            async with get_redis().pubsub() as pubsub:
+                await pubsub.subscribe(_CHANNEL)
+                # Anything published while we were not subscribed is lost
+                _cache.clear()
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        _evict_tenant(uuid.UUID(message["data"].decode()))
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            logger.warning("tenant_cache.listener_failed", error=str(exc))
+            await asyncio.sleep(1)
@@ -5,19 +5,24 @@ from datetime import date, datetime
 
 from pgvector.sqlalchemy import Vector
 from sqlalchemy import (
+    BigInteger,
     Boolean,
+    Computed,
     Date,
     DateTime,
     Enum,
     Float,
     ForeignKey,
+    ForeignKeyConstraint,
     Index,
     Integer,
     String,
     Text,
+    UniqueConstraint,
     func,
+    text,
 )
-from sqlalchemy.dialects.postgresql import ARRAY, JSONB, UUID
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, TSVECTOR, UUID
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
 
@@ -142,31 +147,66 @@ class KBChunk(Base):
     )
     chunk_text: Mapped[str] = mapped_column(Text, nullable=False)
     chunk_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    page_start: Mapped[int | None] = mapped_column(Integer)
+    page_end: Mapped[int | None] = mapped_column(Integer)
+    search_vector = mapped_column(
+        TSVECTOR,
+        Computed(
+            "to_tsvector('english'::regconfig, chunk_text) || to_tsvector('swedish'::regconfig, chunk_text)",
+            persisted=True,
+        ),
+    )
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
     document: Mapped[KBDocument] = relationship(back_populates="chunks")
     embedding: Mapped[KBEmbedding | None] = relationship(back_populates="chunk", uselist=False)
 
+    __table_args__ = (
+        Index("ix_kb_chunks_search_vector", "search_vector", postgresql_using="gin"),
+        # Target of kb_embeddings' (chunk_id, tenant_id) foreign key
+        UniqueConstraint("id", "tenant_id", name="uq_kb_chunks_id_tenant_id"),
+    )
+
 
 class KBEmbedding(Base):
     __tablename__ = "kb_embeddings"
 
-    chunk_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), ForeignKey("kb_chunks.id", ondelete="CASCADE"), primary_key=True
-    )
+    chunk_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True)
     tenant_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False, index=True
+        UUID(as_uuid=True), ForeignKey("tenants.id", ondelete="CASCADE"), primary_key=True
     )
     embedding = mapped_column(Vector(1536), nullable=False)
+    model: Mapped[str | None] = mapped_column(String(100))
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
     chunk: Mapped[KBChunk] = relationship(back_populates="embedding")
 
+    # One list partition per tenant (see migration 005 and app.core.kb.partitions);
+    # each has its own HNSW index. The chunk foreign key includes tenant_id so the
+    # cascade from deleted chunks looks in one partition, not all of them.
     __table_args__ = (
-        Index("ix_kb_embeddings_tenant_embedding", "tenant_id"),
+        ForeignKeyConstraint(
+            ["chunk_id", "tenant_id"], ["kb_chunks.id", "kb_chunks.tenant_id"], ondelete="CASCADE"
+        ),
+        {"postgresql_partition_by": "LIST (tenant_id)"},
     )
 
 
+class SharedEmbedding(Base):
+    """Content-addressed embedding vectors shared across tenants.
+
+    Holds only the vector for a text hash, never the text or tenant, so identical
+    chunks uploaded by different tenants are embedded once.
+    """
+
+    __tablename__ = "shared_embeddings"
+
+    content_hash: Mapped[str] = mapped_column(String(64), primary_key=True)
+    model: Mapped[str] = mapped_column(String(100), primary_key=True)
+    embedding = mapped_column(Vector(1536), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+
 # ── Conversations ────────────────────────────────────────────────────────────
 
 
@@ -175,7 +215,7 @@ class Conversation(Base):
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     tenant_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False, index=True
+        UUID(as_uuid=True), ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False
     )
     channel: Mapped[str] = mapped_column(
         Enum("web_widget", "web_url", "whatsapp", name="conv_channel"), nullable=False
@@ -189,6 +229,11 @@ class Conversation(Base):
     messages: Mapped[list[Message]] = relationship(back_populates="conversation")
     turns: Mapped[list[Turn]] = relationship(back_populates="conversation")
 
+    # Keyset pagination of a tenant's conversations, newest first (migration 008)
+    __table_args__ = (
+        Index("ix_conversations_tenant_started", "tenant_id", text("started_at DESC"), text("id DESC")),
+    )
+
 
 class Message(Base):
     __tablename__ = "messages"
@@ -210,6 +255,8 @@ class Message(Base):
 
     conversation: Mapped[Conversation] = relationship(back_populates="messages")
 
+    __table_args__ = (Index("ix_messages_conversation_id", "conversation_id"),)
+
 
 class Turn(Base):
     __tablename__ = "turns"
@@ -232,10 +279,29 @@ class Turn(Base):
     )
     confidence: Mapped[float | None] = mapped_column(Float)
     retrieved_chunk_ids: Mapped[dict | None] = mapped_column(JSONB)
+    prompt_tokens: Mapped[int | None] = mapped_column(Integer)
+    completion_tokens: Mapped[int | None] = mapped_column(Integer)
+    # From the user message being received to the answer being ready
+    latency_ms: Mapped[int | None] = mapped_column(Integer)
+    # Set by the question clustering job for fallback/escalate turns
+    cluster_id: Mapped[uuid.UUID | None] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("question_clusters.id", ondelete="SET NULL")
+    )
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
     conversation: Mapped[Conversation] = relationship(back_populates="turns")
 
+    __table_args__ = (
+        Index("ix_turns_conversation_outcome", "conversation_id", "outcome"),
+        # The clustering job's backlog (migration 009)
+        Index(
+            "ix_turns_unclustered",
+            "tenant_id",
+            "created_at",
+            postgresql_where=text("cluster_id IS NULL AND outcome IN ('fallback', 'escalate')"),
+        ),
+    )
+
 
 # ── Analytics ────────────────────────────────────────────────────────────────
 
@@ -247,7 +313,36 @@ class DailyStat(Base):
         UUID(as_uuid=True), ForeignKey("tenants.id", ondelete="CASCADE"), primary_key=True
     )
     date: Mapped[date] = mapped_column(Date, primary_key=True)
-    total_conversations: Mapped[int] = mapped_column(Integer, default=0)
-    total_messages: Mapped[int] = mapped_column(Integer, default=0)
-    fallback_count: Mapped[int] = mapped_column(Integer, default=0)
-    escalations: Mapped[int] = mapped_column(Integer, default=0)
+    total_conversations: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    total_messages: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    fallback_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    escalations: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    total_turns: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    latency_ms_sum: Mapped[int] = mapped_column(BigInteger, default=0, server_default="0")
+    prompt_tokens_sum: Mapped[int] = mapped_column(BigInteger, default=0, server_default="0")
+    completion_tokens_sum: Mapped[int] = mapped_column(BigInteger, default=0, server_default="0")
+
+
+class QuestionCluster(Base):
+    """A group of similar unanswered questions, for finding gaps in the KB.
+
+    Maintained by app.workers.analytics.cluster_unanswered_questions; centroid is
+    the mean of the members' normalized embeddings.
+    """
+
+    __tablename__ = "question_clusters"
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    tenant_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False
+    )
+    centroid = mapped_column(Vector(1536), nullable=False)
+    question_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    representative: Mapped[str] = mapped_column(Text, nullable=False)
+    sample_questions: Mapped[list] = mapped_column(JSONB, nullable=False, default=list)
+    first_seen_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    last_seen_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        Index("ix_question_clusters_tenant_count", "tenant_id", text("question_count DESC")),
+    )
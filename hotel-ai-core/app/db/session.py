@@ -1,17 +1,34 @@
 from __future__ import annotations
 
-from collections.abc import AsyncGenerator
+from collections.abc import AsyncGenerator, AsyncIterator, Callable
+from contextlib import AbstractAsyncContextManager, asynccontextmanager
 
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
 from app.config import settings
 
-engine = create_async_engine(settings.DATABASE_URL, echo=False, pool_pre_ping=True)
+engine = create_async_engine(
+    settings.DATABASE_URL,
+    echo=False,
+    pool_pre_ping=True,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+    pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+)
 
 async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
+SessionScope = Callable[[], AbstractAsyncContextManager[AsyncSession]]
 
-async def get_db() -> AsyncGenerator[AsyncSession, None]:
+
+@asynccontextmanager
+async def session_scope() -> AsyncIterator[AsyncSession]:
+    """A unit of work: commits on success, rolls back on error.
+
+    The connection goes back to the pool when the block exits, so keep slow
+    non-database work (LLM calls) outside of it.
+    """
     async with async_session() as session:
         try:
             yield session
@@ -19,3 +36,13 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
         except Exception:
             await session.rollback()
             raise
+
+
+def get_session_scope() -> SessionScope:
+    """Dependency for endpoints that open short sessions around slow work instead of using get_db."""
+    return session_scope
+
+
+async def get_db() -> AsyncGenerator[AsyncSession, None]:
+    async with session_scope() as session:
+        yield session
@@ -1,11 +1,12 @@
 from __future__ import annotations
 
+import asyncio
 import uuid
 from contextlib import asynccontextmanager
 
 import logging
 import structlog
-from fastapi import FastAPI, Request, Response
+from fastapi import Depends, FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from slowapi import Limiter
 from slowapi.errors import RateLimitExceeded
@@ -13,7 +14,12 @@ from slowapi.middleware import SlowAPIMiddleware
 from slowapi.util import get_remote_address
 from starlette.responses import JSONResponse
 
+from app.api.deps import require_metrics_token
 from app.config import settings
+from app.core.cache.client import close_redis
+from app.core.llm.clients import close_async_client, get_async_client
+from app.core.observability.metrics import CONTENT_TYPE, render_metrics
+from app.core.tenants.cache import listen_for_invalidations
 from app.db.session import engine
 
 structlog.configure(
@@ -32,7 +38,12 @@ logger = structlog.get_logger()
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("startup", env=settings.APP_ENV)
+    get_async_client()
+    invalidations = asyncio.create_task(listen_for_invalidations())
     yield
+    invalidations.cancel()
+    await close_async_client()
+    await close_redis()
     await engine.dispose()
     logger.info("shutdown")
 
@@ -83,3 +94,10 @@ app.include_router(admin_router)
 @app.get("/health")
 async def health():
     return {"status": "ok"}
+
+
+if settings.METRICS_ENABLED:
+
+    @app.get("/metrics", include_in_schema=False, dependencies=[Depends(require_metrics_token)])
+    async def metrics():
+        return Response(render_metrics(), media_type=CONTENT_TYPE)
@@ -0,0 +1,279 @@
+from __future__ import annotations
+
+import uuid
+from datetime import date, datetime, timedelta, timezone
+
+import numpy as np
+import structlog
+from sqlalchemy import BigInteger, Date, cast, delete, extract, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.analytics.clusters import assign_clusters
+from app.core.analytics.rollups import COUNTERS
+from app.core.cache.embeddings import get_cached_embeddings_sync, set_cached_embeddings_sync
+from app.core.llm.tokens import truncate_tokens
+from app.db.models import Conversation, DailyStat, Message, QuestionCluster, Turn
+from app.workers.celery_app import celery
+from app.workers.embedding import embed_in_batches
+from app.workers.ingest import sync_engine
+
+logger = structlog.get_logger()
+
+_INSERT_BATCH_SIZE = 1000
+
+
+def _day(column):
+    return cast(func.timezone("UTC", column), Date)
+
+
+def _aggregate(db: Session, tenant_id: uuid.UUID | None, from_date: date | None, to_date: date | None) -> dict:
+    def scoped(stmt, model, ts):
+        if tenant_id is not None:
+            stmt = stmt.where(model.tenant_id == tenant_id)
+        if from_date is not None:
+            stmt = stmt.where(_day(ts) >= from_date)
+        if to_date is not None:
+            stmt = stmt.where(_day(ts) <= to_date)
+        return stmt.group_by(model.tenant_id, _day(ts))
+
+    rows: dict[tuple[uuid.UUID, date], dict] = {}
+
+    def row(tenant: uuid.UUID, day: date) -> dict:
+        return rows.setdefault((tenant, day), {"tenant_id": tenant, "date": day, **dict.fromkeys(COUNTERS, 0)})
+
+    # 1. Conversations by start day
+    conversations = scoped(
+        select(Conversation.tenant_id, _day(Conversation.started_at), func.count()),
+        Conversation,
+        Conversation.started_at,
+    )
+    for tenant, day, count in db.execute(conversations):
+        row(tenant, day)["total_conversations"] = count
+
+    # 2. Messages by their own day
+    messages = scoped(select(Message.tenant_id, _day(Message.created_at), func.count()), Message, Message.created_at)
+    for tenant, day, count in db.execute(messages):
+        row(tenant, day)["total_messages"] = count
+
+    # 3. Turns by answer day; turns recorded before latency_ms existed get it from
+    #    the user message and turn timestamps
+    latency_ms = func.coalesce(
+        Turn.latency_ms, func.greatest(extract("epoch", Turn.created_at - Message.created_at) * 1000, 0)
+    )
+    turns = scoped(
+        select(
+            Turn.tenant_id,
+            _day(Turn.created_at),
+            func.count(),
+            func.count().filter(Turn.outcome == "fallback"),
+            func.count().filter(Turn.outcome == "escalate"),
+            cast(func.coalesce(func.sum(func.floor(latency_ms)), 0), BigInteger),
+            func.coalesce(func.sum(Turn.prompt_tokens), 0),
+            func.coalesce(func.sum(Turn.completion_tokens), 0),
+        ).join(Message, Message.id == Turn.user_message_id),
+        Turn,
+        Turn.created_at,
+    )
+    for tenant, day, total, fallbacks, escalations, latency, prompt_tokens, completion_tokens in db.execute(turns):
+        row(tenant, day).update(
+            total_turns=total,
+            fallback_count=fallbacks,
+            escalations=escalations,
+            latency_ms_sum=latency,
+            prompt_tokens_sum=prompt_tokens,
+            completion_tokens_sum=completion_tokens,
+        )
+
+    return rows
+
+
+@celery.task
+def recompute_daily_stats(
+    tenant_id: str | None = None,
+    from_date: str | None = None,
+    to_date: str | None = None,
+    days: int | None = None,
+) -> dict:
+    """Rebuild daily_stats from conversations, messages and turns.
+
+    Covers all tenants and all history unless narrowed by tenant_id and an
+    inclusive ISO date range (UTC days), or by days=N for the last N complete
+    days. Existing rows in the range are replaced, so this is both the backfill
+    for history written before rollups existed and the repair for drift.
+
+    Rows for the current day can race with chats being counted while this runs;
+    recompute complete days (Celery beat does days=1 nightly).
+    """
+    tenant_uuid = uuid.UUID(tenant_id) if tenant_id else None
+    start = date.fromisoformat(from_date) if from_date else None
+    end = date.fromisoformat(to_date) if to_date else None
+    if days:
+        end = datetime.now(timezone.utc).date() - timedelta(days=1)
+        start = end - timedelta(days=days - 1)
+
+    with Session(sync_engine) as db:
+        rows = list(_aggregate(db, tenant_uuid, start, end).values())
+
+        stale = delete(DailyStat)
+        if tenant_uuid is not None:
+            stale = stale.where(DailyStat.tenant_id == tenant_uuid)
+        if start is not None:
+            stale = stale.where(DailyStat.date >= start)
+        if end is not None:
+            stale = stale.where(DailyStat.date <= end)
+        db.execute(stale)
+        for i in range(0, len(rows), _INSERT_BATCH_SIZE):
+            db.execute(insert(DailyStat), rows[i : i + _INSERT_BATCH_SIZE])
+        db.commit()
+
+    logger.info(
+        "analytics.daily_stats_recomputed",
+        tenant_id=tenant_id,
+        from_date=start.isoformat() if start else None,
+        to_date=end.isoformat() if end else None,
+        rows=len(rows),
+    )
+    return {"rows": len(rows)}
+
+
+# ── Unanswered question clusters ────────────────────────────────────────────
+
+_UNCLUSTERED = (Turn.cluster_id.is_(None), Turn.outcome.in_(["fallback", "escalate"]))
+
+
+def _embed_questions(texts: list[str]) -> list[list[float]]:
+    """Embedding cache first, then the embeddings API in rate-limited batches."""
+    # A question over the model's input limit would fail its whole batch, and
+    # the same oldest questions come back on every run
+    texts = [
+        truncate_tokens(t, settings.EMBEDDING_MAX_INPUT_TOKENS, settings.OPENAI_EMBEDDING_MODEL) for t in texts
+    ]
+    results = get_cached_embeddings_sync(texts)
+    missing = list(dict.fromkeys(t for t, e in zip(texts, results) if e is None))
+    if missing:
+        fresh = embed_in_batches(missing, on_batch=set_cached_embeddings_sync)
+        results = [e if e is not None else fresh[t] for t, e in zip(texts, results)]
+    return results
+
+
+def _add_samples(samples: list[str], questions: list[str]) -> list[str]:
+    seen = {q.casefold() for q in samples}
+    samples = list(samples)
+    for question in questions:
+        if len(samples) >= settings.QUESTION_CLUSTER_SAMPLES:
+            break
+        if question.casefold() not in seen:
+            seen.add(question.casefold())
+            samples.append(question)
+    return samples
+
+
+def _cluster_batch(tenant_id: uuid.UUID) -> tuple[int, int, int]:
+    """Cluster a tenant's oldest unclustered questions.
+
+    Returns (fetched, clustered, new_clusters).
+    """
+    with Session(sync_engine) as db:
+        rows = db.execute(
+            select(Turn.id, Turn.created_at, Message.content)
+            .join(Message, Message.id == Turn.user_message_id)
+            .where(Turn.tenant_id == tenant_id, *_UNCLUSTERED, func.btrim(Message.content) != "")
+            .order_by(Turn.created_at)
+            .limit(settings.QUESTION_CLUSTER_BATCH_SIZE)
+        ).all()
+    fetched = len(rows)
+    if not rows:
+        return 0, 0, 0
+    # No connection is held while the embeddings API is called
+    embeddings = _embed_questions([row.content.strip() for row in rows])
+
+    with Session(sync_engine) as db, db.begin():
+        # Runs for the same tenant take turns; the second one skips what the
+        # first already clustered
+        db.execute(select(func.pg_advisory_xact_lock(func.hashtext(f"question_clusters:{tenant_id}"))))
+        pending = set(db.scalars(select(Turn.id).where(Turn.id.in_([row.id for row in rows]), *_UNCLUSTERED)))
+        keep = [i for i, row in enumerate(rows) if row.id in pending]
+        if not keep:
+            return fetched, 0, 0
+        rows = [rows[i] for i in keep]
+
+        clusters = db.scalars(select(QuestionCluster).where(QuestionCluster.tenant_id == tenant_id)).all()
+        k = len(clusters)
+        labels, centroids, sizes = assign_clusters(
+            np.array([c.centroid for c in clusters], dtype=np.float32),
+            np.array([c.question_count for c in clusters], dtype=np.int64),
+            np.array([embeddings[i] for i in keep], dtype=np.float32),
+            settings.QUESTION_CLUSTER_SIMILARITY,
+        )
+
+        members: dict[int, list] = {}
+        for row, label in zip(rows, labels.tolist()):
+            members.setdefault(label, []).append(row)
+        for label, batch in members.items():
+            questions = [row.content.strip() for row in batch]
+            last_seen = max(row.created_at for row in batch)
+            if label < k:
+                cluster = clusters[label]
+                cluster.last_seen_at = max(cluster.last_seen_at, last_seen)
+                cluster.sample_questions = _add_samples(cluster.sample_questions, questions)
+            else:
+                cluster = QuestionCluster(
+                    id=uuid.uuid4(),
+                    tenant_id=tenant_id,
+                    representative=questions[0],
+                    sample_questions=_add_samples([], questions),
+                    first_seen_at=min(row.created_at for row in batch),
+                    last_seen_at=last_seen,
+                )
+                clusters.append(cluster)
+                db.add(cluster)
+            cluster.centroid = centroids[label]
+            cluster.question_count = int(sizes[label])
+        db.flush()
+
+        db.execute(
+            update(Turn),
+            [{"id": row.id, "cluster_id": clusters[label].id} for row, label in zip(rows, labels.tolist())],
+        )
+    return fetched, len(rows), len(clusters) - k
+
+
+@celery.task
+def cluster_unanswered_questions(tenant_id: str | None = None) -> dict:
+    """Add new fallback/escalate questions to the tenant's question clusters.
+
+    Handles every tenant with unclustered questions unless tenant_id is given,
+    up to QUESTION_CLUSTER_MAX_BATCHES batches each; the rest of a large
+    backlog (such as the history before clustering existed) is picked up by
+    the next runs.
+    """
+    with Session(sync_engine) as db:
+        if tenant_id:
+            tenants = [uuid.UUID(tenant_id)]
+        else:
+            tenants = db.scalars(select(Turn.tenant_id).where(*_UNCLUSTERED).distinct()).all()
+
+    total = failed = 0
+    for tenant in tenants:
+        clustered = created = 0
+        try:
+            for _ in range(settings.QUESTION_CLUSTER_MAX_BATCHES):
+                fetched, batch_clustered, batch_created = _cluster_batch(tenant)
+                clustered += batch_clustered
+                created += batch_created
+                if fetched < settings.QUESTION_CLUSTER_BATCH_SIZE:
+                    break
+        except Exception:
+            # Batches committed before the failure stay; the other tenants go on
+            logger.exception("analytics.question_clustering_failed", tenant_id=str(tenant))
+            failed += 1
+        if clustered:
+            logger.info(
+                "analytics.questions_clustered",
+                tenant_id=str(tenant),
+                questions=clustered,
+                new_clusters=created,
+            )
+        total += clustered
+    return {"tenants": len(tenants), "questions": total, "failed": failed}
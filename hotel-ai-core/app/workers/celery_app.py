@@ -1,6 +1,7 @@
 import ssl
 
 from celery import Celery
+from celery.schedules import crontab
 
 from app.config import settings
 
@@ -8,7 +9,7 @@ celery = Celery(
     "hotel_ai",
     broker=settings.REDIS_URL,
     backend=settings.REDIS_URL,
-    include=["app.workers.ingest"],
+    include=["app.workers.ingest", "app.workers.conversations", "app.workers.analytics"],
 )
 
 # Upstash (rediss://) requires explicit SSL config for Celery
@@ -25,3 +26,31 @@ celery.conf.update(
     broker_use_ssl={"ssl_cert_reqs": ssl.CERT_NONE} if _redis_ssl else None,
     redis_backend_use_ssl={"ssl_cert_reqs": ssl.CERT_NONE} if _redis_ssl else None,
 )
+
+# Periodic tasks; run `celery -A app.workers.celery_app beat` alongside the workers
+celery.conf.beat_schedule = {
+    "flush-conversation-log": {
+        "task": "app.workers.conversations.flush_conversation_log",
+        "schedule": settings.CONVERSATION_FLUSH_INTERVAL_SECONDS,
+        # A run that could not start within one interval is superseded by the next
+        "options": {"expires": settings.CONVERSATION_FLUSH_INTERVAL_SECONDS},
+    },
+    # daily_stats are maintained incrementally; this rebuilds yesterday from the
+    # stored rows as a safety net against drift
+    "recompute-daily-stats": {
+        "task": "app.workers.analytics.recompute_daily_stats",
+        "schedule": crontab(hour=0, minute=30),
+        "kwargs": {"days": 1},
+    },
+    # Each new tenant's kb_embeddings partition, before its first ingest needs it
+    "create-embedding-partitions": {
+        "task": "app.workers.ingest.create_embedding_partitions",
+        "schedule": settings.KB_PARTITION_INTERVAL_SECONDS,
+        "options": {"expires": settings.KB_PARTITION_INTERVAL_SECONDS},
+    },
+    "cluster-unanswered-questions": {
+        "task": "app.workers.analytics.cluster_unanswered_questions",
+        "schedule": settings.QUESTION_CLUSTER_INTERVAL_SECONDS,
+        "options": {"expires": settings.QUESTION_CLUSTER_INTERVAL_SECONDS},
+    },
+}
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import os
+import socket
+
+import structlog
+from redis.exceptions import ResponseError
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import InterfaceError, OperationalError
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.analytics.rollups import turn_deltas, upsert_daily_stats
+from app.core.cache.client import get_sync_redis
+from app.core.conversations.log import decode_turn
+from app.db.models import Message, Turn
+from app.workers.celery_app import celery
+from app.workers.ingest import sync_engine
+
+logger = structlog.get_logger()
+
+_GROUP = "conversation-writers"
+
+# The database is unreachable or went away: keep the entries pending for a later
+# run instead of dropping them as unstorable
+_TRANSIENT_ERRORS = (OperationalError, InterfaceError)
+
+
+def _ensure_group(r) -> None:
+    try:
+        r.xgroup_create(settings.CONVERSATION_STREAM_KEY, _GROUP, id="0", mkstream=True)
+    except ResponseError as exc:
+        if "BUSYGROUP" not in str(exc):
+            raise
+
+
+def _insert(db: Session, exchanges: list[tuple[list[dict], dict]]) -> None:
+    # ON CONFLICT DO NOTHING makes redelivered entries no-ops; only turns actually
+    # inserted now are counted in daily_stats, so the rollups stay exact too.
+    db.execute(
+        insert(Message)
+        .values([m for messages, _ in exchanges for m in messages])
+        .on_conflict_do_nothing(index_elements=["id"])
+    )
+    inserted = set(
+        db.scalars(
+            insert(Turn)
+            .values([turn for _, turn in exchanges])
+            .on_conflict_do_nothing(index_elements=["id"])
+            .returning(Turn.id)
+        )
+    )
+    new = [(messages, turn) for messages, turn in exchanges if turn["id"] in inserted]
+    if new:
+        db.execute(upsert_daily_stats(turn_deltas(new)))
+
+
+def _store(entries: list[tuple[bytes, dict]]) -> int:
+    """Insert a batch of stream entries; returns how many exchanges were stored.
+
+    Connection errors propagate, leaving the entries pending in the consumer group
+    to be reclaimed by a later run. Any other failure falls back to inserting the
+    entries one by one, and those that still fail are logged and dropped so a
+    single bad entry can't hold up the stream.
+    """
+    decoded = []
+    for entry_id, fields in entries:
+        if not fields:
+            # Deleted from the stream while still pending; nothing to store
+            continue
+        try:
+            decoded.append(decode_turn(fields))
+        except (KeyError, TypeError, ValueError) as exc:
+            logger.error("conversation_log.malformed_entry", entry_id=entry_id.decode(), error=str(exc))
+    if not decoded:
+        return 0
+
+    with Session(sync_engine) as db:
+        try:
+            _insert(db, decoded)
+            db.commit()
+            return len(decoded)
+        except _TRANSIENT_ERRORS:
+            raise
+        except Exception as exc:
+            db.rollback()
+            logger.warning("conversation_log.batch_failed", entries=len(decoded), error=str(exc))
+
+        # Some exchange can't be stored (e.g. its conversation was deleted
+        # meanwhile); insert one by one so it does not hold up the rest.
+        stored = 0
+        for messages, turn in decoded:
+            try:
+                _insert(db, [(messages, turn)])
+                db.commit()
+                stored += 1
+            except _TRANSIENT_ERRORS:
+                raise
+            except Exception as exc:
+                db.rollback()
+                logger.error(
+                    "conversation_log.entry_dropped",
+                    conversation_id=str(turn["conversation_id"]),
+                    turn_id=str(turn["id"]),
+                    error=str(getattr(exc, "orig", None) or exc),
+                )
+        return stored
+
+
+@celery.task
+def flush_conversation_log() -> dict:
+    """Bulk-insert chat exchanges queued on the conversation log stream.
+
+    Scheduled by Celery beat every CONVERSATION_FLUSH_INTERVAL_SECONDS. Entries are
+    read through a consumer group and acknowledged (and deleted) only once stored,
+    so delivery is at least once; entries a crashed run left unacknowledged are
+    reclaimed after CONVERSATION_FLUSH_CLAIM_IDLE_SECONDS.
+    """
+    r = get_sync_redis()
+    key = settings.CONVERSATION_STREAM_KEY
+    batch_size = settings.CONVERSATION_FLUSH_BATCH_SIZE
+    consumer = f"{socket.gethostname()}-{os.getpid()}"
+    _ensure_group(r)
+
+    def flush(entries: list[tuple[bytes, dict]]) -> int:
+        stored = _store(entries)
+        ids = [entry_id for entry_id, _ in entries]
+        r.xack(key, _GROUP, *ids)
+        r.xdel(key, *ids)
+        return stored
+
+    stored = read = 0
+
+    # 1. Entries read by a flusher that died before acknowledging them
+    _, claimed, *_ = r.xautoclaim(
+        key, _GROUP, consumer,
+        min_idle_time=settings.CONVERSATION_FLUSH_CLAIM_IDLE_SECONDS * 1000,
+        start_id="0-0",
+        count=batch_size,
+    )
+    if claimed:
+        logger.info("conversation_log.reclaimed", count=len(claimed))
+        stored += flush(claimed)
+        read += len(claimed)
+
+    # 2. New entries, a bounded number of batches per run
+    for _ in range(settings.CONVERSATION_FLUSH_MAX_BATCHES):
+        response = r.xreadgroup(_GROUP, consumer, {key: ">"}, count=batch_size)
+        if not response or not response[0][1]:
+            break
+        entries = response[0][1]
+        stored += flush(entries)
+        read += len(entries)
+
+    if read:
+        logger.info("conversation_log.flushed", read=read, stored=stored)
+    return {"read": read, "stored": stored}
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import random
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import openai
+import structlog
+from redis.exceptions import RedisError
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_random_exponential
+
+from app.config import settings
+from app.core.cache.client import get_sync_redis
+from app.core.llm.clients import get_sync_client
+from app.core.llm.tokens import count_tokens
+
+logger = structlog.get_logger()
+
+_RETRYABLE = (
+    openai.RateLimitError,
+    openai.APIConnectionError,
+    openai.APITimeoutError,
+    openai.InternalServerError,
+)
+
+
+def plan_batches(token_counts: list[int], max_tokens: int, max_items: int) -> list[slice]:
+    """Group consecutive inputs into batches bounded by total tokens and item count."""
+    batches = []
+    start = 0
+    batch_tokens = 0
+    for i, tokens in enumerate(token_counts):
+        if i > start and (batch_tokens + tokens > max_tokens or i - start >= max_items):
+            batches.append(slice(start, i))
+            start = i
+            batch_tokens = 0
+        batch_tokens += tokens
+    if start < len(token_counts):
+        batches.append(slice(start, len(token_counts)))
+    return batches
+
+
+class RedisRateLimiter:
+    """Requests/tokens per minute budget shared by every worker through Redis.
+
+    Uses fixed one-minute windows: a caller reserves its request and tokens in the
+    current window and, if that overshoots the budget, gives them back and sleeps
+    until the next window. A limit of 0 disables that dimension.
+    """
+
+    def __init__(self, name: str, rpm: int, tpm: int):
+        self.name = name
+        self.rpm = rpm
+        self.tpm = tpm
+
+    def acquire(self, tokens: int) -> None:
+        if not self.rpm and not self.tpm:
+            return
+        redis = get_sync_redis()
+        while True:
+            window = int(time.time() // 60)
+            requests_key = f"ratelimit:{self.name}:{window}:requests"
+            tokens_key = f"ratelimit:{self.name}:{window}:tokens"
+            try:
+                with redis.pipeline() as pipe:
+                    pipe.incr(requests_key)
+                    pipe.incrby(tokens_key, tokens)
+                    pipe.expire(requests_key, 120)
+                    pipe.expire(tokens_key, 120)
+                    used_requests, used_tokens, _, _ = pipe.execute()
+                if (not self.rpm or used_requests <= self.rpm) and (not self.tpm or used_tokens <= self.tpm):
+                    return
+                with redis.pipeline() as pipe:
+                    pipe.decr(requests_key)
+                    pipe.decrby(tokens_key, tokens)
+                    pipe.execute()
+            except RedisError as exc:
+                # Don't stall ingestion on a Redis outage; the API's own 429s still apply
+                logger.warning("ratelimit.unavailable", name=self.name, error=str(exc))
+                return
+            time.sleep(60 - time.time() % 60 + random.uniform(0, 1))
+
+
+_limiter = RedisRateLimiter(
+    "openai_embeddings", settings.EMBEDDING_RPM_LIMIT, settings.EMBEDDING_TPM_LIMIT
+)
+
+
+@retry(
+    retry=retry_if_exception_type(_RETRYABLE),
+    wait=wait_random_exponential(multiplier=1, max=30),
+    stop=stop_after_attempt(settings.EMBEDDING_BATCH_MAX_ATTEMPTS),
+    reraise=True,
+)
+def _embed_batch(batch: list[str], tokens: int) -> list[list[float]]:
+    _limiter.acquire(tokens)
+    # Retries are handled here so every attempt goes through the rate limiter
+    client = get_sync_client().with_options(max_retries=0)
+    resp = client.embeddings.create(
+        input=batch,
+        model=settings.OPENAI_EMBEDDING_MODEL,
+        timeout=settings.OPENAI_EMBEDDING_TIMEOUT_SECONDS,
+    )
+    return [item.embedding for item in resp.data]
+
+
+def embed_in_batches(
+    texts: list[str],
+    on_batch: Callable[[list[str], list[list[float]]], None] | None = None,
+) -> dict[str, list[float]]:
+    """Embed texts in token-sized batches, several in flight at once.
+
+    A failing batch is retried on its own with jittered backoff. on_batch is called
+    from the calling thread as each batch completes, so finished work can be saved
+    even if a later batch ultimately fails.
+    """
+    max_tokens = settings.EMBEDDING_BATCH_MAX_TOKENS
+    if settings.EMBEDDING_TPM_LIMIT:
+        max_tokens = min(max_tokens, settings.EMBEDDING_TPM_LIMIT)
+    token_counts = [count_tokens(t, settings.OPENAI_EMBEDDING_MODEL) for t in texts]
+    batches = plan_batches(token_counts, max_tokens, settings.EMBEDDING_BATCH_MAX_ITEMS)
+
+    results: dict[str, list[float]] = {}
+    error: Exception | None = None
+    with ThreadPoolExecutor(max_workers=settings.EMBEDDING_CONCURRENCY) as pool:
+        futures = {
+            pool.submit(_embed_batch, texts[s], sum(token_counts[s])): texts[s] for s in batches
+        }
+        for future in as_completed(futures):
+            batch = futures[future]
+            try:
+                embeddings = future.result()
+            except Exception as exc:
+                logger.error("embedding.batch_failed", size=len(batch), error=str(exc))
+                error = error or exc
+                continue
+            if on_batch:
+                on_batch(batch, embeddings)
+            results.update(zip(batch, embeddings))
+
+    if error is not None:
+        raise error
+    logger.info("embedding.batches_done", batches=len(batches), texts=len(texts), tokens=sum(token_counts))
+    return results
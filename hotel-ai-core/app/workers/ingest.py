@@ -1,74 +1,181 @@
 from __future__ import annotations
 
-import io
+import codecs
+import tempfile
+import time
 import uuid
+from collections.abc import Iterable, Iterator
+from itertools import islice
+from typing import IO
 
 import structlog
-from sqlalchemy import create_engine, delete
+from sqlalchemy import create_engine, delete, insert, select, update
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import Session
 
 from app.config import settings
-from app.core.kb.chunking import chunk_text
+from app.core.cache.embeddings import get_cached_embeddings_sync, set_cached_embeddings_sync
+from app.core.kb.chunking import index_chunk_hashes, iter_page_chunks, match_chunks
+from app.core.kb.embedding_store import content_hash, load_shared_embeddings, save_shared_embeddings
+from app.core.kb.partitions import ensure_embedding_partition, tenants_without_partition
 from app.core.kb.service import get_s3_client
+from app.core.kb.version import bump_kb_version_sync
 from app.db.models import Base, KBChunk, KBDocument, KBEmbedding
 from app.workers.celery_app import celery
+from app.workers.embedding import embed_in_batches
+from app.workers.pdf import iter_pdf_pages
 
 logger = structlog.get_logger()
 
 # Sync engine for Celery tasks (Celery doesn't support async natively)
 sync_engine = create_engine(settings.DATABASE_URL_SYNC, pool_pre_ping=True)
 
+_READ_BLOCK_SIZE = 64 * 1024
 
-def _download_from_s3(storage_url: str) -> bytes:
-    """Download file bytes from S3 storage URL."""
+
+def _download_from_s3(storage_url: str) -> IO[bytes]:
+    """Stream an S3 object into a spooled temp file (in memory up to INGEST_SPOOL_MAX_BYTES)."""
     # Parse s3://bucket/key format
     parts = storage_url.replace("s3://", "").split("/", 1)
     bucket = parts[0]
     key = parts[1]
 
     client = get_s3_client()
-    response = client.get_object(Bucket=bucket, Key=key)
-    return response["Body"].read()
+    fileobj = tempfile.SpooledTemporaryFile(max_size=settings.INGEST_SPOOL_MAX_BYTES)
+    client.download_fileobj(bucket, key, fileobj)
+    fileobj.seek(0)
+    return fileobj
 
 
-def _parse_document(file_bytes: bytes, source_type: str) -> str:
-    """Parse document to text based on source type."""
-    if source_type == "pdf":
-        from pypdf import PdfReader
+def _iter_document_text(fileobj: IO[bytes], source_type: str) -> Iterator[tuple[int | None, str]]:
+    """Yield (page_number, text) pieces of a document: PDF pages, or decoded blocks of text.
 
-        reader = PdfReader(io.BytesIO(file_bytes))
-        return "\n".join(page.extract_text() or "" for page in reader.pages)
-    elif source_type == "text":
-        return file_bytes.decode("utf-8")
+    Concatenating the texts gives the full document text. Page numbers are None for
+    formats without pages.
+    """
+    if source_type == "pdf":
+        for page, text in iter_pdf_pages(fileobj):
+            if page > 1:
+                yield page - 1, "\n"
+            yield page, text
     else:
-        return file_bytes.decode("utf-8", errors="replace")
+        errors = "strict" if source_type == "text" else "replace"
+        decoder = codecs.getincrementaldecoder("utf-8")(errors=errors)
+        while block := fileobj.read(_READ_BLOCK_SIZE):
+            yield None, decoder.decode(block)
+        yield None, decoder.decode(b"", final=True)
+
+
+def _batched(items: Iterable[dict], size: int) -> Iterator[list[dict]]:
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
 
 
 def _embed_texts_sync(texts: list[str]) -> list[list[float]]:
-    """Synchronous embedding call for use in Celery tasks."""
-    from openai import OpenAI
+    """Synchronous embedding call for use in Celery tasks.
+
+    Lookup order: embedding cache (LRU + Redis), then the cross-tenant shared
+    embedding store, then the embeddings API. Texts seen before, by any tenant
+    or in an earlier reindex, cost no API call.
+    """
+    model = settings.OPENAI_EMBEDDING_MODEL
+    results = get_cached_embeddings_sync(texts)
+    missing = list(dict.fromkeys(t for t, e in zip(texts, results) if e is None))
+    if not missing:
+        return results
 
-    client = OpenAI(api_key=settings.OPENAI_API_KEY)
-    # Process in batches of 100 to respect API limits
-    all_embeddings = []
-    for i in range(0, len(texts), 100):
-        batch = texts[i : i + 100]
-        resp = client.embeddings.create(input=batch, model=settings.OPENAI_EMBEDDING_MODEL)
-        all_embeddings.extend([item.embedding for item in resp.data])
-    return all_embeddings
+    hashes = {t: content_hash(t) for t in missing}
+    with sync_engine.connect() as conn:
+        shared = load_shared_embeddings(conn, list(hashes.values()), model)
+    found = {t: shared[h] for t, h in hashes.items() if h in shared}
+    set_cached_embeddings_sync(list(found), list(found.values()))
+    to_embed = [t for t in missing if t not in found]
+
+    def save_batch(batch: list[str], batch_embeddings: list[list[float]]) -> None:
+        set_cached_embeddings_sync(batch, batch_embeddings)
+        with sync_engine.begin() as conn:
+            save_shared_embeddings(conn, {hashes[t]: e for t, e in zip(batch, batch_embeddings)}, model)
+
+    if to_embed:
+        found.update(embed_in_batches(to_embed, on_batch=save_batch))
+
+    logger.info(
+        "ingest.embedding_reuse",
+        cached=len(texts) - len(missing),
+        shared=len(missing) - len(to_embed),
+        embedded=len(to_embed),
+    )
+    return [e if e is not None else found[t] for t, e in zip(texts, results)]
+
+
+def _elapsed_ms(start: float) -> int:
+    return int((time.perf_counter() - start) * 1000)
+
+
+def _insert_chunks(
+    db: Session,
+    tenant_id: uuid.UUID,
+    document_id: uuid.UUID,
+    chunks: list[dict],
+    embeddings: list[list[float]],
+) -> None:
+    """Write chunks and their embeddings with multi-row INSERTs.
+
+    Chunk ids are generated client-side so no flush is needed to link embeddings.
+    """
+    batch_size = settings.INGEST_INSERT_BATCH_SIZE
+    for i in range(0, len(chunks), batch_size):
+        chunk_rows = []
+        embedding_rows = []
+        for chunk_data, embedding in zip(chunks[i : i + batch_size], embeddings[i : i + batch_size]):
+            chunk_id = uuid.uuid4()
+            chunk_rows.append({
+                "id": chunk_id,
+                "tenant_id": tenant_id,
+                "document_id": document_id,
+                "chunk_text": chunk_data["chunk_text"],
+                "chunk_hash": chunk_data["chunk_hash"],
+                "page_start": chunk_data["page_start"],
+                "page_end": chunk_data["page_end"],
+            })
+            embedding_rows.append({
+                "chunk_id": chunk_id,
+                "tenant_id": tenant_id,
+                "embedding": embedding,
+                "model": settings.OPENAI_EMBEDDING_MODEL,
+            })
+        db.execute(insert(KBChunk), chunk_rows)
+        db.execute(insert(KBEmbedding), embedding_rows)
 
 
 @celery.task(bind=True, max_retries=3, default_retry_delay=60)
 def process_document(self, document_id: str, tenant_id: str) -> dict:
-    """Ingest a document: download → parse → chunk → embed → store.
+    """Ingest a document: download → parse → chunk → diff → embed → store.
+
+    Runs as a streaming pipeline: the file is spooled to disk, parsed page by page
+    (long PDFs in a process pool, see app.workers.pdf) and chunked incrementally,
+    and chunks are embedded and inserted in batches of INGEST_PIPELINE_BATCH_SIZE,
+    so memory stays flat regardless of document size.
 
-    Idempotent: existing chunks for the document are deleted before re-inserting.
+    Idempotent and incremental: stored chunks whose hash is unchanged (and whose
+    embedding came from the current model) are kept, only new chunks are embedded
+    and inserted, and chunks that no longer occur are deleted.
     """
     doc_uuid = uuid.UUID(document_id)
     tenant_uuid = uuid.UUID(tenant_id)
 
     logger.info("ingest.start", document_id=document_id, tenant_id=tenant_id)
 
+    # Normally create_embedding_partitions has created the tenant's partition
+    # already; the attach times out rather than queue behind running ingests
+    try:
+        with sync_engine.begin() as conn:
+            ensure_embedding_partition(conn, tenant_uuid)
+    except OperationalError as exc:
+        logger.warning("ingest.partition_busy", tenant_id=tenant_id, error=str(exc.orig))
+        raise self.retry(exc=exc)
+
     with Session(sync_engine) as db:
         try:
             # 1. Get document
@@ -78,49 +185,84 @@ def process_document(self, document_id: str, tenant_id: str) -> dict:
                 return {"status": "error", "detail": "Document not found"}
 
             # 2. Download from S3
-            file_bytes = _download_from_s3(doc.storage_url)
-            logger.info("ingest.downloaded", size=len(file_bytes))
-
-            # 3. Parse to text
-            text = _parse_document(file_bytes, doc.source_type)
-            logger.info("ingest.parsed", text_length=len(text))
-
-            # 4. Chunk
-            chunks = chunk_text(text)
-            logger.info("ingest.chunked", chunk_count=len(chunks))
-
-            # 5. Embed
-            chunk_texts = [c["chunk_text"] for c in chunks]
-            embeddings = _embed_texts_sync(chunk_texts)
-            logger.info("ingest.embedded", embedding_count=len(embeddings))
-
-            # 6. Delete existing chunks (idempotent reindex)
-            db.execute(delete(KBChunk).where(KBChunk.document_id == doc_uuid))
-
-            # 7. Insert new chunks + embeddings
-            for chunk_data, embedding in zip(chunks, embeddings):
-                chunk_obj = KBChunk(
-                    tenant_id=tenant_uuid,
-                    document_id=doc_uuid,
-                    chunk_text=chunk_data["chunk_text"],
-                    chunk_hash=chunk_data["chunk_hash"],
-                )
-                db.add(chunk_obj)
-                db.flush()
+            started = time.perf_counter()
+            fileobj = _download_from_s3(doc.storage_url)
+            logger.info("ingest.downloaded", size=fileobj.seek(0, 2), elapsed_ms=_elapsed_ms(started))
+            fileobj.seek(0)
 
-                emb_obj = KBEmbedding(
-                    chunk_id=chunk_obj.id,
-                    tenant_id=tenant_uuid,
-                    embedding=embedding,
+            # 3. Index stored chunks; unchanged ones keep their embeddings
+            stored = db.execute(
+                select(KBChunk.id, KBChunk.chunk_hash, KBChunk.page_start, KBChunk.page_end, KBEmbedding.model)
+                .outerjoin(KBEmbedding, KBEmbedding.chunk_id == KBChunk.id)
+                .where(KBChunk.document_id == doc_uuid)
+            ).all()
+            reusable = index_chunk_hashes(
+                (row.id, row.chunk_hash) for row in stored if row.model == settings.OPENAI_EMBEDDING_MODEL
+            )
+            stale_ids = [row.id for row in stored if row.model != settings.OPENAI_EMBEDDING_MODEL]
+            stored_pages = {row.id: (row.page_start, row.page_end) for row in stored}
+
+            # 4. Parse → chunk → diff → embed → insert, one bounded batch at a time
+            total = added = relocated = 0
+            timings = {"parse_ms": 0, "embed_ms": 0, "store_ms": 0}
+            with fileobj:
+                batches = _batched(
+                    iter_page_chunks(_iter_document_text(fileobj, doc.source_type)),
+                    settings.INGEST_PIPELINE_BATCH_SIZE,
                 )
-                db.add(emb_obj)
+                while True:
+                    started = time.perf_counter()
+                    batch = next(batches, None)
+                    timings["parse_ms"] += _elapsed_ms(started)
+                    if batch is None:
+                        break
+
+                    to_add, kept = match_chunks(reusable, batch)
+                    moved = [
+                        {"id": chunk_id, "page_start": c["page_start"], "page_end": c["page_end"]}
+                        for chunk_id, c in kept
+                        if stored_pages[chunk_id] != (c["page_start"], c["page_end"])
+                    ]
+                    started = time.perf_counter()
+                    embeddings = _embed_texts_sync([c["chunk_text"] for c in to_add]) if to_add else []
+                    timings["embed_ms"] += _elapsed_ms(started)
+
+                    started = time.perf_counter()
+                    _insert_chunks(db, tenant_uuid, doc_uuid, to_add, embeddings)
+                    if moved:
+                        # Unchanged text that shifted to other pages keeps its embedding
+                        db.execute(update(KBChunk), moved)
+                    timings["store_ms"] += _elapsed_ms(started)
+
+                    total += len(batch)
+                    added += len(to_add)
+                    relocated += len(moved)
 
-            # 8. Mark document as ready
+            # 5. Delete chunks that vanished or were embedded with another model
+            to_delete = [chunk_id for ids in reusable.values() for chunk_id in ids] + stale_ids
+            if to_delete:
+                db.execute(delete(KBChunk).where(KBChunk.id.in_(to_delete)))
+            logger.info(
+                "ingest.stored",
+                chunks=total,
+                kept=total - added,
+                added=added,
+                moved=relocated,
+                deleted=len(to_delete),
+                **timings,
+            )
+
+            # 6. Mark document as ready
             doc.status = "ready"
             db.commit()
 
-            logger.info("ingest.complete", document_id=document_id, chunks=len(chunks))
-            return {"status": "ready", "chunks": len(chunks)}
+            # 7. Invalidate the tenant's cached answers and indexes if the KB changed;
+            #    moved chunks change the page numbers cited
+            if added or to_delete or relocated:
+                bump_kb_version_sync(tenant_uuid)
+
+            logger.info("ingest.complete", document_id=document_id, chunks=total)
+            return {"status": "ready", "chunks": total, "embedded": added}
 
         except Exception as exc:
             db.rollback()
@@ -130,3 +272,27 @@ def process_document(self, document_id: str, tenant_id: str) -> dict:
                 db.commit()
             logger.error("ingest.failed", document_id=document_id, error=str(exc))
             raise self.retry(exc=exc)
+
+
+@celery.task
+def create_embedding_partitions() -> dict:
+    """Create the kb_embeddings partitions of tenants that have none yet.
+
+    Scheduled by Celery beat every KB_PARTITION_INTERVAL_SECONDS. Each partition
+    is attached in a transaction of its own; one that times out waiting for
+    running ingests is left for the next run.
+    """
+    with sync_engine.connect() as conn:
+        tenant_ids = tenants_without_partition(conn)
+    created = busy = 0
+    for tenant_id in tenant_ids:
+        try:
+            with sync_engine.begin() as conn:
+                ensure_embedding_partition(conn, tenant_id)
+            created += 1
+        except OperationalError as exc:
+            busy += 1
+            logger.warning("kb_partition.busy", tenant_id=str(tenant_id), error=str(exc.orig))
+    if tenant_ids:
+        logger.info("kb_partition.created", created=created, busy=busy)
+    return {"created": created, "busy": busy}
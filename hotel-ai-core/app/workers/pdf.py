@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import shutil
+import signal
+import tempfile
+import threading
+from collections import deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import IO
+
+import billiard
+import structlog
+from billiard.pool import ApplyResult
+from pypdf import PdfReader
+
+from app.config import settings
+
+logger = structlog.get_logger()
+
+
+class PageTimeout(Exception):
+    pass
+
+
+@contextmanager
+def _time_limit(seconds: float):
+    """Abort the enclosed block with PageTimeout after `seconds` (SIGALRM, main thread only)."""
+    if seconds <= 0 or threading.current_thread() is not threading.main_thread():
+        yield
+        return
+
+    def on_alarm(signum, frame):
+        raise PageTimeout()
+
+    previous = signal.signal(signal.SIGALRM, on_alarm)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def _extract_page(reader: PdfReader, index: int, timeout: float) -> str:
+    try:
+        with _time_limit(timeout):
+            return reader.pages[index].extract_text() or ""
+    except PageTimeout:
+        logger.warning("pdf.page_timeout", page=index + 1, timeout=timeout)
+    except Exception as exc:
+        logger.warning("pdf.page_failed", page=index + 1, error=str(exc))
+    return ""
+
+
+def _extract_range(path: str, start: int, stop: int, timeout: float) -> list[str]:
+    """Pool worker: extract pages [start, stop) of the PDF at `path`."""
+    reader = PdfReader(path)
+    return [_extract_page(reader, i, timeout) for i in range(start, stop)]
+
+
+def _iter_parallel(fileobj: IO[bytes], num_pages: int, workers: int) -> Iterator[tuple[int, str]]:
+    # Workers open the file themselves, so it needs a real path on disk
+    with tempfile.NamedTemporaryFile(suffix=".pdf") as tmp:
+        fileobj.seek(0)
+        shutil.copyfileobj(fileobj, tmp)
+        tmp.flush()
+
+        step = settings.PDF_PARSE_PAGES_PER_TASK
+        ranges = [(start, min(start + step, num_pages)) for start in range(0, num_pages, step)]
+        workers = min(workers, len(ranges))
+        # billiard's pool rather than concurrent.futures: ingest runs in Celery's
+        # prefork children, which are daemonic, and the stdlib refuses to start
+        # processes from a daemonic one
+        with billiard.Pool(processes=workers) as pool:
+            # Keep about one range per worker in flight, so at most that many
+            # ranges of text are held while the consumer catches up
+            pending: deque[tuple[int, ApplyResult]] = deque()
+            for start, stop in ranges:
+                pending.append(
+                    (
+                        start,
+                        pool.apply_async(
+                            _extract_range, (tmp.name, start, stop, settings.PDF_PAGE_TIMEOUT_SECONDS)
+                        ),
+                    )
+                )
+                if len(pending) >= workers:
+                    yield from _pages(*pending.popleft())
+            while pending:
+                yield from _pages(*pending.popleft())
+
+
+def _pages(start: int, result: ApplyResult) -> Iterator[tuple[int, str]]:
+    # Ranges are consumed in submission order, so pages come out in document order
+    for offset, text in enumerate(result.get()):
+        yield start + offset + 1, text
+
+
+def iter_pdf_pages(fileobj: IO[bytes]) -> Iterator[tuple[int, str]]:
+    """Yield (page_number, text) for every page of a PDF, in order; page numbers start at 1.
+
+    Long documents are split into page ranges parsed in a process pool of
+    PDF_PARSE_WORKERS; short ones, or PDF_PARSE_WORKERS <= 1, are parsed serially.
+    Each page gets at most PDF_PAGE_TIMEOUT_SECONDS; a page that times out or fails
+    to parse contributes no text instead of failing the document.
+    """
+    reader = PdfReader(fileobj)
+    num_pages = len(reader.pages)
+    workers = settings.PDF_PARSE_WORKERS
+
+    if workers > 1 and num_pages >= settings.PDF_PARALLEL_MIN_PAGES:
+        emitted = 0
+        try:
+            for page in _iter_parallel(fileobj, num_pages, workers):
+                yield page
+                emitted += 1
+            return
+        except OSError as exc:
+            # No pool could be started (e.g. out of processes or no /dev/shm);
+            # parse serially instead
+            if emitted:
+                raise
+            logger.warning("pdf.parallel_unavailable", workers=workers, error=str(exc))
+
+    timeout = settings.PDF_PAGE_TIMEOUT_SECONDS
+    for i in range(num_pages):
+        yield i + 1, _extract_page(reader, i, timeout)
@@ -0,0 +1,126 @@
+"""Count SQL statements and DB time per POST /public/chat.
+
+The RAG pipeline is replaced by a canned answer (optionally after a delay
+standing in for the LLM call), so only the request's own database work (widget
+key / conversation validation and turn persistence) is measured. With
+--concurrency > 1 it also shows whether concurrent chats are limited by the
+connection pool rather than by the (simulated) LLM. Runs against the
+configured database with a throwaway tenant.
+
+Usage (from hotel-ai-core, after `alembic upgrade head`):
+    python benchmarks/chat_queries.py --requests 200
+    DB_POOL_SIZE=5 DB_MAX_OVERFLOW=0 python benchmarks/chat_queries.py \
+        --requests 200 --concurrency 50 --llm-delay-ms 500
+"""
+
+import argparse
+import asyncio
+import secrets
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import delete, event
+
+import app.api.public as public
+from app.db.models import Tenant, WidgetKey
+from app.db.session import async_session, engine
+from app.main import app
+
+CANNED = {
+    "outcome": "answered",
+    "answer_text": "Breakfast is served 07:00-10:30.",
+    "citations": [{"document_id": "d", "title": "Guide", "chunk_id": "c", "page_start": None, "page_end": None}],
+    "confidence": 0.9,
+    "escalation": None,
+}
+
+
+class QueryTimer:
+    """SQL statement count and cumulative execution time."""
+
+    def __init__(self):
+        self.statements = 0
+        self.seconds = 0.0
+
+    def before(self, conn, cursor, statement, parameters, context, executemany):
+        context._bench_started = time.perf_counter()
+
+    def after(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements += 1
+        self.seconds += time.perf_counter() - context._bench_started
+
+
+async def main(requests: int, concurrency: int, llm_delay_ms: int) -> None:
+    async def fake_rag_answer(*args, **kwargs):
+        await asyncio.sleep(llm_delay_ms / 1000)
+        return dict(CANNED)
+
+    public.rag_answer = fake_rag_answer
+
+    async with async_session() as db:
+        tenant = Tenant(name="Bench", slug=f"bench-chat-{secrets.token_hex(4)}", status="active")
+        db.add(tenant)
+        await db.flush()
+        wk = WidgetKey(tenant_id=tenant.id, key=f"wk_bench_{secrets.token_hex(8)}", status="active")
+        db.add(wk)
+        await db.commit()
+        tenant_id, widget_key = tenant.id, wk.key
+
+    timer = QueryTimer()
+    event.listen(engine.sync_engine, "before_cursor_execute", timer.before)
+    event.listen(engine.sync_engine, "after_cursor_execute", timer.after)
+
+    total_ms = []
+    try:
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://bench", timeout=None
+        ) as client:
+            resp = await client.post("/public/conversation/start", json={"widget_key": widget_key})
+            conversation_id = resp.json()["conversation_id"]
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def one(i: int) -> None:
+                async with semaphore:
+                    started = time.perf_counter()
+                    resp = await client.post(
+                        "/public/chat",
+                        json={"widget_key": widget_key, "conversation_id": conversation_id, "message": f"q{i}"},
+                    )
+                    resp.raise_for_status()
+                    total_ms.append((time.perf_counter() - started) * 1000)
+
+            timer.statements, timer.seconds = 0, 0.0
+            wall_started = time.perf_counter()
+            await asyncio.gather(*(one(i) for i in range(requests)))
+            wall = time.perf_counter() - wall_started
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", timer.before)
+        event.remove(engine.sync_engine, "after_cursor_execute", timer.after)
+        async with async_session() as db:
+            await db.execute(delete(Tenant).where(Tenant.id == tenant_id))
+            await db.commit()
+        await engine.dispose()
+
+    total_ms.sort()
+    print(f"requests={requests} concurrency={concurrency} llm_delay={llm_delay_ms}ms")
+    print(f"SQL statements/request  mean={timer.statements / requests:.2f}")
+    print(f"DB time/request         mean={timer.seconds * 1000 / requests:.2f}ms")
+    print(
+        f"request time            mean={statistics.mean(total_ms):.2f}ms  median={statistics.median(total_ms):.2f}ms"
+        f"  p95={total_ms[int(len(total_ms) * 0.95) - 1]:.2f}ms"
+    )
+    print(f"throughput              {requests / wall:.1f} req/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--llm-delay-ms", type=int, default=0)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency, args.llm_delay_ms))
@@ -0,0 +1,130 @@
+"""A stand-in for the OpenAI API, for load tests and benchmarks.
+
+Serves the two endpoints the app calls:
+
+- POST /v1/embeddings: deterministic embeddings. Every word is hashed to a fixed
+  random direction and a text's embedding is the normalized sum of its words',
+  so texts sharing words are similar and retrieval behaves sensibly.
+- POST /v1/chat/completions: a canned answer after FAKE_OPENAI_CHAT_LATENCY_MS,
+  either whole or (stream=true) as FAKE_OPENAI_STREAM_CHUNKS deltas spread over
+  that latency, with usage in the last chunk when include_usage is set.
+
+Usage (from hotel-ai-core):
+    FAKE_OPENAI_CHAT_LATENCY_MS=300 uvicorn benchmarks.fake_openai:app --port 8100
+then point the app at it with OPENAI_BASE_URL=http://localhost:8100/v1.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import time
+import uuid
+from functools import lru_cache
+
+import numpy as np
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+DIM = 1536
+CHAT_LATENCY_MS = float(os.environ.get("FAKE_OPENAI_CHAT_LATENCY_MS", "300"))
+STREAM_CHUNKS = int(os.environ.get("FAKE_OPENAI_STREAM_CHUNKS", "20"))
+ANSWER = (
+    "Breakfast is served every day from 07:00 to 10:30 in the restaurant on the ground floor. "
+    "Guests with early departures can ask reception for a breakfast bag the evening before."
+)
+
+_WORD_RE = re.compile(r"\w+")
+
+app = FastAPI(title="Fake OpenAI")
+
+
+@lru_cache(maxsize=50_000)
+def _word_vector(word: str) -> np.ndarray:
+    seed = int.from_bytes(hashlib.sha256(word.encode()).digest()[:8], "little")
+    return np.random.default_rng(seed).standard_normal(DIM).astype(np.float32)
+
+
+def embed(text: str) -> list[float]:
+    words = _WORD_RE.findall(text.lower())
+    vec = np.sum([_word_vector(w) for w in words], axis=0) if words else _word_vector("")
+    return (vec / np.linalg.norm(vec)).tolist()
+
+
+def _tokens(text: str) -> int:
+    return len(text) // 4 + 1
+
+
+@app.get("/health")
+async def health():
+    return {"status": "ok"}
+
+
+@app.post("/v1/embeddings")
+async def embeddings(request: Request):
+    body = await request.json()
+    inputs = body["input"] if isinstance(body["input"], list) else [body["input"]]
+    tokens = sum(_tokens(text) for text in inputs)
+    return {
+        "object": "list",
+        "data": [{"object": "embedding", "index": i, "embedding": embed(text)} for i, text in enumerate(inputs)],
+        "model": body["model"],
+        "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+    }
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    prompt_tokens = sum(_tokens(m.get("content") or "") for m in body["messages"])
+    usage = {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": _tokens(ANSWER),
+        "total_tokens": prompt_tokens + _tokens(ANSWER),
+        "prompt_tokens_details": {"cached_tokens": 0},
+    }
+    completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+    created = int(time.time())
+
+    if not body.get("stream"):
+        await asyncio.sleep(CHAT_LATENCY_MS / 1000)
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": body["model"],
+            "choices": [
+                {"index": 0, "message": {"role": "assistant", "content": ANSWER}, "finish_reason": "stop"}
+            ],
+            "usage": usage,
+        }
+
+    include_usage = (body.get("stream_options") or {}).get("include_usage", False)
+    words = ANSWER.split(" ")
+    step = max(len(words) // STREAM_CHUNKS, 1)
+    pieces = [" ".join(words[i : i + step]) + " " for i in range(0, len(words), step)]
+
+    def chunk(delta: dict, finish_reason: str | None = None, chunk_usage: dict | None = None) -> str:
+        choices = [] if chunk_usage else [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+        data = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": created,
+            "model": body["model"],
+            "choices": choices,
+            "usage": chunk_usage,
+        }
+        return f"data: {json.dumps(data)}\n\n"
+
+    async def events():
+        yield chunk({"role": "assistant", "content": ""})
+        for piece in pieces:
+            await asyncio.sleep(CHAT_LATENCY_MS / 1000 / len(pieces))
+            yield chunk({"content": piece})
+        yield chunk({}, finish_reason="stop")
+        if include_usage:
+            yield chunk({}, chunk_usage=usage)
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
@@ -0,0 +1,483 @@
+"""Load-test the API end to end, with local stand-ins for OpenAI and S3.
+
+Starts the fake OpenAI server (benchmarks/fake_openai.py), the API and a Celery
+worker as subprocesses against the configured Postgres, Redis and S3 endpoint
+(docker-compose.bench.yml provides all three, with MinIO standing in for S3),
+then drives KB ingestion, /public/conversation/start, /public/chat and
+/public/chat/stream at the given concurrency. Reports throughput, p50/p95/p99
+latency and database statements per request, and compares them with stored
+baselines.
+
+Statements are counted with pg_stat_statements when the server preloads it
+(the benchmark database does); otherwise transactions per request are reported
+from pg_stat_database, which needs a pause after each scenario for idle
+connections to report their counts.
+
+Usage (from hotel-ai-core, after `alembic upgrade head`):
+    python benchmarks/load.py --requests 200 --concurrency 20
+    python benchmarks/load.py --compare benchmarks/baselines.json
+    python benchmarks/load.py --update-baselines benchmarks/baselines.json
+or the whole stack, from the repository root: make bench
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import secrets
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import httpx
+from sqlalchemy import create_engine, delete, text
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.auth.jwt import create_access_token
+from app.core.kb.partitions import drop_embedding_partition
+from app.db.models import Tenant, TenantSetting, TenantUserRole, User, WidgetKey
+
+SCENARIOS = ("ingest", "conversation_start", "chat", "chat_stream")
+
+# Seconds an idle backend may hold its statistics before reporting them
+_PGSTAT_IDLE_SECONDS = 11
+
+# Hotel guide used for ingestion and the questions asked about it. Each topic is
+# a paragraph, so the fake embeddings (bags of words) match its questions.
+TOPICS = {
+    "breakfast": (
+        "Breakfast is served every morning in the ground floor restaurant. The breakfast buffet opens "
+        "at 07:00 and breakfast is served until 10:30 on weekdays and 11:00 on weekends. Breakfast "
+        "includes hot dishes, fresh bread, fruit and gluten free options. Guests leaving early can "
+        "order a breakfast bag from reception the evening before."
+    ),
+    "parking": (
+        "Parking is available in the garage under the hotel. Garage parking costs 25 EUR per night and "
+        "parking spaces cannot be reserved in advance. The parking garage has chargers for electric "
+        "cars; charging is billed with the parking fee. Street parking near the hotel is limited."
+    ),
+    "wifi": (
+        "Free wifi is available in all rooms and public areas. Connect to the wifi network named "
+        "Hotel-Guest; the wifi password is printed on your key card sleeve. For faster wifi in "
+        "meeting rooms ask reception for a premium wifi code."
+    ),
+    "checkin": (
+        "Check-in starts at 15:00 and check-out is at 11:00. Early check-in before 15:00 is possible "
+        "when rooms are ready and can be guaranteed for a fee. Late check-out until 14:00 can be "
+        "requested at reception, subject to availability. Luggage can be stored after check-out."
+    ),
+    "pool": (
+        "The indoor pool on the top floor is open from 06:30 to 22:00. Pool towels are provided at "
+        "the pool entrance. Children under 12 must be accompanied by an adult in the pool area. "
+        "The sauna next to the pool is open from 16:00 to 21:00."
+    ),
+    "pets": (
+        "Pets are welcome in selected rooms. Dogs and cats stay for 20 EUR per night, and pet beds "
+        "and bowls are available on request. Pets are not allowed in the restaurant or the pool "
+        "area. Please tell us about your pet when you book."
+    ),
+    "airport": (
+        "The airport shuttle leaves the hotel entrance every hour from 05:00 to 23:00. The airport "
+        "shuttle costs 12 EUR per person and the ride to the airport takes about 25 minutes. Taxis "
+        "to the airport can be booked at reception."
+    ),
+    "gym": (
+        "The gym on the first floor is open 24 hours for hotel guests, using the room key card. "
+        "The gym has treadmills, bikes, free weights and yoga mats. Personal training sessions in "
+        "the gym can be booked at reception."
+    ),
+}
+QUESTIONS = {
+    "breakfast": ("What time is breakfast served in the restaurant?", "Can I get a breakfast bag when leaving early?"),
+    "parking": ("How much does parking in the garage cost?", "Is there parking with chargers for electric cars?"),
+    "wifi": ("What is the wifi password?", "How do I connect to the wifi network?"),
+    "checkin": ("When is check-in and check-out?", "Can I request a late check-out?"),
+    "pool": ("When is the pool open?", "Are pool towels provided at the pool?"),
+    "pets": ("Are pets welcome, can I bring my dog?", "How much do pets cost per night?"),
+    "airport": ("How often does the airport shuttle leave?", "How much is the airport shuttle to the airport?"),
+    "gym": ("When is the gym open?", "Can I book personal training in the gym?"),
+}
+
+
+def guide(n: int) -> str:
+    """A KB document; every one differs so its chunks are embedded afresh."""
+    return "\n\n".join(f"{paragraph} (Guide {n}, section {topic}.)" for topic, paragraph in TOPICS.items())
+
+
+def question(i: int) -> str:
+    topic_questions = list(QUESTIONS.values())[i % len(QUESTIONS)]
+    # Unique text, so every request goes through the embedding call
+    return f"{topic_questions[i // len(QUESTIONS) % 2]} (guest {i})"
+
+
+def percentile(values: list[float], p: int) -> float:
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100, method="inclusive")[p - 1]
+
+
+# ── Services ─────────────────────────────────────────────────────────────────
+
+
+class Services:
+    """The fake OpenAI server, the API and a Celery worker, as subprocesses."""
+
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.logs = Path(tempfile.mkdtemp(prefix="bench-"))
+        self.processes: list[subprocess.Popen] = []
+        self.env = {
+            **os.environ,
+            "OPENAI_BASE_URL": f"http://127.0.0.1:{args.openai_port}/v1",
+            "OPENAI_API_KEY": os.environ.get("OPENAI_API_KEY") or "bench",
+            # Every request should run the whole pipeline
+            "ANSWER_CACHE_ENABLED": "false",
+            "LOG_LEVEL": "WARNING",
+            "FAKE_OPENAI_CHAT_LATENCY_MS": str(args.chat_latency_ms),
+            "FAKE_OPENAI_STREAM_CHUNKS": str(args.stream_chunks),
+        }
+
+    def _start(self, name: str, command: list[str]) -> None:
+        log = open(self.logs / f"{name}.log", "w")
+        self.processes.append(
+            subprocess.Popen(command, cwd=ROOT, env=self.env, stdout=log, stderr=subprocess.STDOUT)
+        )
+
+    async def start(self) -> None:
+        uvicorn = [sys.executable, "-m", "uvicorn", "--host", "127.0.0.1", "--log-level", "warning"]
+        self._start("fake_openai", [*uvicorn, "--port", str(self.args.openai_port), "benchmarks.fake_openai:app"])
+        self._start(
+            "api",
+            [*uvicorn, "--port", str(self.args.api_port), "--workers", str(self.args.api_workers), "app.main:app"],
+        )
+        self._start(
+            "worker",
+            [
+                sys.executable, "-m", "celery", "-A", "app.workers.celery_app", "worker",
+                "--concurrency", str(self.args.worker_concurrency), "--loglevel", "WARNING",
+                "--without-gossip", "--without-mingle",
+            ],
+        )
+        for port in (self.args.openai_port, self.args.api_port):
+            await self._wait_healthy(f"http://127.0.0.1:{port}/health")
+
+    async def _wait_healthy(self, url: str, timeout: float = 60) -> None:
+        deadline = time.monotonic() + timeout
+        async with httpx.AsyncClient() as client:
+            while time.monotonic() < deadline:
+                if any(p.poll() is not None for p in self.processes):
+                    break
+                try:
+                    if (await client.get(url)).status_code == 200:
+                        return
+                except httpx.TransportError:
+                    pass
+                await asyncio.sleep(0.2)
+        raise RuntimeError(f"{url} did not come up; see the logs in {self.logs}")
+
+    def stop(self) -> None:
+        for process in self.processes:
+            process.terminate()
+        for process in self.processes:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
+# ── Database ─────────────────────────────────────────────────────────────────
+
+
+class DbCounters:
+    """Statements (pg_stat_statements) or transactions (pg_stat_database) run so far."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements = True
+        try:
+            with engine.begin() as conn:
+                conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_stat_statements"))
+                conn.execute(text("SELECT 1 FROM pg_stat_statements LIMIT 1"))
+        except Exception:
+            self.statements = False
+
+    @property
+    def unit(self) -> str:
+        return "statements" if self.statements else "transactions"
+
+    def read(self) -> int:
+        if self.statements:
+            query = (
+                "SELECT coalesce(sum(calls), 0) FROM pg_stat_statements "
+                "WHERE dbid = (SELECT oid FROM pg_database WHERE datname = current_database()) "
+                "AND query NOT LIKE '%pg_stat%'"
+            )
+        else:
+            query = (
+                "SELECT xact_commit + xact_rollback FROM pg_stat_database WHERE datname = current_database()"
+            )
+        with self.engine.connect() as conn:
+            return int(conn.execute(text(query)).scalar())
+
+    def settle(self) -> None:
+        if not self.statements:
+            time.sleep(_PGSTAT_IDLE_SECONDS)
+
+
+def create_tenant(engine) -> dict:
+    suffix = secrets.token_hex(4)
+    with Session(engine) as db:
+        tenant = Tenant(name="Bench Hotel", slug=f"bench-load-{suffix}", status="active")
+        user = User(email=f"bench-load-{suffix}@bench.local")
+        db.add_all([tenant, user])
+        db.flush()
+        widget_key = f"wk_bench_{secrets.token_hex(8)}"
+        db.add_all([
+            TenantSetting(tenant_id=tenant.id, escalation_email="frontdesk@bench.local"),
+            TenantUserRole(tenant_id=tenant.id, user_id=user.id, role="owner"),
+            WidgetKey(tenant_id=tenant.id, key=widget_key, status="active"),
+        ])
+        db.commit()
+        return {
+            "tenant_id": str(tenant.id),
+            "user_id": user.id,
+            "widget_key": widget_key,
+            "token": create_access_token({"sub": str(user.id)}),
+        }
+
+
+def delete_tenant(engine, bench: dict) -> None:
+    with Session(engine) as db:
+        db.execute(delete(Tenant).where(Tenant.id == bench["tenant_id"]))
+        db.execute(delete(User).where(User.id == bench["user_id"]))
+        drop_embedding_partition(db.connection(), bench["tenant_id"])
+        db.commit()
+
+
+# ── Scenarios ────────────────────────────────────────────────────────────────
+
+
+async def run_scenario(name: str, requests: int, concurrency: int, one, counters: DbCounters) -> dict:
+    latencies: list[float] = []
+    errors: list[str] = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def timed(i: int) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await one(i)
+            except Exception as exc:
+                errors.append(f"{type(exc).__name__}: {exc}")
+                return
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    counters.settle()
+    db_before = counters.read()
+    started = time.perf_counter()
+    await asyncio.gather(*(timed(i) for i in range(requests)))
+    seconds = time.perf_counter() - started
+    counters.settle()
+    db_queries = counters.read() - db_before
+
+    if errors:
+        print(f"  {name}: {len(errors)} errors, first: {errors[0]}")
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": len(errors),
+        "throughput": round(requests / seconds, 2),
+        "p50_ms": round(percentile(latencies, 50), 1),
+        "p95_ms": round(percentile(latencies, 95), 1),
+        "p99_ms": round(percentile(latencies, 99), 1),
+        f"db_{counters.unit}_per_request": round(db_queries / requests, 2),
+    }
+
+
+async def run(args: argparse.Namespace, bench: dict, counters: DbCounters) -> dict:
+    admin_headers = {"Authorization": f"Bearer {bench['token']}"}
+    tenant_url = f"/admin/tenant/{bench['tenant_id']}"
+    widget_key = bench["widget_key"]
+    outcomes: dict[str, int] = {}
+    results = {}
+
+    limits = httpx.Limits(max_connections=args.concurrency * 2, max_keepalive_connections=args.concurrency * 2)
+    async with httpx.AsyncClient(
+        base_url=f"http://127.0.0.1:{args.api_port}", timeout=120, limits=limits
+    ) as client:
+
+        async def ingest(i: int) -> None:
+            resp = await client.post(
+                f"{tenant_url}/kb/text", json={"title": f"Guide {i}", "content": guide(i)}, headers=admin_headers
+            )
+            resp.raise_for_status()
+            doc_url = f"{tenant_url}/kb/documents/{resp.json()['document_id']}"
+            deadline = time.monotonic() + args.ingest_timeout
+            while time.monotonic() < deadline:
+                status = (await client.get(doc_url, headers=admin_headers)).json()["status"]
+                if status == "ready":
+                    return
+                if status == "failed":
+                    raise RuntimeError("ingestion failed")
+                await asyncio.sleep(0.1)
+            raise TimeoutError("document still processing")
+
+        async def start_conversation(i: int = 0) -> str:
+            resp = await client.post("/public/conversation/start", json={"widget_key": widget_key})
+            resp.raise_for_status()
+            return resp.json()["conversation_id"]
+
+        async def chat(i: int) -> None:
+            resp = await client.post(
+                "/public/chat",
+                json={"widget_key": widget_key, "conversation_id": conversations[i % len(conversations)],
+                      "message": question(i)},
+            )
+            resp.raise_for_status()
+            outcome = resp.json()["outcome"]
+            outcomes[outcome] = outcomes.get(outcome, 0) + 1
+
+        async def chat_stream(i: int) -> None:
+            body = {"widget_key": widget_key, "conversation_id": conversations[i % len(conversations)],
+                    "message": question(i)}
+            async with client.stream("POST", "/public/chat/stream", json=body) as resp:
+                resp.raise_for_status()
+                events = [line async for line in resp.aiter_lines() if line.startswith("event: ")]
+            if events[-1] != "event: done":
+                raise RuntimeError(f"stream ended with {events[-1]!r}")
+
+        scenarios = {
+            "ingest": (args.documents, min(args.concurrency, args.documents), ingest),
+            "conversation_start": (args.requests, args.concurrency, start_conversation),
+            "chat": (args.requests, args.concurrency, chat),
+            "chat_stream": (args.requests, args.concurrency, chat_stream),
+        }
+        conversations: list[str] = []
+        for name in args.scenarios:
+            if name in ("chat", "chat_stream") and not conversations:
+                conversations = [await start_conversation() for _ in range(args.concurrency)]
+            requests, concurrency, one = scenarios[name]
+            print(f"running {name}: {requests} requests, concurrency {concurrency}")
+            results[name] = await run_scenario(name, requests, concurrency, one, counters)
+
+    if outcomes:
+        print(f"chat outcomes: {outcomes}")
+    return results
+
+
+# ── Reporting ────────────────────────────────────────────────────────────────
+
+
+def print_table(results: dict) -> None:
+    columns = list(next(iter(results.values())))
+    print(f"\n{'scenario':<20}" + "".join(f"{c:>{len(c) + 2}}" for c in columns))
+    for name, result in results.items():
+        print(f"{name:<20}" + "".join(f"{result[c]:>{len(c) + 2}}" for c in columns))
+
+
+def compare(results: dict, baselines: dict, tolerance: float) -> list[str]:
+    """Regressions against the baselines: latency and throughput beyond the
+    tolerance, more database work per request, and errors. Database work that
+    was counted on one side only (statements vs transactions) fails too, since
+    it can't be compared. So does a baseline scenario that wasn't run."""
+    regressions = []
+    for name, base in baselines["scenarios"].items():
+        current = results.get(name)
+        if current is None:
+            regressions.append(f"{name}: missing from these results; run it or re-record the baselines")
+            continue
+        if current["errors"]:
+            regressions.append(f"{name}: {current['errors']} failed requests")
+        for key in ("p50_ms", "p95_ms", "p99_ms"):
+            if current[key] > base[key] * (1 + tolerance):
+                regressions.append(f"{name}: {key} {current[key]} > baseline {base[key]}")
+        if current["throughput"] < base["throughput"] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {current['throughput']} < baseline {base['throughput']}")
+        for key in ("db_statements_per_request", "db_transactions_per_request"):
+            if (key in current) != (key in base):
+                side = "these results" if key in base else "the baselines"
+                regressions.append(f"{name}: {key} missing from {side}; re-record the baselines")
+            # Counts are nearly deterministic; ingestion's include status polls
+            elif key in current and current[key] > base[key] * 1.1 + 0.5:
+                regressions.append(f"{name}: {key} {current[key]} > baseline {base[key]}")
+    return regressions
+
+
+def parameters(args: argparse.Namespace) -> dict:
+    return {
+        key: getattr(args, key)
+        for key in (
+            "requests",
+            "concurrency",
+            "documents",
+            "chat_latency_ms",
+            "stream_chunks",
+            "api_workers",
+            "worker_concurrency",
+        )
+    }
+
+
+async def main(args: argparse.Namespace) -> int:
+    engine = create_engine(settings.DATABASE_URL_SYNC)
+    counters = DbCounters(engine)
+    if not counters.statements:
+        print("pg_stat_statements is not loaded; counting transactions instead (slower, approximate)")
+
+    services = Services(args)
+    bench = create_tenant(engine)
+    try:
+        await services.start()
+        results = await run(args, bench, counters)
+    finally:
+        services.stop()
+        delete_tenant(engine, bench)
+        engine.dispose()
+
+    print_table(results)
+    if args.output:
+        Path(args.output).write_text(json.dumps({"parameters": parameters(args), "scenarios": results}, indent=2))
+
+    if args.update_baselines:
+        Path(args.update_baselines).write_text(
+            json.dumps({"parameters": parameters(args), "scenarios": results}, indent=2) + "\n"
+        )
+        print(f"\nbaselines written to {args.update_baselines}")
+    if args.compare:
+        baselines = json.loads(Path(args.compare).read_text())
+        if baselines["parameters"] != parameters(args):
+            print(f"\nbaselines were recorded with {baselines['parameters']}, not {parameters(args)}")
+            return 1
+        regressions = compare(results, baselines, args.tolerance)
+        if regressions:
+            print("\nREGRESSIONS:\n  " + "\n  ".join(regressions))
+            return 1
+        print(f"\nno regressions against {args.compare} (tolerance {args.tolerance:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=200, help="requests per chat/conversation scenario")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--documents", type=int, default=10, help="documents to ingest")
+    parser.add_argument("--chat-latency-ms", type=int, default=300, help="fake LLM response time")
+    parser.add_argument("--stream-chunks", type=int, default=20, help="deltas per fake streamed answer")
+    parser.add_argument("--api-workers", type=int, default=1)
+    parser.add_argument("--worker-concurrency", type=int, default=2, help="Celery worker processes")
+    parser.add_argument("--ingest-timeout", type=float, default=120, help="seconds to wait for a document")
+    parser.add_argument("--api-port", type=int, default=8001)
+    parser.add_argument("--openai-port", type=int, default=8100)
+    parser.add_argument("--output", help="write the results as JSON")
+    parser.add_argument("--compare", metavar="BASELINES", help="fail on regressions against this file")
+    parser.add_argument("--update-baselines", metavar="BASELINES", help="write the results as the new baselines")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed latency/throughput change")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,75 @@
+"""Benchmark serial vs page-parallel PDF parsing on a synthetic document.
+
+Usage (from hotel-ai-core):
+    python benchmarks/pdf_parse.py --pages 400 --workers 1 2 4 8
+"""
+
+import argparse
+import io
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from pypdf import PdfWriter
+from pypdf.generic import ContentStream, DictionaryObject, NameObject
+
+from app.config import settings
+from app.workers.pdf import iter_pdf_pages
+
+
+def build_pdf(pages: int, lines_per_page: int) -> bytes:
+    """A text-heavy PDF: every page holds `lines_per_page` lines of Helvetica text."""
+    writer = PdfWriter()
+    font = writer._add_object(DictionaryObject({
+        NameObject("/Type"): NameObject("/Font"),
+        NameObject("/Subtype"): NameObject("/Type1"),
+        NameObject("/BaseFont"): NameObject("/Helvetica"),
+    }))
+    for n in range(pages):
+        page = writer.add_blank_page(width=612, height=792)
+        page[NameObject("/Resources")] = DictionaryObject({
+            NameObject("/Font"): DictionaryObject({NameObject("/F1"): font}),
+        })
+        ops = ["BT", "/F1 9 Tf", "11 TL", "40 760 Td"]
+        for line in range(lines_per_page):
+            ops.append(f"(Page {n + 1} line {line}: breakfast is served from 07:00 to 10:30 daily) Tj T*")
+        ops.append("ET")
+        content = ContentStream(None, writer)
+        content.set_data("\n".join(ops).encode())
+        page.replace_contents(content)
+    buf = io.BytesIO()
+    writer.write(buf)
+    return buf.getvalue()
+
+
+def run(data: bytes, workers: int) -> tuple[float, int]:
+    settings.PDF_PARSE_WORKERS = workers
+    started = time.perf_counter()
+    pages = list(iter_pdf_pages(io.BytesIO(data)))
+    elapsed = time.perf_counter() - started
+    assert [n for n, _ in pages] == list(range(1, len(pages) + 1)), "pages out of order"
+    return elapsed, sum(len(text) for _, text in pages)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=400)
+    parser.add_argument("--lines", type=int, default=60)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    data = build_pdf(args.pages, args.lines)
+    print(f"synthetic PDF: {args.pages} pages, {len(data) / 1024:.0f} KiB")
+
+    baseline = None
+    for workers in args.workers:
+        elapsed, chars = run(data, workers)
+        baseline = baseline or elapsed
+        print(f"workers={workers:<3} {elapsed:7.2f}s  {args.pages / elapsed:7.1f} pages/s  "
+              f"speedup x{baseline / elapsed:.2f}  chars={chars}")
+
+
+if __name__ == "__main__":
+    main()
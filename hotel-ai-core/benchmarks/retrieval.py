@@ -0,0 +1,169 @@
+"""Benchmark tenant-scoped vector search: recall@k and latency per hnsw.ef_search.
+
+Loads synthetic tenants (clustered random unit vectors) into the configured
+database, then queries each sampled tenant through search_similar_chunks and
+compares against an exact scan of that tenant's vectors.
+
+Usage (from hotel-ai-core, after `alembic upgrade head`):
+    python benchmarks/retrieval.py --tenants 50 --chunks 2000
+    python benchmarks/retrieval.py --tenants 1000 --chunks 10000 --keep   # full scale, slow to load
+    python benchmarks/retrieval.py --tenants 1000 --chunks 10000 --skip-load
+
+Benchmark tenants use the slug prefix "bench-retrieval-" and are deleted at the
+end unless --keep is given.
+"""
+
+import argparse
+import asyncio
+import io
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import numpy as np
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, delete, select
+
+from app.config import settings
+from app.core.kb.partitions import drop_embedding_partition, ensure_embedding_partition
+from app.core.rag.retrieval import search_similar_chunks
+from app.db.models import Tenant
+from app.db.session import async_session
+
+SLUG_PREFIX = "bench-retrieval-"
+DIM = 1536
+
+
+def _vector_literal(vec: np.ndarray) -> str:
+    return "[" + ",".join(f"{x:.6f}" for x in vec) + "]"
+
+
+def _copy(cursor, table: str, columns: str, rows: list[tuple]) -> None:
+    buf = io.StringIO("".join("\t".join(map(str, row)) + "\n" for row in rows))
+    cursor.copy_expert(f"COPY {table} ({columns}) FROM STDIN", buf)
+
+
+def load(engine, tenants: int, chunks: int, clusters: int, rng: np.random.Generator) -> None:
+    started = time.perf_counter()
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        for t in range(tenants):
+            tenant_id, document_id = uuid.uuid4(), uuid.uuid4()
+            with engine.begin() as conn:
+                ensure_embedding_partition(conn, tenant_id)
+            cursor.execute(
+                "INSERT INTO tenants (id, name, slug, status, default_language) VALUES (%s, %s, %s, 'active', 'en')",
+                (str(tenant_id), f"Bench {t}", f"{SLUG_PREFIX}{t}"),
+            )
+            cursor.execute(
+                "INSERT INTO kb_documents (id, tenant_id, title, source_type, storage_url, status) "
+                "VALUES (%s, %s, 'bench', 'text', 's3://bench/doc', 'ready')",
+                (str(document_id), str(tenant_id)),
+            )
+            # Each tenant's KB is a few topics with chunks spread around them
+            centers = rng.standard_normal((clusters, DIM)).astype(np.float32)
+            vectors = centers[rng.integers(0, clusters, chunks)] + 0.6 * rng.standard_normal((chunks, DIM)).astype(np.float32)
+            vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+            chunk_ids = [uuid.uuid4() for _ in range(chunks)]
+            _copy(cursor, "kb_chunks", "id, tenant_id, document_id, chunk_text, chunk_hash", [
+                (chunk_id, tenant_id, document_id, f"chunk {i}", f"{i:064x}") for i, chunk_id in enumerate(chunk_ids)
+            ])
+            _copy(cursor, "kb_embeddings", "chunk_id, tenant_id, embedding", [
+                (chunk_id, tenant_id, _vector_literal(vec)) for chunk_id, vec in zip(chunk_ids, vectors)
+            ])
+            raw.commit()
+            if (t + 1) % 10 == 0 or t + 1 == tenants:
+                print(f"  loaded {t + 1}/{tenants} tenants ({time.perf_counter() - started:.0f}s)")
+        cursor.execute("ANALYZE kb_embeddings")
+        raw.commit()
+    finally:
+        raw.close()
+
+
+async def _search(tenant_id: uuid.UUID, query: list[float], k: int, exact: bool) -> tuple[list[str], float]:
+    async with async_session() as db:
+        started = time.perf_counter()
+        rows = await search_similar_chunks(db, tenant_id, query, top_k=k, exact=exact)
+        elapsed = (time.perf_counter() - started) * 1000
+    return [r["chunk_id"] for r in rows], elapsed
+
+
+def _fallbacks() -> float:
+    return REGISTRY.get_sample_value("retrieval_exact_fallback_total") or 0.0
+
+
+async def measure(tenant_ids: list[uuid.UUID], queries: int, k: int, ef_values: list[int], rng) -> None:
+    workload = []
+    for _ in range(queries):
+        query = rng.standard_normal(DIM).astype(np.float32)
+        workload.append((tenant_ids[rng.integers(0, len(tenant_ids))], (query / np.linalg.norm(query)).tolist()))
+
+    truth = []
+    exact_ms = []
+    for tenant_id, query in workload:
+        ids, elapsed = await _search(tenant_id, query, k, exact=True)
+        truth.append(set(ids))
+        exact_ms.append(elapsed)
+    _report("exact", exact_ms, 1.0)
+
+    for ef in ef_values:
+        settings.RAG_HNSW_EF_SEARCH = ef
+        recalls, latencies = [], []
+        fallbacks_before = _fallbacks()
+        for (tenant_id, query), expected in zip(workload, truth):
+            ids, elapsed = await _search(tenant_id, query, k, exact=False)
+            recalls.append(len(expected & set(ids)) / max(len(expected), 1))
+            latencies.append(elapsed)
+        fallbacks = _fallbacks() - fallbacks_before
+        _report(f"hnsw ef_search={ef}", latencies, statistics.mean(recalls), fallbacks / len(workload))
+
+
+def _report(label: str, latencies: list[float], recall: float, fallback_rate: float | None = None) -> None:
+    latencies = sorted(latencies)
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    line = f"{label:<22} recall@k={recall:.3f}  p50={statistics.median(latencies):7.1f}ms  p95={p95:7.1f}ms"
+    if fallback_rate is not None:
+        # Share of searches whose HNSW scan came back short and was redone exactly
+        line += f"  exact fallback={fallback_rate:.0%}"
+    print(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tenants", type=int, default=50)
+    parser.add_argument("--chunks", type=int, default=2000, help="chunks per tenant")
+    parser.add_argument("--clusters", type=int, default=20, help="topics per tenant")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=settings.RAG_TOP_K)
+    parser.add_argument("--ef-search", type=int, nargs="+", default=[40, 100, 200])
+    parser.add_argument("--skip-load", action="store_true")
+    parser.add_argument("--keep", action="store_true")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    engine = create_engine(settings.DATABASE_URL_SYNC)
+    if not args.skip_load:
+        print(f"loading {args.tenants} tenants x {args.chunks} chunks")
+        load(engine, args.tenants, args.chunks, args.clusters, rng)
+
+    with engine.connect() as conn:
+        tenant_ids = conn.scalars(select(Tenant.id).where(Tenant.slug.startswith(SLUG_PREFIX))).all()
+    try:
+        asyncio.run(measure(tenant_ids, args.queries, args.k, args.ef_search, rng))
+    finally:
+        if not args.keep:
+            with engine.begin() as conn:
+                # Dropping the partitions first spares the row-by-row cascade into them
+                for tenant_id in tenant_ids:
+                    drop_embedding_partition(conn, tenant_id)
+                conn.execute(delete(Tenant).where(Tenant.slug.startswith(SLUG_PREFIX)))
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,7 @@ sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 import uuid
 from sqlalchemy import create_engine, text
 from app.core.auth.passwords import hash_password
+from app.core.kb.partitions import ensure_embedding_partition
 from app.config import settings
 
 DATABASE_URL = str(settings.DATABASE_URL_SYNC) if hasattr(settings, "DATABASE_URL_SYNC") else str(settings.DATABASE_URL).replace("+asyncpg", "")
@@ -35,6 +36,8 @@ with engine.begin() as conn:
             """),
             {"id": str(TENANT_ID), "name": "Test Hotel", "slug": "test-hotel"},
         )
+        # Its kb_embeddings partition, so the first KB upload need not create it
+        ensure_embedding_partition(conn, TENANT_ID)
 
         # Create tenant settings
         conn.execute(
@@ -2,19 +2,23 @@ from __future__ import annotations
 
 import asyncio
 import uuid
-from collections.abc import AsyncGenerator
+from collections.abc import AsyncGenerator, AsyncIterator, Iterator
+from contextlib import asynccontextmanager
 
 import pytest
 import pytest_asyncio
 from httpx import ASGITransport, AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
 
 from app.config import settings
 from app.db.models import Base, Tenant, TenantSetting, User, TenantUserRole, WidgetKey
-from app.db.session import get_db
+from app.db.session import get_db, get_session_scope
 from app.core.auth.passwords import hash_password
 from app.core.auth.jwt import create_access_token
+from app.core.tenants.cache import clear_widget_cache
 from app.main import app
+from app.workers.ingest import sync_engine
 
 
 # Use a separate test database if configured, otherwise use main DB
@@ -36,6 +40,18 @@ async def db() -> AsyncGenerator[AsyncSession, None]:
     async with test_session() as session:
         yield session
         await session.rollback()
+    # Widget keys cached during a test point at rows that were just rolled back
+    clear_widget_cache()
+
+
+@pytest.fixture
+def sync_db() -> Iterator[Session]:
+    """Session on the Celery tasks' sync engine, rolled back after the test."""
+    with sync_engine.connect() as conn:
+        trans = conn.begin()
+        with Session(bind=conn) as session:
+            yield session
+        trans.rollback()
 
 
 @pytest_asyncio.fixture
@@ -43,7 +59,17 @@ async def client(db: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
     async def override_get_db():
         yield db
 
+    # Every scope shares the test's session; the lock serializes scopes opened
+    # concurrently (e.g. hybrid retrieval), which one session can't run at once
+    lock = asyncio.Lock()
+
+    @asynccontextmanager
+    async def test_scope() -> AsyncIterator[AsyncSession]:
+        async with lock:
+            yield db
+
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_session_scope] = lambda: test_scope
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url="http://test") as c:
         yield c
@@ -1,8 +1,17 @@
 from __future__ import annotations
 
+import csv
+import gzip
+import io
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
+
 import pytest
 from httpx import AsyncClient
 
+from app.db.models import Conversation, Message, QuestionCluster, Turn
+
 
 @pytest.mark.asyncio
 async def test_me_unauthenticated(client: AsyncClient):
@@ -43,3 +52,107 @@ async def test_create_widget_key(client: AsyncClient, seed_tenant: dict):
     data = resp.json()
     assert data["key"].startswith("wk_")
     assert data["status"] == "active"
+
+
+@pytest.mark.asyncio
+async def test_list_conversations_paginates(client: AsyncClient, seed_tenant: dict, db):
+    tenant_id = uuid.UUID(seed_tenant["tenant_id"])
+    base = datetime(2026, 3, 1, 12, 0, tzinfo=timezone.utc)
+    conversations = [
+        # Two conversations share a start time; the id breaks the tie
+        Conversation(tenant_id=tenant_id, channel="web_widget", status=status, started_at=base - timedelta(minutes=m))
+        for m, status in ((0, "active"), (1, "closed"), (1, "closed"), (2, "escalated"), (3, "active"))
+    ]
+    db.add_all(conversations)
+    await db.flush()
+    db.add(Message(tenant_id=tenant_id, conversation_id=conversations[0].id, role="user", content="Hi"))
+    await db.flush()
+
+    url = f"/admin/tenant/{tenant_id}/conversations"
+    headers = {"Authorization": f"Bearer {seed_tenant['token']}"}
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2} | ({"cursor": cursor} if cursor else {})
+        page = (await client.get(url, params=params, headers=headers)).json()
+        seen += page["items"]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    expected = sorted(conversations, key=lambda c: (c.started_at, c.id), reverse=True)
+    assert [item["id"] for item in seen] == [str(c.id) for c in expected]
+    assert seen[0]["message_count"] == 1 and seen[1]["message_count"] == 0
+
+    closed = (await client.get(url, params={"status": "closed"}, headers=headers)).json()
+    assert len(closed["items"]) == 2 and closed["next_cursor"] is None
+
+    resp = await client.get(url, params={"cursor": "not-a-cursor"}, headers=headers)
+    assert resp.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_export_conversations(client: AsyncClient, seed_tenant: dict, db):
+    tenant_id = uuid.UUID(seed_tenant["tenant_id"])
+    started = datetime(2026, 3, 1, 12, 0, tzinfo=timezone.utc)
+    with_turn = Conversation(tenant_id=tenant_id, channel="web_widget", status="closed", started_at=started)
+    without_turns = Conversation(
+        tenant_id=tenant_id, channel="web_widget", status="active", started_at=started + timedelta(days=1)
+    )
+    db.add_all([with_turn, without_turns])
+    await db.flush()
+    question = Message(tenant_id=tenant_id, conversation_id=with_turn.id, role="user", content="Parkering?")
+    answer = Message(tenant_id=tenant_id, conversation_id=with_turn.id, role="assistant", content="Ja, 200 kr/dygn.")
+    db.add_all([question, answer])
+    await db.flush()
+    db.add(
+        Turn(
+            tenant_id=tenant_id, conversation_id=with_turn.id, outcome="answered", confidence=0.8,
+            user_message_id=question.id, assistant_message_id=answer.id, retrieved_chunk_ids=["c1"],
+        )
+    )
+    await db.flush()
+
+    url = f"/admin/tenant/{tenant_id}/export/conversations"
+    headers = {"Authorization": f"Bearer {seed_tenant['token']}"}
+
+    resp = await client.get(url, params={"gzip": "true"}, headers=headers)
+    assert resp.headers["content-type"] == "application/gzip"
+    rows = [json.loads(line) for line in gzip.decompress(resp.content).decode().splitlines()]
+    assert [(r["conversation_id"], r["user_message"], r["assistant_message"]) for r in rows] == [
+        (str(with_turn.id), "Parkering?", "Ja, 200 kr/dygn."),
+        (str(without_turns.id), None, None),
+    ]
+    assert rows[0]["retrieved_chunk_ids"] == ["c1"]
+
+    resp = await client.get(url, params={"format": "csv", "to_date": "2026-03-01"}, headers=headers)
+    records = list(csv.DictReader(io.StringIO(resp.text)))
+    assert len(records) == 1 and records[0]["outcome"] == "answered"
+
+
+@pytest.mark.asyncio
+async def test_stats_unanswered_lists_clusters(client: AsyncClient, seed_tenant: dict, db):
+    tenant_id = uuid.UUID(seed_tenant["tenant_id"])
+    seen = datetime(2026, 3, 1, 12, 0, tzinfo=timezone.utc)
+    for count, question in ((2, "Is there parking?"), (7, "Do you allow pets?"), (4, "Late checkout?")):
+        db.add(QuestionCluster(
+            tenant_id=tenant_id,
+            centroid=[0.0] * 1536,
+            question_count=count,
+            representative=question,
+            sample_questions=[question],
+            first_seen_at=seen,
+            last_seen_at=seen,
+        ))
+    await db.flush()
+
+    resp = await client.get(
+        f"/admin/tenant/{tenant_id}/stats/unanswered",
+        params={"limit": 2},
+        headers={"Authorization": f"Bearer {seed_tenant['token']}"},
+    )
+
+    assert resp.status_code == 200
+    assert [(c["representative"], c["question_count"]) for c in resp.json()] == [
+        ("Do you allow pets?", 7),
+        ("Late checkout?", 4),
+    ]
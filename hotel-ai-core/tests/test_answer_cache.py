@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import uuid
+
+import pytest
+import pytest_asyncio
+
+from app.config import settings
+from app.core.cache.answers import clear_local_vectors, lookup_cached_answer, store_cached_answer
+from app.core.cache.client import get_redis
+
+ANSWER = {"answer": "Breakfast is from 7 to 10.", "outcome": "answered", "citations": [], "confidence": 0.9}
+
+
+def _vector(*head: float) -> list[float]:
+    return [*head] + [0.0] * (8 - len(head))
+
+
+@pytest_asyncio.fixture
+async def tenant_id():
+    tenant_id = uuid.uuid4()
+    clear_local_vectors()
+    yield tenant_id
+    keys = [key async for key in get_redis().scan_iter(f"answer_cache:*{tenant_id}*")]
+    if keys:
+        await get_redis().delete(*keys)
+
+
+@pytest.mark.asyncio
+async def test_lookup_hits_near_duplicate_question(tenant_id):
+    await store_cached_answer(tenant_id, 1, _vector(1, 0), ANSWER)
+
+    assert await lookup_cached_answer(tenant_id, 1, _vector(1, 0.01)) == ANSWER
+    assert await lookup_cached_answer(tenant_id, 1, _vector(1, 1)) is None
+    # Another process's stores are picked up by the next lookup
+    await store_cached_answer(tenant_id, 1, _vector(0, 1), {**ANSWER, "answer": "Parking is 25 EUR."})
+    assert (await lookup_cached_answer(tenant_id, 1, _vector(0.01, 1)))["answer"] == "Parking is 25 EUR."
+
+
+@pytest.mark.asyncio
+async def test_lookup_misses_after_kb_version_bump(tenant_id):
+    await store_cached_answer(tenant_id, 1, _vector(1, 0), ANSWER)
+    assert await lookup_cached_answer(tenant_id, 1, _vector(1, 0)) == ANSWER
+
+    assert await lookup_cached_answer(tenant_id, 2, _vector(1, 0)) is None
+
+
+@pytest.mark.asyncio
+async def test_store_evicts_oldest_entry_at_max_entries(tenant_id, monkeypatch):
+    monkeypatch.setattr(settings, "ANSWER_CACHE_MAX_ENTRIES", 2)
+    for i in range(3):
+        await store_cached_answer(tenant_id, 1, _vector(*[0.0] * i, 1), {**ANSWER, "answer": str(i)})
+
+    assert await lookup_cached_answer(tenant_id, 1, _vector(1)) is None
+    assert (await lookup_cached_answer(tenant_id, 1, _vector(0, 1)))["answer"] == "1"
+    assert (await lookup_cached_answer(tenant_id, 1, _vector(0, 0, 1)))["answer"] == "2"
+    assert await get_redis().hlen(f"answer_cache:{tenant_id}:v1") == 2
+
+    # A process that had already loaded the evicted entry drops it too
+    await store_cached_answer(tenant_id, 1, _vector(0, 0, 0, 1), {**ANSWER, "answer": "3"})
+    assert await lookup_cached_answer(tenant_id, 1, _vector(0, 1)) is None
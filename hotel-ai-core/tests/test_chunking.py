@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import uuid
+
+from app.core.kb.chunking import chunk_text, index_chunk_hashes, iter_page_chunks, match_chunks
+
+
+def test_chunk_text_overlaps():
+    chunks = chunk_text("a" * 1000 + "b" * 1000, chunk_size=800, overlap=200)
+    assert [len(c["chunk_text"]) for c in chunks] == [800, 800, 800, 200]
+    assert chunks[0]["chunk_text"][-200:] == chunks[1]["chunk_text"][:200]
+
+
+def test_match_chunks_claims_unchanged_and_leaves_vanished():
+    old = chunk_text("x" * 800 + "y" * 800, chunk_size=800, overlap=0)
+    existing = [(uuid.uuid4(), c["chunk_hash"]) for c in old]
+    new = chunk_text("x" * 800 + "z" * 800, chunk_size=800, overlap=0)
+    stored = index_chunk_hashes(existing)
+
+    to_add, kept = match_chunks(stored, new)
+
+    assert [c["chunk_text"] for c in to_add] == ["z" * 800]
+    assert kept == [(existing[0][0], new[0])]
+    assert [chunk_id for ids in stored.values() for chunk_id in ids] == [existing[1][0]]
+
+
+def test_match_chunks_matches_repeated_hashes_one_to_one():
+    chunk = chunk_text("same")[0]
+    existing = [(uuid.uuid4(), chunk["chunk_hash"])]
+    stored = index_chunk_hashes(existing)
+
+    to_add, kept = match_chunks(stored, [chunk, chunk])
+
+    assert to_add == [chunk]
+    assert kept == [(existing[0][0], chunk)]
+    assert not any(stored.values())
+
+
+def test_iter_page_chunks_matches_chunk_text():
+    text = "".join(f"page {i} " + "word " * (i * 37 % 400) + "\n" for i in range(40))
+    pieces = [(None, text[i : i + 313]) for i in range(0, len(text), 313)]
+    for size, overlap in [(800, 200), (100, 0), (50, 49)]:
+        assert list(iter_page_chunks(pieces, size, overlap)) == chunk_text(text, size, overlap)
+    assert list(iter_page_chunks([])) == []
+
+
+def test_iter_page_chunks_records_page_span():
+    pages = [(1, "a" * 500), (1, "\n"), (2, "b" * 500), (2, "\n"), (3, "c" * 500)]
+    chunks = list(iter_page_chunks(pages, chunk_size=800, overlap=200))
+
+    assert [c["chunk_text"] for c in chunks] == [c["chunk_text"] for c in chunk_text("".join(t for _, t in pages))]
+    assert [(c["page_start"], c["page_end"]) for c in chunks] == [(1, 2), (2, 3), (3, 3)]
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from app.core.kb.chunking import chunk_text
+from app.config import settings
+from app.core.llm.tokens import count_tokens
+from app.core.rag.context import format_passage, pack_context
+
+
+def _chunk(text: str, similarity: float, document_id: str = "d1", chunk_id: str | None = None) -> dict:
+    return {
+        "chunk_id": chunk_id or f"{document_id}:{similarity}",
+        "document_id": document_id,
+        "title": "Guide",
+        "chunk_text": text,
+        "page_start": None,
+        "page_end": None,
+        "similarity": similarity,
+    }
+
+
+def _words(n: int, offset: int = 0) -> str:
+    return " ".join(f"w{i}" for i in range(offset, offset + n))
+
+
+def test_merges_overlapping_chunks_of_a_document():
+    text = _words(400)
+    first, second = chunk_text(text, chunk_size=800, overlap=200)[:2]
+    chunks = [_chunk(second["chunk_text"], 0.8, chunk_id="b"), _chunk(first["chunk_text"], 0.9, chunk_id="a")]
+
+    passages = pack_context(chunks, max_tokens=10_000)
+
+    assert len(passages) == 1
+    assert passages[0]["text"] == text[:1400]
+    assert [c["chunk_id"] for c in passages[0]["chunks"]] == ["a", "b"]
+
+
+def test_drops_near_duplicates_and_respects_budget():
+    chunks = [
+        _chunk(_words(100), 0.9, "d1"),
+        _chunk(_words(100) + " extra", 0.85, "d2"),
+        _chunk(_words(100, offset=500), 0.8, "d3"),
+        _chunk(_words(100, offset=900), 0.7, "d4"),
+    ]
+
+    passages = pack_context(chunks, max_tokens=10_000)
+    assert [p["document_id"] for p in passages] == ["d1", "d3", "d4"]
+
+    first_cost = count_tokens(format_passage(passages[0]), settings.OPENAI_CHAT_MODEL)
+    passages = pack_context(chunks, max_tokens=first_cost + 10)
+    assert [p["document_id"] for p in passages] == ["d1"]
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import json
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy import delete, select
+
+from app.config import settings
+from app.core.cache.client import get_sync_redis
+from app.core.conversations.log import decode_turn, encode_turn
+from app.core.conversations.service import turn_rows
+from app.db.models import Conversation, Tenant, Turn
+from app.workers.conversations import flush_conversation_log
+from app.workers.ingest import sync_engine
+
+
+def test_turn_round_trips_through_stream_entry():
+    received_at = datetime(2026, 1, 5, 8, 0, tzinfo=timezone.utc)
+    rag_result = {"outcome": "answered", "answer_text": "07:00", "citations": [{"chunk_id": "c1"}], "confidence": 0.8}
+    messages, turn = turn_rows(uuid.uuid4(), uuid.uuid4(), "Breakfast?", rag_result, received_at)
+
+    fields = {k.encode(): v.encode() for k, v in encode_turn(messages, turn).items()}
+    assert decode_turn(fields) == (messages, turn)
+    assert messages[0]["created_at"] == received_at
+    assert turn["user_message_id"] == messages[0]["id"]
+
+
+def test_turn_rows_strip_nul_and_old_entries_decode_with_defaults():
+    received_at = datetime(2026, 1, 5, 8, 0, tzinfo=timezone.utc)
+    rag_result = {"outcome": "answered", "answer_text": "07:\x0000", "citations": [], "confidence": 0.8}
+    messages, turn = turn_rows(uuid.uuid4(), uuid.uuid4(), "Break\x00fast?", rag_result, received_at)
+    assert [m["content"] for m in messages] == ["Breakfast?", "07:00"]
+
+    # An entry queued before token counts were recorded
+    data = json.loads(encode_turn(messages, turn)["data"])
+    for field in ("prompt_tokens", "completion_tokens", "latency_ms"):
+        del data["turn"][field]
+    _, decoded = decode_turn({b"data": json.dumps(data).encode()})
+    assert (decoded["prompt_tokens"], decoded["completion_tokens"], decoded["latency_ms"]) == (None, None, None)
+
+
+def test_flush_drops_unstorable_entry_and_stores_the_rest(monkeypatch):
+    key = f"conversation_log_test:{uuid.uuid4()}"
+    monkeypatch.setattr(settings, "CONVERSATION_STREAM_KEY", key)
+    r = get_sync_redis()
+    received_at = datetime.now(timezone.utc)
+    rag_result = {"outcome": "fallback", "answer_text": None, "citations": [], "confidence": 0.1}
+    with sync_engine.begin() as conn:
+        tenant_id = conn.scalar(
+            Tenant.__table__.insert()
+            .values(id=uuid.uuid4(), name="Log Hotel", slug=f"log-{uuid.uuid4().hex[:8]}", status="active")
+            .returning(Tenant.id)
+        )
+        conversation_id = conn.scalar(
+            Conversation.__table__.insert()
+            .values(id=uuid.uuid4(), tenant_id=tenant_id, channel="web_widget", status="active")
+            .returning(Conversation.id)
+        )
+    try:
+        good = turn_rows(tenant_id, conversation_id, "Is there parking?", rag_result, received_at)
+        bad = turn_rows(tenant_id, conversation_id, "Late check-out?", rag_result, received_at)
+        # Queued by a build that did not strip NULs; psycopg2 refuses the string
+        bad[0][0]["content"] = "Late\x00 check-out?"
+        r.xadd(key, encode_turn(*bad))
+        r.xadd(key, encode_turn(*good))
+
+        assert flush_conversation_log() == {"read": 2, "stored": 1}
+        assert r.xlen(key) == 0
+        with sync_engine.connect() as conn:
+            stored = conn.scalars(select(Turn.id).where(Turn.conversation_id == conversation_id)).all()
+        assert stored == [good[1]["id"]]
+    finally:
+        r.delete(key)
+        with sync_engine.begin() as conn:
+            conn.execute(delete(Tenant).where(Tenant.id == tenant_id))
@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+from app.workers.embedding import plan_batches
+
+
+def test_plan_batches_respects_token_budget():
+    batches = plan_batches([40, 40, 40, 90, 10], max_tokens=100, max_items=10)
+    assert batches == [slice(0, 2), slice(2, 3), slice(3, 5)]
+
+
+def test_plan_batches_respects_item_limit():
+    batches = plan_batches([1] * 5, max_tokens=100, max_items=2)
+    assert batches == [slice(0, 2), slice(2, 4), slice(4, 5)]
+
+
+def test_plan_batches_keeps_oversized_input_alone():
+    assert plan_batches([500, 10], max_tokens=100, max_items=10) == [slice(0, 1), slice(1, 2)]
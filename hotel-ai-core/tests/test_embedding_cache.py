@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+import time
+
+from app.core.cache.embeddings import cache_key
+from app.core.cache.lru import LRUCache
+
+
+def test_cache_key_normalizes_whitespace():
+    assert cache_key("what time is  checkout?\n") == cache_key(" what time is checkout?")
+    assert cache_key("checkout", model="a") != cache_key("checkout", model="b")
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(max_size=2, ttl_seconds=60)
+    cache.set("a", b"1")
+    cache.set("b", b"2")
+    assert cache.get("a") == b"1"
+    cache.set("c", b"3")
+    assert cache.get("b") is None
+    assert cache.get("a") == b"1"
+    assert len(cache) == 2
+
+
+def test_lru_expires_entries():
+    cache = LRUCache(max_size=2, ttl_seconds=0.01)
+    cache.set("a", b"1")
+    time.sleep(0.02)
+    assert cache.get("a") is None
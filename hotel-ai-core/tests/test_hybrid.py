@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+from app.core.rag.hybrid import reciprocal_rank_fusion
+from app.core.rag.lexical import build_tsquery_text, extract_terms
+
+
+def test_build_tsquery_text_ors_terms_and_prefixes_long_words():
+    assert extract_terms("What's the Wi-Fi password? wifi WIFI") == ["what", "s", "the", "wi", "fi", "password", "wifi"]
+    assert build_tsquery_text(extract_terms("frukost rum 214")) == "frukost:* | rum | 214"
+    assert build_tsquery_text(extract_terms("frukost rum 214"), "&") == "frukost:* & rum & 214"
+    assert build_tsquery_text(extract_terms("?!")) is None
+
+
+def test_rrf_rewards_chunks_found_by_both_retrievers():
+    vector = [{"chunk_id": "a", "similarity": 0.9}, {"chunk_id": "b", "similarity": 0.8}]
+    lexical = [{"chunk_id": "c", "similarity": 0.2, "lexical_rank": 0.5}, {"chunk_id": "b", "similarity": 0.8, "lexical_rank": 0.3}]
+
+    fused = reciprocal_rank_fusion([vector, lexical], top_k=2)
+
+    assert [c["chunk_id"] for c in fused] == ["b", "a"]
+    assert fused[0]["lexical_rank"] == 0.3
+    assert "lexical_rank" not in fused[1]
@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import io
+import uuid
+
+import pytest
+from sqlalchemy import delete, select, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.kb.chunking import chunk_text
+from app.core.kb.embedding_store import content_hash
+from app.core.kb.partitions import drop_embedding_partition, ensure_embedding_partition, partition_name
+import app.workers.ingest as ingest
+from app.db.models import KBChunk, KBDocument, KBEmbedding, SharedEmbedding, Tenant
+from app.workers.ingest import (
+    _embed_texts_sync,
+    _insert_chunks,
+    create_embedding_partitions,
+    process_document,
+    sync_engine,
+)
+
+
+def _embedding(i: int) -> list[float]:
+    return [float(i)] + [0.0] * 1535
+
+
+def test_insert_chunks_links_embeddings_across_batches(sync_db: Session, monkeypatch):
+    monkeypatch.setattr(settings, "INGEST_INSERT_BATCH_SIZE", 2)
+    tenant = Tenant(name="Ingest Hotel", slug="ingest-hotel", status="active")
+    sync_db.add(tenant)
+    sync_db.flush()
+    doc = KBDocument(tenant_id=tenant.id, title="Guide", source_type="text", status="processing")
+    sync_db.add(doc)
+    sync_db.flush()
+    ensure_embedding_partition(sync_db.connection(), tenant.id)
+    texts = [f"Chunk number {i}." for i in range(5)]
+    chunks = [
+        {"chunk_text": t, "chunk_hash": content_hash(t), "page_start": i + 1, "page_end": i + 1}
+        for i, t in enumerate(texts)
+    ]
+
+    _insert_chunks(sync_db, tenant.id, doc.id, chunks, [_embedding(i + 1) for i in range(5)])
+
+    rows = sync_db.execute(
+        select(KBChunk, KBEmbedding)
+        .join(KBEmbedding, KBEmbedding.chunk_id == KBChunk.id)
+        .where(KBChunk.document_id == doc.id)
+        .order_by(KBChunk.page_start)
+    ).all()
+    assert [c.chunk_text for c, _ in rows] == texts
+    assert [c.chunk_hash for c, _ in rows] == [content_hash(t) for t in texts]
+    # Every chunk's embedding is the one it was given, not a neighbour's
+    assert [int(e.embedding[0]) for _, e in rows] == [c.page_start for c, _ in rows]
+    assert all(e.tenant_id == tenant.id and e.model == settings.OPENAI_EMBEDDING_MODEL for _, e in rows)
+    assert len(sync_db.scalars(select(KBEmbedding.chunk_id).where(KBEmbedding.tenant_id == tenant.id)).all()) == 5
+
+
+def test_reindex_keeps_unchanged_chunks_and_deletes_vanished(monkeypatch):
+    embedded: list[str] = []
+
+    def fake_embed_texts_sync(texts):
+        embedded.extend(texts)
+        return [_embedding(1) for _ in texts]
+
+    monkeypatch.setattr(ingest, "_embed_texts_sync", fake_embed_texts_sync)
+    monkeypatch.setattr(ingest, "bump_kb_version_sync", lambda tenant_id: None)
+    with sync_engine.begin() as conn:
+        tenant_id = conn.scalar(
+            Tenant.__table__.insert()
+            .values(id=uuid.uuid4(), name="Reindex Hotel", slug=f"reindex-{uuid.uuid4().hex[:8]}", status="active")
+            .returning(Tenant.id)
+        )
+        ensure_embedding_partition(conn, tenant_id)
+        doc_id = conn.scalar(
+            KBDocument.__table__.insert()
+            .values(
+                id=uuid.uuid4(),
+                tenant_id=tenant_id,
+                title="Guide",
+                source_type="text",
+                storage_url="s3://kb/guide.txt",
+                status="processing",
+            )
+            .returning(KBDocument.id)
+        )
+
+    def ingest_text(body: str) -> dict[str, uuid.UUID]:
+        monkeypatch.setattr(ingest, "_download_from_s3", lambda url: io.BytesIO(body.encode()))
+        assert process_document(str(doc_id), str(tenant_id))["status"] == "ready"
+        with sync_engine.connect() as conn:
+            rows = conn.execute(select(KBChunk.chunk_text, KBChunk.id).where(KBChunk.document_id == doc_id)).all()
+        return dict(rows)
+
+    try:
+        first = ingest_text("x" * 800 + "y" * 800)
+        embedded.clear()
+        second = ingest_text("x" * 800 + "z" * 800)
+
+        new_texts = [c["chunk_text"] for c in chunk_text("x" * 800 + "z" * 800)]
+        assert sorted(second) == sorted(new_texts)
+        # The unchanged chunk keeps its row (and embedding); only new text is embedded
+        assert second["x" * 800] == first["x" * 800]
+        assert sorted(embedded) == sorted(t for t in new_texts if t not in first)
+    finally:
+        with sync_engine.begin() as conn:
+            drop_embedding_partition(conn, tenant_id)
+            conn.execute(delete(Tenant).where(Tenant.id == tenant_id))
+
+
+def test_shared_store_reuses_embeddings_across_tenants_per_model(monkeypatch):
+    calls: list[list[str]] = []
+
+    def fake_embed_in_batches(texts, on_batch=None):
+        calls.append(texts)
+        embeddings = [_embedding(len(calls)) for _ in texts]
+        on_batch(texts, embeddings)
+        return dict(zip(texts, embeddings))
+
+    # Only the shared store, not the embedding cache, may supply the second lookup
+    monkeypatch.setattr(ingest, "get_cached_embeddings_sync", lambda texts: [None] * len(texts))
+    monkeypatch.setattr(ingest, "set_cached_embeddings_sync", lambda texts, embeddings: None)
+    monkeypatch.setattr(ingest, "embed_in_batches", fake_embed_in_batches)
+    text = f"Check-out is at 11:00 ({uuid.uuid4()})."
+    model = settings.OPENAI_EMBEDDING_MODEL
+    try:
+        # The first tenant's ingest embeds the chunk; a second tenant's identical chunk is reused
+        assert _embed_texts_sync([text]) == [_embedding(1)]
+        assert _embed_texts_sync([text]) == [_embedding(1)]
+        assert calls == [[text]]
+
+        monkeypatch.setattr(settings, "OPENAI_EMBEDDING_MODEL", "other-embedding-model")
+        assert _embed_texts_sync([text]) == [_embedding(2)]
+        assert len(calls) == 2
+
+        with sync_engine.connect() as conn:
+            models = conn.scalars(
+                select(SharedEmbedding.model).where(SharedEmbedding.content_hash == content_hash(text))
+            ).all()
+        assert sorted(models) == sorted([model, "other-embedding-model"])
+    finally:
+        with sync_engine.begin() as conn:
+            conn.execute(delete(SharedEmbedding).where(SharedEmbedding.content_hash == content_hash(text)))
+
+
+def test_partition_attach_gives_up_while_an_ingest_writes_kb_chunks(monkeypatch):
+    monkeypatch.setattr(settings, "KB_PARTITION_LOCK_TIMEOUT_MS", 100)
+    tenant_id = uuid.uuid4()
+    with sync_engine.connect() as ingest_conn, ingest_conn.begin():
+        # What an open ingest transaction holds after its first chunk insert
+        ingest_conn.execute(text("LOCK TABLE kb_chunks IN ROW EXCLUSIVE MODE"))
+        with pytest.raises(OperationalError, match="lock timeout"):
+            with sync_engine.begin() as conn:
+                ensure_embedding_partition(conn, tenant_id)
+
+    with sync_engine.connect() as conn:
+        assert conn.scalar(text("SELECT to_regclass(:name)"), {"name": partition_name(tenant_id)}) is None
+
+
+def test_create_embedding_partitions_covers_new_tenants():
+    with sync_engine.begin() as conn:
+        tenant_id = conn.scalar(
+            Tenant.__table__.insert()
+            .values(id=uuid.uuid4(), name="New Hotel", slug=f"new-{uuid.uuid4().hex[:8]}", status="active")
+            .returning(Tenant.id)
+        )
+    try:
+        assert create_embedding_partitions()["created"] >= 1
+        with sync_engine.connect() as conn:
+            assert conn.scalar(text("SELECT to_regclass(:name)"), {"name": partition_name(tenant_id)}) is not None
+        assert create_embedding_partitions() == {"created": 0, "busy": 0}
+    finally:
+        with sync_engine.begin() as conn:
+            conn.execute(delete(Tenant).where(Tenant.id == tenant_id))
+            drop_embedding_partition(conn, tenant_id)
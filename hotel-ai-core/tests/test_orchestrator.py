@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import asyncio
+import uuid
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import app.core.rag.orchestrator as orchestrator
+from app.config import settings
+from app.core.kb.embedding_store import content_hash
+from app.core.kb.partitions import ensure_embedding_partition
+from app.core.rag.orchestrator import rag_answer
+from app.db.models import KBChunk, KBDocument, KBEmbedding
+
+POOL_HOURS = "The hotel pool is open from 07:00 to 22:00."
+
+
+async def _seed_chunk(db: AsyncSession, tenant_id: uuid.UUID, text: str) -> None:
+    doc = KBDocument(tenant_id=tenant_id, title="Guest guide", source_type="text", status="ready")
+    db.add(doc)
+    await db.flush()
+    chunk = KBChunk(tenant_id=tenant_id, document_id=doc.id, chunk_text=text, chunk_hash=content_hash(text))
+    db.add(chunk)
+    await db.flush()
+    await db.run_sync(lambda session: ensure_embedding_partition(session.connection(), tenant_id))
+    # Orthogonal to the stubbed question embedding, so only full-text matching can find it relevant
+    db.add(KBEmbedding(chunk_id=chunk.id, tenant_id=tenant_id, embedding=[0.0, 1.0] + [0.0] * 1534))
+    await db.flush()
+
+
+def _scope(db: AsyncSession):
+    lock = asyncio.Lock()
+
+    @asynccontextmanager
+    async def scope() -> AsyncIterator[AsyncSession]:
+        async with lock:
+            yield db
+
+    return scope
+
+
+@pytest.fixture
+def stub_llm(monkeypatch) -> list[dict]:
+    calls = []
+
+    async def fake_embed_text(text):
+        return [1.0] + [0.0] * 1535
+
+    async def create(**kwargs):
+        calls.append(kwargs)
+        usage = SimpleNamespace(prompt_tokens=50, completion_tokens=5, prompt_tokens_details=None)
+        return SimpleNamespace(usage=usage, choices=[SimpleNamespace(message=SimpleNamespace(content="07-22."))])
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    monkeypatch.setattr(settings, "ANSWER_CACHE_ENABLED", False)
+    monkeypatch.setattr(settings, "VECTOR_INDEX_ENABLED", False)
+    monkeypatch.setattr(orchestrator, "embed_text", fake_embed_text)
+    monkeypatch.setattr(orchestrator, "get_async_client", lambda: client)
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_off_topic_question_sharing_a_kb_word_falls_back(db, seed_tenant, stub_llm):
+    tenant_id = uuid.UUID(seed_tenant["tenant_id"])
+    await _seed_chunk(db, tenant_id, POOL_HOURS)
+
+    result = await rag_answer(_scope(db), tenant_id, "Where can I rent a bicycle near the hotel?")
+
+    assert result["outcome"] == "fallback"
+    assert stub_llm == []
+
+
+@pytest.mark.asyncio
+async def test_question_with_every_term_in_a_chunk_is_answered(db, seed_tenant, stub_llm):
+    tenant_id = uuid.UUID(seed_tenant["tenant_id"])
+    await _seed_chunk(db, tenant_id, POOL_HOURS)
+
+    result = await rag_answer(_scope(db), tenant_id, "When is the pool open?")
+
+    assert result["outcome"] == "answered"
+    assert result["answer_text"] == "07-22."
+    assert len(stub_llm) == 1
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import io
+import multiprocessing
+
+from pypdf import PdfWriter
+from pypdf.generic import ContentStream, DictionaryObject, NameObject
+from structlog.testing import capture_logs
+
+from app.config import settings
+from app.workers.pdf import iter_pdf_pages
+
+
+def _build_pdf(pages: int) -> bytes:
+    writer = PdfWriter()
+    font = writer._add_object(DictionaryObject({
+        NameObject("/Type"): NameObject("/Font"),
+        NameObject("/Subtype"): NameObject("/Type1"),
+        NameObject("/BaseFont"): NameObject("/Helvetica"),
+    }))
+    for n in range(pages):
+        page = writer.add_blank_page(width=612, height=792)
+        page[NameObject("/Resources")] = DictionaryObject({
+            NameObject("/Font"): DictionaryObject({NameObject("/F1"): font}),
+        })
+        content = ContentStream(None, writer)
+        content.set_data(f"BT /F1 12 Tf 40 760 Td (Page {n + 1}: breakfast 07:00-10:30) Tj ET".encode())
+        page.replace_contents(content)
+    buf = io.BytesIO()
+    writer.write(buf)
+    return buf.getvalue()
+
+
+def _parse_in_child(data: bytes, queue) -> None:
+    with capture_logs() as logs:
+        pages = list(iter_pdf_pages(io.BytesIO(data)))
+    queue.put((pages, [entry["event"] for entry in logs]))
+
+
+def test_parallel_parsing_works_inside_a_daemonic_worker(monkeypatch):
+    monkeypatch.setattr(settings, "PDF_PARSE_WORKERS", 2)
+    monkeypatch.setattr(settings, "PDF_PARSE_PAGES_PER_TASK", 2)
+    monkeypatch.setattr(settings, "PDF_PARALLEL_MIN_PAGES", 4)
+    data = _build_pdf(7)
+
+    # Celery's prefork pool runs tasks in daemonic processes like this one
+    ctx = multiprocessing.get_context("fork")
+    queue = ctx.Queue()
+    child = ctx.Process(target=_parse_in_child, args=(data, queue), daemon=True)
+    child.start()
+    pages, events = queue.get(timeout=60)
+    child.join(timeout=10)
+
+    assert "pdf.parallel_unavailable" not in events
+    assert [n for n, _ in pages] == list(range(1, 8))
+    assert all(f"Page {n}:" in text for n, text in pages)
@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+from app.core.guardrails.prompt import SYSTEM_RULES, build_system_prompt, build_tenant_section, prompt_cache_key
+from app.core.llm.usage import usage_tokens
+
+
+def test_prompt_starts_with_static_rules_then_tenant_section():
+    a = build_system_prompt("ctx A", escalation_phone="+46 1")
+    b = build_system_prompt("ctx B", escalation_email="desk@hotel.se")
+
+    assert a.startswith(SYSTEM_RULES + build_tenant_section("+46 1"))
+    assert b.startswith(SYSTEM_RULES + build_tenant_section(None, "desk@hotel.se"))
+    assert a.endswith("ctx A\n--- CONTEXT END ---")
+    assert prompt_cache_key(build_tenant_section("+46 1")) != prompt_cache_key(build_tenant_section(None, "desk@hotel.se"))
+
+
+def test_usage_tokens_reads_cached_prompt_tokens():
+    usage = SimpleNamespace(
+        prompt_tokens=1500, completion_tokens=80, prompt_tokens_details=SimpleNamespace(cached_tokens=1024)
+    )
+    assert usage_tokens(usage) == {"prompt_tokens": 1500, "cached_tokens": 1024, "completion_tokens": 80}
+    assert usage_tokens(None)["cached_tokens"] == 0
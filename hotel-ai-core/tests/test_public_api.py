@@ -1,7 +1,20 @@
 from __future__ import annotations
 
+import json
+import uuid
+from types import SimpleNamespace
+
 import pytest
 from httpx import AsyncClient
+from prometheus_client import REGISTRY
+from sqlalchemy import select
+
+import app.api.public as public
+import app.core.rag.orchestrator as orchestrator
+from app.config import settings
+from app.core.rag.orchestrator import rag_answer
+from app.db.models import Message, Turn
+from app.db.session import session_scope
 
 
 @pytest.mark.asyncio
@@ -11,6 +24,34 @@ async def test_health(client: AsyncClient):
     assert resp.json() == {"status": "ok"}
 
 
+@pytest.mark.asyncio
+async def test_metrics_report_rag_stages(client: AsyncClient):
+    tenant_id = uuid.uuid4()
+    stage_labels = {"stage": "greeting", "outcome": "answered"}
+    greetings = REGISTRY.get_sample_value("rag_stage_duration_seconds_count", stage_labels) or 0.0
+    # Greetings are answered without embedding, retrieval or the LLM
+    await rag_answer(session_scope, tenant_id, "Hello!")
+
+    resp = await client.get("/metrics")
+    assert resp.status_code == 200
+    # Stages are not broken down by tenant, the request total is
+    assert REGISTRY.get_sample_value("rag_stage_duration_seconds_count", stage_labels) == greetings + 1
+    assert f'rag_request_duration_seconds_count{{outcome="answered",tenant_id="{tenant_id}"}} 1.0' in resp.text
+
+
+@pytest.mark.asyncio
+async def test_metrics_require_token(client: AsyncClient, monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "scrape-secret")
+    assert (await client.get("/metrics")).status_code == 401
+    assert (await client.get("/metrics", headers={"Authorization": "Bearer wrong"})).status_code == 401
+    assert (await client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"})).status_code == 200
+
+    # Outside development there is no unauthenticated access even without a token
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "")
+    monkeypatch.setattr(settings, "APP_ENV", "production")
+    assert (await client.get("/metrics")).status_code == 401
+
+
 @pytest.mark.asyncio
 async def test_widget_config_invalid_key(client: AsyncClient):
     resp = await client.get("/public/widget-config", params={"widget_key": "nonexistent"})
@@ -36,3 +77,184 @@ async def test_conversation_start(client: AsyncClient, seed_tenant: dict):
     assert resp.status_code == 200
     data = resp.json()
     assert "conversation_id" in data
+
+
+@pytest.mark.asyncio
+async def test_widget_config_reflects_settings_update(client: AsyncClient, seed_tenant: dict):
+    params = {"widget_key": seed_tenant["widget_key"]}
+    assert (await client.get("/public/widget-config", params=params)).json()["greeting_message"] == "Welcome to Test Hotel!"
+
+    resp = await client.post(
+        f"/admin/tenant/{seed_tenant['tenant_id']}/settings",
+        json={"greeting_message": "Hej och välkommen!"},
+        headers={"Authorization": f"Bearer {seed_tenant['token']}"},
+    )
+    assert resp.status_code == 200
+
+    assert (await client.get("/public/widget-config", params=params)).json()["greeting_message"] == "Hej och välkommen!"
+
+
+@pytest.mark.asyncio
+async def test_chat_records_turn(client: AsyncClient, seed_tenant: dict, db, monkeypatch):
+    async def fake_rag_answer(*args, **kwargs):
+        return {"outcome": "answered", "answer_text": "At 07:00.", "citations": [], "confidence": 0.9, "escalation": None}
+
+    monkeypatch.setattr(public, "rag_answer", fake_rag_answer)
+    widget_key = seed_tenant["widget_key"]
+    conversation_id = (
+        await client.post("/public/conversation/start", json={"widget_key": widget_key})
+    ).json()["conversation_id"]
+
+    resp = await client.post(
+        "/public/chat",
+        json={"widget_key": widget_key, "conversation_id": conversation_id, "message": "Breakfast?"},
+    )
+    assert resp.status_code == 200
+
+    turn = (await db.execute(select(Turn).where(Turn.conversation_id == conversation_id))).scalar_one()
+    messages = (
+        await db.execute(
+            select(Message).where(Message.conversation_id == conversation_id).order_by(Message.created_at)
+        )
+    ).scalars().all()
+    assert [(m.role, m.content) for m in messages] == [("user", "Breakfast?"), ("assistant", "At 07:00.")]
+    assert (turn.user_message_id, turn.assistant_message_id) == (messages[0].id, messages[1].id)
+    assert all(m.token_count for m in messages)
+    assert turn.latency_ms is not None and turn.latency_ms >= 0
+
+    for bad_id in (str(uuid.uuid4()), "not-a-uuid"):
+        resp = await client.post(
+            "/public/chat",
+            json={"widget_key": widget_key, "conversation_id": bad_id, "message": "Hi"},
+        )
+        assert resp.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_chat_updates_daily_stats(client: AsyncClient, seed_tenant: dict, monkeypatch):
+    async def fake_rag_answer(*args, **kwargs):
+        return {
+            "outcome": "fallback", "answer_text": None, "citations": [], "confidence": 0.1,
+            "escalation": None, "usage": {"prompt_tokens": 120, "completion_tokens": 30},
+        }
+
+    monkeypatch.setattr(public, "rag_answer", fake_rag_answer)
+    widget_key = seed_tenant["widget_key"]
+    conversation_id = (
+        await client.post("/public/conversation/start", json={"widget_key": widget_key})
+    ).json()["conversation_id"]
+    for message in ("Parking?", "Pool?"):
+        resp = await client.post(
+            "/public/chat",
+            json={"widget_key": widget_key, "conversation_id": conversation_id, "message": message},
+        )
+        assert resp.status_code == 200
+
+    resp = await client.get(
+        f"/admin/tenant/{seed_tenant['tenant_id']}/stats/overview",
+        headers={"Authorization": f"Bearer {seed_tenant['token']}"},
+    )
+    data = resp.json()
+    assert (data["total_conversations"], data["total_messages"], data["total_turns"]) == (1, 4, 2)
+    assert data["fallback_count"] == 2
+    assert (data["prompt_tokens"], data["completion_tokens"]) == (240, 60)
+    assert data["avg_latency_ms"] is not None
+
+
+CHUNK = {
+    "chunk_id": str(uuid.uuid4()),
+    "document_id": str(uuid.uuid4()),
+    "title": "Guest guide",
+    "chunk_text": "Breakfast is served from 07:00 to 10:30.",
+    "page_start": None,
+    "page_end": None,
+    "chunk_index": 0,
+    "similarity": 0.9,
+}
+
+
+class FakeLLMStream:
+    def __init__(self, deltas: list[str], fail_after: int | None = None):
+        self.deltas = deltas
+        self.fail_after = fail_after
+
+    async def __aiter__(self):
+        for i, text in enumerate(self.deltas):
+            if i == self.fail_after:
+                raise RuntimeError("connection reset")
+            yield SimpleNamespace(usage=None, choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+        usage = SimpleNamespace(prompt_tokens=50, completion_tokens=5, prompt_tokens_details=None)
+        yield SimpleNamespace(usage=usage, choices=[])
+
+
+def _stub_llm_stream(monkeypatch, stream: FakeLLMStream) -> None:
+    async def fake_embed_text(text):
+        return [1.0, 0.0]
+
+    async def fake_hybrid_search(*args, **kwargs):
+        return [CHUNK]
+
+    async def create(**kwargs):
+        assert kwargs["stream"] is True
+        return stream
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    monkeypatch.setattr(settings, "ANSWER_CACHE_ENABLED", False)
+    monkeypatch.setattr(orchestrator, "embed_text", fake_embed_text)
+    monkeypatch.setattr(orchestrator, "hybrid_search", fake_hybrid_search)
+    monkeypatch.setattr(orchestrator, "get_async_client", lambda: client)
+
+
+async def _stream_events(client: AsyncClient, widget_key: str, conversation_id: str) -> list[tuple[str, dict]]:
+    body = {"widget_key": widget_key, "conversation_id": conversation_id, "message": "When is breakfast?"}
+    async with client.stream("POST", "/public/chat/stream", json=body) as resp:
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("text/event-stream")
+        raw = (await resp.aread()).decode()
+    events = []
+    for block in raw.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+@pytest.mark.asyncio
+async def test_chat_stream_emits_meta_deltas_done_and_records_turn(
+    client: AsyncClient, seed_tenant: dict, db, monkeypatch
+):
+    _stub_llm_stream(monkeypatch, FakeLLMStream(["Breakfast is ", "from 07:00."]))
+    widget_key = seed_tenant["widget_key"]
+    conversation_id = (
+        await client.post("/public/conversation/start", json={"widget_key": widget_key})
+    ).json()["conversation_id"]
+
+    events = await _stream_events(client, widget_key, conversation_id)
+
+    assert [name for name, _ in events] == ["meta", "delta", "delta", "done"]
+    assert events[0][1]["outcome"] == "answered"
+    assert events[0][1]["citations"][0]["chunk_id"] == CHUNK["chunk_id"]
+    assert [data["text"] for name, data in events if name == "delta"] == ["Breakfast is ", "from 07:00."]
+    assert events[-1][1]["answer_text"] == "Breakfast is from 07:00."
+
+    turn = (await db.execute(select(Turn).where(Turn.conversation_id == conversation_id))).scalar_one()
+    assert turn.outcome == "answered"
+    assistant = await db.get(Message, turn.assistant_message_id)
+    assert assistant.content == "Breakfast is from 07:00."
+
+
+@pytest.mark.asyncio
+async def test_chat_stream_reports_error_and_records_nothing(
+    client: AsyncClient, seed_tenant: dict, db, monkeypatch
+):
+    _stub_llm_stream(monkeypatch, FakeLLMStream(["Breakfast is ", "from 07:00."], fail_after=1))
+    widget_key = seed_tenant["widget_key"]
+    conversation_id = (
+        await client.post("/public/conversation/start", json={"widget_key": widget_key})
+    ).json()["conversation_id"]
+
+    events = await _stream_events(client, widget_key, conversation_id)
+
+    assert [name for name, _ in events] == ["meta", "delta", "error"]
+    assert "connection reset" not in events[-1][1]["detail"]
+    assert (await db.execute(select(Turn).where(Turn.conversation_id == conversation_id))).first() is None
+    assert (await db.execute(select(Message).where(Message.conversation_id == conversation_id))).first() is None
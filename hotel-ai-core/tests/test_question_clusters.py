@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import uuid
+from types import SimpleNamespace
+
+import numpy as np
+
+import app.workers.analytics as analytics
+from app.config import settings
+from app.core.analytics.clusters import assign_clusters
+from app.core.llm.tokens import count_tokens
+
+
+def test_assign_clusters_joins_existing_and_starts_new():
+    centroids = np.array([[1, 0, 0]], dtype=np.float32)
+    sizes = np.array([3])
+    vectors = [[0.9, 0.1, 0], [0, 1, 0], [0, 0.95, 0.05], [0, 0, 1]]
+
+    labels, centroids, sizes = assign_clusters(centroids, sizes, vectors, threshold=0.9)
+
+    assert labels.tolist() == [0, 1, 1, 2]
+    assert sizes.tolist() == [4, 2, 1]
+    # The existing cluster's centroid moves a quarter of the way to its new member
+    member = np.array([0.9, 0.1, 0]) / np.linalg.norm([0.9, 0.1, 0])
+    assert np.allclose(centroids[0], (3 * np.array([1, 0, 0]) + member) / 4)
+
+
+def test_assign_clusters_without_existing_clusters():
+    labels, centroids, sizes = assign_clusters(
+        np.empty((0, 2), dtype=np.float32), np.empty(0, dtype=np.int64), [[1, 0], [2, 0.01], [0, 1]], threshold=0.9
+    )
+
+    assert labels.tolist() == [0, 0, 1]
+    assert sizes.tolist() == [2, 1]
+    assert centroids.shape == (2, 2)
+
+
+def test_over_long_questions_are_cut_to_the_embedding_input_limit(monkeypatch):
+    sent = []
+
+    def fake_embed_in_batches(texts, on_batch=None):
+        sent.extend(texts)
+        return {t: [1.0, 0.0] for t in texts}
+
+    monkeypatch.setattr(settings, "EMBEDDING_MAX_INPUT_TOKENS", 50)
+    monkeypatch.setattr(analytics, "get_cached_embeddings_sync", lambda texts: [None] * len(texts))
+    monkeypatch.setattr(analytics, "embed_in_batches", fake_embed_in_batches)
+
+    embeddings = analytics._embed_questions(["Is breakfast included? " * 200, "Where is the spa?"])
+
+    assert embeddings == [[1.0, 0.0], [1.0, 0.0]]
+    assert count_tokens(sent[0], settings.OPENAI_EMBEDDING_MODEL) <= 50
+    assert sent[1] == "Where is the spa?"
+
+
+def test_a_failing_tenant_does_not_stop_the_others(monkeypatch):
+    broken, healthy = uuid.uuid4(), uuid.uuid4()
+
+    class FakeSession:
+        def __init__(self, engine):
+            pass
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def scalars(self, stmt):
+            return SimpleNamespace(all=lambda: [broken, healthy])
+
+    def fake_cluster_batch(tenant_id):
+        if tenant_id == broken:
+            raise RuntimeError("embeddings API said 400")
+        return 3, 3, 1
+
+    monkeypatch.setattr(analytics, "Session", FakeSession)
+    monkeypatch.setattr(analytics, "_cluster_batch", fake_cluster_batch)
+
+    assert analytics.cluster_unanswered_questions() == {"tenants": 2, "questions": 3, "failed": 1}
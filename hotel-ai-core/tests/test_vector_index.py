@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import asyncio
+import uuid
+
+import numpy as np
+import pytest
+
+import app.core.rag.vector_index as vector_index
+from app.core.rag.vector_index import TenantIndex, VectorIndexCache, get_tenant_index
+
+
+def _index(vectors: list[list[float]], kb_version: int = 1) -> TenantIndex:
+    matrix = np.asarray(vectors, dtype=np.float32)
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+    rows = [{"chunk_id": str(i)} for i in range(len(vectors))]
+    return TenantIndex(kb_version=kb_version, matrix=matrix, rows=rows, nbytes=matrix.nbytes)
+
+
+def test_search_returns_top_k_by_cosine_similarity():
+    index = _index([[1, 0], [0, 1], [1, 1], [-1, 0]])
+
+    results = index.search([2, 0.1], k=2)
+
+    assert [r["chunk_id"] for r in results] == ["0", "2"]
+    assert results[0]["similarity"] > results[1]["similarity"]
+    assert len(index.search([1, 0], k=10)) == 4
+
+
+def test_cache_invalidates_on_version_and_evicts_over_budget():
+    small = _index([[1, 0]])
+    cache = VectorIndexCache(max_bytes=small.nbytes * 2)
+    a, b, c = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+
+    cache.put(a, small)
+    assert cache.get(a, kb_version=1) is small
+    assert cache.get(a, kb_version=2) is None
+
+    cache.put(b, _index([[0, 1]]))
+    cache.get(a, kb_version=1)
+    cache.put(c, _index([[1, 1]]))
+    assert cache.get(b, kb_version=1) is None
+    assert cache.get(a, kb_version=1) is small
+    assert len(cache) == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_load_once(monkeypatch):
+    loads = []
+
+    async def fake_load(db, tenant_id, kb_version):
+        loads.append((tenant_id, kb_version))
+        await asyncio.sleep(0.01)
+        return _index([[1, 0]], kb_version=kb_version)
+
+    monkeypatch.setattr(vector_index, "_load", fake_load)
+    monkeypatch.setattr(vector_index, "_cache", VectorIndexCache(max_bytes=1024))
+    tenant_id = uuid.uuid4()
+
+    entries = await asyncio.gather(*(get_tenant_index(None, tenant_id, kb_version=1) for _ in range(5)))
+
+    assert loads == [(tenant_id, 1)]
+    assert all(entry is entries[0] for entry in entries)
+    # A new KB version is loaded again, once
+    await asyncio.gather(*(get_tenant_index(None, tenant_id, kb_version=2) for _ in range(3)))
+    assert loads == [(tenant_id, 1), (tenant_id, 2)]
@@ -1,9 +1,15 @@
-import type { ChatMessage } from "../lib/types";
+import type { ChatMessage, Citation } from "../lib/types";
 
 interface Props {
   message: ChatMessage;
 }
 
+function citationLabel(c: Citation): string {
+  if (c.page_start == null) return c.title;
+  if (c.page_end == null || c.page_end === c.page_start) return `${c.title} (p. ${c.page_start})`;
+  return `${c.title} (pp. ${c.page_start}-${c.page_end})`;
+}
+
 export function MessageBubble({ message }: Props) {
   const isUser = message.role === "user";
 
@@ -15,7 +21,7 @@ export function MessageBubble({ message }: Props) {
           <div class="hcw-citations">
             {message.citations.map((c) => (
               <span key={c.chunk_id} class="hcw-citation-tag">
-                {c.title}
+                {citationLabel(c)}
               </span>
             ))}
           </div>
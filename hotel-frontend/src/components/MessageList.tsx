@@ -24,7 +24,7 @@ export function MessageList({ messages, sending }: Props) {
           {msg.escalation && <EscalationCard escalation={msg.escalation} />}
         </div>
       ))}
-      {sending && <TypingIndicator />}
+      {sending && messages[messages.length - 1]?.role !== "assistant" && <TypingIndicator />}
       <div ref={bottomRef} />
     </div>
   );
@@ -1,5 +1,5 @@
 import { useState, useCallback, useRef } from "preact/hooks";
-import { startConversation, sendMessage } from "../lib/api";
+import { startConversation, sendMessageStream } from "../lib/api";
 import { loadChat, saveChat, clearChat } from "../lib/storage";
 import type { ChatMessage, WidgetConfig } from "../lib/types";
 
@@ -65,10 +65,25 @@ export function useChat({ widgetKey, locale, channel = "web_widget", config }: U
           setConversationId(cid);
         }
 
-        const response = await sendMessage(widgetKey, cid!, text, locale);
+        const assistantId = `assistant-${Date.now()}`;
+        const response = await sendMessageStream(
+          widgetKey,
+          cid!,
+          text,
+          (delta) => {
+            setMessages((prev) => {
+              const last = prev[prev.length - 1];
+              if (last?.id === assistantId) {
+                return [...prev.slice(0, -1), { ...last, content: last.content + delta }];
+              }
+              return [...prev, { id: assistantId, role: "assistant", content: delta, timestamp: Date.now() }];
+            });
+          },
+          locale,
+        );
 
         const assistantMsg: ChatMessage = {
-          id: `assistant-${Date.now()}`,
+          id: assistantId,
           role: "assistant",
           content:
             response.answer_text ||
@@ -80,7 +95,7 @@ export function useChat({ widgetKey, locale, channel = "web_widget", config }: U
         };
 
         setMessages((prev) => {
-          const updated = [...prev, assistantMsg];
+          const updated = [...prev.filter((m) => m.id !== assistantId), assistantMsg];
           saveChat(widgetKey, cid!, updated);
           return updated;
         });
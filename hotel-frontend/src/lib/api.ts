@@ -53,3 +53,58 @@ export function sendMessage(
     }),
   });
 }
+
+/**
+ * Streaming variant of sendMessage: calls onDelta with answer text as it is
+ * generated and resolves with the final ChatResponse once the turn is stored.
+ */
+export async function sendMessageStream(
+  widgetKey: string,
+  conversationId: string,
+  message: string,
+  onDelta: (text: string) => void,
+  locale?: string,
+): Promise<ChatResponse> {
+  const res = await fetch(`${_baseUrl}/public/chat/stream`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json", Accept: "text/event-stream" },
+    body: JSON.stringify({
+      widget_key: widgetKey,
+      conversation_id: conversationId,
+      message,
+      locale,
+    }),
+  });
+  if (!res.ok || !res.body) {
+    const data = await res.json().catch(() => ({}));
+    throw new Error(data?.detail || `Request failed (${res.status})`);
+  }
+
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    let sep: number;
+    while ((sep = buffer.indexOf("\n\n")) !== -1) {
+      const raw = buffer.slice(0, sep);
+      buffer = buffer.slice(sep + 2);
+
+      let event = "message";
+      let data = "";
+      for (const line of raw.split("\n")) {
+        if (line.startsWith("event: ")) event = line.slice(7);
+        else if (line.startsWith("data: ")) data += line.slice(6);
+      }
+      const payload = data ? JSON.parse(data) : {};
+
+      if (event === "delta") onDelta(payload.text);
+      else if (event === "done") return payload as ChatResponse;
+      else if (event === "error") throw new Error(payload.detail || "Something went wrong");
+    }
+  }
+  throw new Error("Connection closed before the answer was complete");
+}
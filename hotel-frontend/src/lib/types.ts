@@ -17,6 +17,8 @@ export interface Citation {
   document_id: string;
   title: string;
   chunk_id: string;
+  page_start?: number | null;
+  page_end?: number | null;
 }
 
 export interface Escalation {